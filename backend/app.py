@@ -5,6 +5,7 @@ Run from project root: python -m backend.app  or  flask --app backend.app run
 
 import sys
 from pathlib import Path
+from typing import Optional
 
 # Paths: app.py lives in backend/, so parents[0]=backend, parents[1]=project root
 BACKEND_DIR = Path(__file__).resolve().parents[0]
@@ -13,11 +14,21 @@ for p in (BACKEND_DIR, PROJECT_ROOT):
     if str(p) not in sys.path:
         sys.path.insert(0, str(p))
 
+import numpy as np
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 
+from services.monitoring import numeric_column as _column
+
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=["X-Next-Cursor", "ETag"], max_age=600)
+
+
+@app.after_request
+def _encode(response):
+    from services.responses import compress_response, conditional_response
+    response = conditional_response(response, request)
+    return compress_response(response, request.headers.get("Accept-Encoding"))
 
 
 @app.route("/health", methods=["GET"])
@@ -41,13 +52,15 @@ def list_models():
 
 @app.route("/api/datasets", methods=["GET"])
 def list_datasets():
-    """List all ingested datasets for backend portal."""
-    from store import datasets_store
+    """
+    List all ingested datasets for backend portal.
+    Optional: limit + cursor for pagination; Accept selects row JSON (default), columnar JSON or Arrow.
+    """
+    from store import list_datasets as store_list_datasets
+    from services.responses import bulk_response, negotiate_format, paginate
     out = []
-    for did, ds in datasets_store.items():
+    for did, ds in store_list_datasets():
         meta = ds.get("metadata", {})
-        data = ds.get("scored_data") or []
-        row_count = len(data) if isinstance(data, list) else 0
         out.append({
             "dataset_id": did,
             "portfolio": meta.get("portfolio", ""),
@@ -55,10 +68,21 @@ def list_datasets():
             "model_id": meta.get("model_id", ""),
             "vintage": meta.get("vintage", ""),
             "qc_status": ds.get("qc_status", "pending"),
-            "row_count": row_count,
+            "row_count": ds.get("row_count", 0),
             "created_at": ds.get("created_at", ""),
         })
-    return jsonify({"datasets": out})
+    try:
+        page, next_cursor = paginate(out, request.args.get("limit"), request.args.get("cursor"))
+    except ValueError:
+        return jsonify({"error": "invalid limit or cursor"}), 400
+    return bulk_response("datasets", page, negotiate_format(request.headers.get("Accept")), next_cursor)
+
+
+@app.route("/api/datasets/cache", methods=["GET"])
+def dataset_cache_stats():
+    """Dataset memory tier usage and eviction stats for the worker that serves the request."""
+    import dataset_cache
+    return jsonify(dataset_cache.stats())
 
 
 @app.route("/api/metrics/trends", methods=["GET"])
@@ -68,15 +92,82 @@ def metrics_trends():
     segment = request.args.get("segment")
     if not model_id:
         return jsonify({"error": "model_id required"}), 400
+    data = _metric_trends(model_id, segment or None)
+    if not data:
+        return jsonify({"error": "model not found or no metrics"}), 404
+    return jsonify(data)
+
+
+def _metric_trends(model_id: str, segment: Optional[str]) -> Optional[dict]:
     from store import get_metrics_trends
     from services.insights import generate_trend_commentary
-    data = get_metrics_trends(model_id, segment=segment or None)
+    data = get_metrics_trends(model_id, segment=segment)
     if not data:
-        return jsonify({"error": "model not found or no metrics"}), 404
+        return None
     data["commentary"] = generate_trend_commentary(data)
+    return data
+
+
+@app.route("/api/metrics/vintage-curves", methods=["GET"])
+def vintage_curves():
+    """
+    Bad rate by months-on-book per origination vintage, with maturity-adjusted bad rates.
+    Query: model_id (required), target_mob (default 12), weighted=1 for balance-weighted rates.
+    """
+    model_id = request.args.get("model_id")
+    if not model_id:
+        return jsonify({"error": "model_id required"}), 400
+    try:
+        target_mob = int(request.args.get("target_mob", 12))
+    except ValueError:
+        return jsonify({"error": "target_mob must be an integer"}), 400
+    weighted = request.args.get("weighted", "").lower() in ("1", "true", "yes")
+    from store import get_vintage_curves
+    data = get_vintage_curves(model_id, target_mob=target_mob, balance_weighted=weighted)
+    if not data:
+        return jsonify({"error": "no cohort performance loaded for this model"}), 404
     return jsonify(data)
 
 
+@app.route("/api/vintage/performance", methods=["POST"])
+def vintage_performance():
+    """
+    Load a month of cohort performance from an ingested dataset into the model's vintage curves.
+    Body: model_id, dataset_id, optional replace (restated months overwrite their cells).
+    Dataset columns: mob, bad (or target), origination_vintage (or cohort; defaults to the
+    dataset's vintage), optional balance.
+    """
+    body = request.get_json() or {}
+    model_id = body.get("model_id")
+    dataset_id = body.get("dataset_id")
+    if not model_id or not dataset_id:
+        return jsonify({"error": "model_id and dataset_id required"}), 400
+    from store import get_dataset, get_dataset_columns, apply_vintage_increment
+    ds = get_dataset(dataset_id)
+    columns = get_dataset_columns(dataset_id) if ds else None
+    if columns is None:
+        return jsonify({"error": "dataset not found"}), 404
+    if "mob" not in columns:
+        return jsonify({"error": "dataset needs a mob column"}), 400
+    n = ds["row_count"]
+    vintage = columns.get("origination_vintage", columns.get("cohort"))
+    if vintage is None:
+        vintage = np.full(n, ds["metadata"].get("vintage", ""))
+    from metrics.vintage import aggregate_increment
+    try:
+        increment = aggregate_increment(
+            vintage,
+            columns["mob"],
+            _column(columns, "bad", "target", default=0),
+            balance=columns.get("balance"),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result = apply_vintage_increment(model_id, increment, replace=bool(body.get("replace")))
+    result["rows"] = n
+    return jsonify(result)
+
+
 @app.route("/api/metrics/variable-stability", methods=["GET"])
 def variable_stability():
     """Variable-level stability (PSI per variable) for a model and vintage; includes PSI trigger insight."""
@@ -84,6 +175,10 @@ def variable_stability():
     vintage = request.args.get("vintage")
     if not model_id or not vintage:
         return jsonify({"error": "model_id and vintage required"}), 400
+    return jsonify(_variable_stability(model_id, vintage))
+
+
+def _variable_stability(model_id: str, vintage: str) -> dict:
     from store import get_variable_stability
     data = get_variable_stability(model_id, vintage)
     driven_by = [v["variable"] for v in data if v.get("status") in ("amber", "red")]
@@ -91,37 +186,143 @@ def variable_stability():
         f"PSI trigger is primarily driven by: {', '.join(driven_by)}."
         if driven_by else "All variables are within acceptable PSI range (green)."
     )
-    return jsonify({
+    return {
         "model_id": model_id,
         "vintage": vintage,
         "variables": data,
         "psi_trigger_insight": psi_trigger_insight,
-    })
+    }
 
 
 @app.route("/api/metrics/segments", methods=["GET"])
 def segment_metrics():
-    """Segment-level metrics for Acquisition Scorecard (thin file, thick file)."""
+    """
+    Segment-level metrics (KS, PSI, AUC, Gini, bad rate) for a model and vintage.
+    Without `by`: the stored breakdown (e.g. thin file / thick file). With `by=channel,region`:
+    computed in one pass over the scored dataset for every crossed value of those columns
+    (optional baseline_dataset_id for per-segment PSI, min_volume), weighted by the record's
+    weight column when compute-metrics used one.
+    """
     model_id = request.args.get("model_id")
     vintage = request.args.get("vintage")
     if not model_id or not vintage:
         return jsonify({"error": "model_id and vintage required"}), 400
-    from store import get_segment_metrics
-    data = get_segment_metrics(model_id, vintage)
-    if not data:
-        return jsonify({"error": "not found or not an Acquisition Scorecard model"}), 404
-    return jsonify(data)
+    by = [c.strip() for c in (request.args.get("by") or "").split(",") if c.strip()]
+    from store import get_segment_metrics, get_metric_detail, get_dataset_columns
+    if not by:
+        data = get_segment_metrics(model_id, vintage)
+        if not data:
+            return jsonify({"error": "no segment metrics for this model and vintage"}), 404
+        return jsonify(data)
+    detail = get_metric_detail(model_id, vintage)
+    columns = get_dataset_columns(detail["dataset_id"]) if detail and detail.get("dataset_id") else None
+    if columns is None:
+        return jsonify({"error": "no scored dataset for this model and vintage"}), 404
+    missing = [c for c in by if c not in columns]
+    if missing:
+        return jsonify({"error": f"unknown segment columns: {', '.join(missing)}"}), 400
+    baseline_score = baseline_groups = None
+    baseline_id = request.args.get("baseline_dataset_id")
+    if baseline_id:
+        baseline = get_dataset_columns(baseline_id)
+        if baseline is None or any(c not in baseline for c in by):
+            return jsonify({"error": "baseline dataset not found or missing segment columns"}), 400
+        baseline_score = _column(baseline, "score", "probability", default=0.5)
+        baseline_groups = {c: baseline[c] for c in by}
+    from metrics.segments import segment_metrics as compute_segments
+    from services.monitoring import StepError, sample_weights
+    weight_column = detail.get("weight_column")
+    try:
+        weights = sample_weights(columns, weight_column) if weight_column else None
+        baseline_weights = sample_weights(baseline) if baseline_id else None
+    except StepError as e:
+        return jsonify({"error": str(e)}), e.status
+    segments = compute_segments(
+        _column(columns, "target", "y", default=0),
+        _column(columns, "score", "probability", default=0.5),
+        {c: columns[c] for c in by},
+        baseline_score=baseline_score,
+        baseline_group_columns=baseline_groups,
+        min_volume=request.args.get("min_volume", default=1, type=int),
+        sample_weight=weights,
+        baseline_weight=baseline_weights,
+    )
+    return jsonify({
+        "model_id": model_id,
+        "vintage": vintage,
+        "model_type": detail.get("model_type"),
+        "dimensions": by,
+        "segments": segments,
+    })
 
 
 @app.route("/api/metrics/summary", methods=["GET"])
 def metrics_summary():
+    """
+    Metrics rows for the summary table (query: portfolio, model_type, vintage, segment).
+    Optional: limit + cursor for pagination; Accept selects row JSON (default), columnar JSON or Arrow.
+    """
     portfolio = request.args.get("portfolio")
     model_type = request.args.get("model_type")
     vintage = request.args.get("vintage")
     segment = request.args.get("segment")
     from store import get_metrics
+    from services.responses import bulk_response, negotiate_format, paginate
     rows = get_metrics(portfolio=portfolio, model_type=model_type, vintage=vintage, segment=segment or None)
-    return jsonify({"metrics": rows})
+    try:
+        page, next_cursor = paginate(rows, request.args.get("limit"), request.args.get("cursor"))
+    except ValueError:
+        return jsonify({"error": "invalid limit or cursor"}), 400
+    return bulk_response("metrics", page, negotiate_format(request.headers.get("Accept")), next_cursor)
+
+
+@app.route("/api/metrics/overview", methods=["GET"])
+def metrics_overview():
+    """
+    Portfolio overview for the filters (query: portfolio, model_type, vintage, segment, worst_n):
+    RAG counts over metrics rows and models, portfolio and portfolio x model type status matrices,
+    worst models by KS / PSI and volume totals, read from counters maintained on write. Per-model
+    rows are paged from /api/metrics/overview/models.
+    """
+    from store import get_portfolio_overview
+    worst_n = request.args.get("worst_n", default=5, type=int)
+    return jsonify(get_portfolio_overview(
+        portfolio=request.args.get("portfolio") or None,
+        model_type=request.args.get("model_type") or None,
+        vintage=request.args.get("vintage") or None,
+        segment=request.args.get("segment") or None,
+        worst_n=max(0, min(worst_n, 100)),
+    ))
+
+
+@app.route("/api/metrics/overview/models", methods=["GET"])
+def metrics_overview_models():
+    """
+    Model cards for the overview filters: one row per model with its status and the KS / PSI of
+    the run shown, in model_id order (query: portfolio, model_type, vintage, segment, status,
+    limit (default 100) + cursor).
+    """
+    from store import get_overview_models
+    from services.responses import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+    try:
+        offset = decode_cursor(request.args.get("cursor"))
+        limit = min(int(request.args.get("limit", 100)), MAX_PAGE_SIZE)
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+    except ValueError:
+        return jsonify({"error": "invalid limit or cursor"}), 400
+    out = get_overview_models(
+        portfolio=request.args.get("portfolio") or None,
+        model_type=request.args.get("model_type") or None,
+        vintage=request.args.get("vintage") or None,
+        segment=request.args.get("segment") or None,
+        status=request.args.get("status") or None,
+        offset=offset,
+        limit=limit,
+    )
+    next_offset = out.pop("next_offset")
+    out["next_cursor"] = encode_cursor(next_offset) if next_offset is not None else None
+    return jsonify(out)
 
 
 @app.route("/api/metrics/detail/<model_id>", methods=["GET"])
@@ -130,130 +331,445 @@ def metrics_detail(model_id):
     segment = request.args.get("segment")
     if not vintage:
         return jsonify({"error": "vintage required"}), 400
+    detail = _metric_detail(model_id, vintage, segment or None)
+    if not detail:
+        return jsonify({"error": "not found"}), 404
+    # ML explainability (feature importance, importance drift) is stored with the record by compute-metrics
+    return jsonify(detail)
+
+
+def _metric_detail(model_id: str, vintage: str, segment: Optional[str]) -> Optional[dict]:
     from store import get_metric_detail, get_decile_metrics
     from services.insights import generate_decile_commentary, generate_ks_trigger_insight
-    detail = get_metric_detail(model_id, vintage, segment=segment or None)
+    detail = get_metric_detail(model_id, vintage, segment=segment)
     if not detail:
-        return jsonify({"error": "not found"}), 404
-    # Decile-level data and commentary (for scorecard-style models)
-    deciles = get_decile_metrics(model_id, vintage, segment=segment or None)
+        return None
+    detail = dict(detail)  # don't write view-only fields back into the stored record
+    # Decile-level data and commentary (for scorecard-style models); computed deciles are stored
+    # with the record by compute-metrics
+    deciles = detail.get("deciles") or get_decile_metrics(model_id, vintage, segment=segment)
     detail["deciles"] = deciles
     detail["decile_commentary"] = generate_decile_commentary(deciles)
     ks_val = detail.get("metrics", {}).get("KS")
     detail["ks_trigger_insight"] = generate_ks_trigger_insight(ks_val, deciles)
-    # Add ML explainability placeholder for ML model type
-    if detail.get("model_type") == "ML":
-        from metrics.ml_explainability import get_feature_importance
-        detail["explainability"] = {
-            "feature_importance": get_feature_importance(["F1", "F2", "F3", "F4", "F5"]),
-            "importance_drift": 0.08,
-        }
-    return jsonify(detail)
+    return detail
+
+
+@app.route("/api/analysis/bundle", methods=["GET"])
+def analysis_bundle():
+    """
+    Everything the Analysis tab shows for a model and vintage in one round-trip (query: model_id,
+    vintage, segment): detail with deciles and commentary, trends, variable stability and the
+    stored segment breakdown. A section is null when there is no data for it.
+    """
+    model_id = request.args.get("model_id")
+    vintage = request.args.get("vintage")
+    segment = request.args.get("segment") or None
+    if not model_id or not vintage:
+        return jsonify({"error": "model_id and vintage required"}), 400
+    from store import get_segment_metrics
+    detail = _metric_detail(model_id, vintage, segment)
+    trends = _metric_trends(model_id, segment)
+    if not detail and not trends:
+        return jsonify({"error": "model not found or no metrics"}), 404
+    return jsonify({
+        "model_id": model_id,
+        "vintage": vintage,
+        "segment": segment,
+        "detail": detail,
+        "trends": trends,
+        "stability": _variable_stability(model_id, vintage),
+        "segments": get_segment_metrics(model_id, vintage),
+    })
+
+
+@app.route("/api/metrics/history", methods=["GET"])
+def metrics_history():
+    """
+    Audit history: every stored metrics run (re-runs included), newest first. Query: model_id,
+    vintage or vintage_from / vintage_to, segment, since / until (computed_at, ISO), limit + cursor,
+    compacted=1 adds the monthly summaries of compacted runs.
+    """
+    from store import get_metrics_history
+    from services.responses import MAX_PAGE_SIZE, decode_cursor, encode_cursor
+    try:
+        offset = decode_cursor(request.args.get("cursor"))
+        limit = min(int(request.args.get("limit", MAX_PAGE_SIZE)), MAX_PAGE_SIZE)
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+    except ValueError:
+        return jsonify({"error": "invalid limit or cursor"}), 400
+    out = get_metrics_history(
+        model_id=request.args.get("model_id"),
+        vintage=request.args.get("vintage"),
+        vintage_from=request.args.get("vintage_from"),
+        vintage_to=request.args.get("vintage_to"),
+        segment=request.args.get("segment"),
+        since=request.args.get("since"),
+        until=request.args.get("until"),
+        offset=offset,
+        limit=limit,
+        include_compacted=request.args.get("compacted") in ("1", "true"),
+    )
+    out["next_cursor"] = encode_cursor(offset + len(out["runs"])) if out.pop("more") else None
+    return jsonify(out)
+
+
+@app.route("/api/metrics/history/compact", methods=["POST"])
+def compact_metrics_history():
+    """
+    Summarize superseded runs into monthly history. Body: before (ISO computed_at) or retain_days
+    (default MM_METRICS_RETENTION_DAYS); keep_runs full runs per key are always kept (default 1).
+    """
+    body = request.get_json(silent=True) or {}
+    from store import compact_metrics
+    from metrics_history import RETENTION_DAYS, retention_cutoff
+    try:
+        before = body.get("before") or retention_cutoff(float(body.get("retain_days", RETENTION_DAYS)))
+        keep_runs = int(body.get("keep_runs", 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "retain_days and keep_runs must be numbers"}), 400
+    return jsonify({"before": before, **compact_metrics(before, keep_runs)})
+
+
+@app.route("/api/explainability/baseline", methods=["POST"])
+def explainability_baseline():
+    """Re-baseline importance drift for a model on one vintage's feature importance. Body: model_id, vintage."""
+    body = request.get_json() or {}
+    model_id, vintage = body.get("model_id"), body.get("vintage")
+    if not model_id or not vintage:
+        return jsonify({"error": "model_id and vintage required"}), 400
+    from store import get_metric_detail, explain_baseline
+    detail = get_metric_detail(model_id, vintage)
+    importance = ((detail or {}).get("explainability") or {}).get("feature_importance")
+    if not importance:
+        return jsonify({"error": "no explainability computed for this model and vintage"}), 404
+    return jsonify({"model_id": model_id, "vintage": vintage, "baseline": explain_baseline(model_id, importance, replace=True)})
+
+
+@app.route("/api/metrics/curves/<model_id>", methods=["GET"])
+def metrics_curves(model_id):
+    """
+    KS / ROC / PR / lift / gain curves for a model and vintage, downsampled server-side.
+    Query: vintage (required), segment, curve (comma-separated; default all), points (default 500).
+    """
+    vintage = request.args.get("vintage")
+    segment = request.args.get("segment")
+    if not vintage:
+        return jsonify({"error": "vintage required"}), 400
+    from store import get_metric_detail, get_curve
+    from metrics.curves import CURVE_KINDS, DEFAULT_CURVE_POINTS
+    kinds = [k.strip() for k in (request.args.get("curve") or ",".join(CURVE_KINDS)).split(",") if k.strip()]
+    unknown = [k for k in kinds if k not in CURVE_KINDS]
+    if unknown:
+        return jsonify({"error": f"unknown curve: {', '.join(unknown)}", "available": list(CURVE_KINDS)}), 400
+    try:
+        points = int(request.args.get("points", DEFAULT_CURVE_POINTS))
+    except ValueError:
+        return jsonify({"error": "points must be an integer"}), 400
+    points = max(10, min(points, 5000))
+    detail = get_metric_detail(model_id, vintage, segment=segment or None)
+    if not detail:
+        return jsonify({"error": "not found"}), 404
+    curves = {}
+    for kind in kinds:
+        curve = get_curve(detail["record_id"], kind, points)
+        if curve is None:
+            return jsonify({"error": "no curve data for this record; compute metrics from a scored dataset first"}), 404
+        curves[kind] = curve
+    return jsonify({
+        "model_id": model_id,
+        "vintage": vintage,
+        "record_id": detail["record_id"],
+        "curves": curves,
+    })
+
+
+@app.route("/api/fraud/operating-points/<dataset_id>", methods=["GET"])
+def fraud_operating_points(dataset_id):
+    """
+    Precision / recall / FPR / alert rate / cost across score thresholds of a scored dataset.
+    Query: thresholds (comma-separated) or grid (n points; default every distinct threshold);
+    cost_tp, cost_fp, cost_fn, cost_tn; max_alerts, or max_alerts_per_day with days (default:
+    distinct values of a date column). The sorted curve is built once per dataset version.
+    """
+    from services.monitoring import StepError, operating_curve
+    try:
+        entry = operating_curve(dataset_id)
+        costs = {k: float(request.args[f"cost_{k}"]) for k in ("tp", "fp", "fn", "tn") if f"cost_{k}" in request.args}
+        thresholds = request.args.get("thresholds")
+        days = request.args.get("days", default=entry["days"], type=float)
+    except StepError as e:
+        return jsonify({"error": str(e)}), e.status
+    except ValueError:
+        return jsonify({"error": "cost_* and days must be numbers"}), 400
+    curve = entry["curve"]
+    if thresholds:
+        try:
+            idx = curve.index_at([float(t) for t in thresholds.split(",")])
+        except ValueError:
+            return jsonify({"error": "thresholds must be comma-separated numbers"}), 400
+    elif request.args.get("grid"):
+        idx = curve.grid(request.args.get("grid", type=int) or 2)
+    else:
+        idx = None
+    out = {
+        "dataset_id": dataset_id,
+        "n": int(curve.n),
+        "n_pos": int(curve.n_pos),
+        "n_neg": int(curve.n_neg),
+        "days": days,
+        "points": curve.points(idx, costs),
+        "min_cost": curve.min_cost(costs),
+    }
+    max_alerts = request.args.get("max_alerts", type=float)
+    per_day = request.args.get("max_alerts_per_day", type=float)
+    if per_day is not None:
+        max_alerts = per_day * days
+    if max_alerts is not None:
+        out["max_recall_within_capacity"] = curve.max_recall_within(max_alerts, costs)
+    return jsonify(out)
 
 
 @app.route("/api/ingest", methods=["POST"])
 def ingest_data():
-    body = request.get_json() or {}
-    portfolio = body.get("portfolio") or request.args.get("portfolio")
-    model_type = body.get("model_type") or request.args.get("model_type")
-    model_id = body.get("model_id") or request.args.get("model_id")
-    vintage = body.get("vintage") or request.args.get("vintage")
-    data = body.get("data", [])
-    if not all([portfolio, model_type, model_id, vintage]):
-        return jsonify({"error": "portfolio, model_type, model_id, vintage required"}), 400
-    from services.ingestion import ingest
-    result = ingest(data, portfolio, model_type, model_id, vintage)
-    return jsonify(result)
+    from services.workers import ingest
+    payload, status = ingest(request.args.to_dict(), request.get_json() or {})
+    return jsonify(payload), status
 
 
 @app.route("/api/qc/<dataset_id>", methods=["POST"])
 def run_qc(dataset_id):
-    from store import datasets_store
-    if dataset_id not in datasets_store:
-        return jsonify({"error": "dataset not found"}), 404
-    recs = datasets_store[dataset_id].get("scored_data") or []
-    from services.qc import run_qc as qc_run
-    required = request.get_json() or {}
-    required_cols = required.get("required_columns", [])
-    result = qc_run(recs, required_columns=required_cols)
-    return jsonify(result)
+    from services.workers import run_qc as qc
+    payload, status = qc(dataset_id, request.get_json(silent=True) or {})
+    return jsonify(payload), status
 
 
 @app.route("/api/compute-metrics", methods=["POST"])
 def compute_metrics():
     """
-    Compute metrics for a dataset. Body: dataset_id, model_type, optional baseline_scores.
+    Compute metrics for a dataset. Body: dataset_id, model_type, optional baseline_scores
+    (+ baseline_weights). Rows are weighted by weight_column (default: a sample_weight or weight
+    column if present), e.g. inverse sampling rates for downsampled data. out_of_core (default:
+    above MM_OUT_OF_CORE_ROWS rows) computes from a chunked score histogram. ML models also get explainability from the numeric feature columns (optional
+    feature_columns, explain_sample_size). segment_columns (default: a `segment` column if
+    present) stores a group-by segment breakdown with the record.
     For prototype we append to metrics_store with model metadata from dataset.
     """
-    body = request.get_json() or {}
-    dataset_id = body.get("dataset_id")
-    model_type = body.get("model_type")
-    from store import datasets_store, save_metrics
-    if not dataset_id or dataset_id not in datasets_store:
-        return jsonify({"error": "dataset_id not found"}), 404
-    ds = datasets_store[dataset_id]
-    meta = ds["metadata"]
-    data = ds.get("scored_data") or []
-    if not data or not isinstance(data, list):
-        return jsonify({"error": "no scored data"}), 400
-    # Expect records with 'target' and 'score' or 'probability'
-    import numpy as np
-    y_true = np.array([r.get("target", r.get("y", 0)) for r in data])
-    y_score = np.array([r.get("score", r.get("probability", 0.5)) for r in data])
-    baseline = body.get("baseline_scores")
-    y_baseline = np.array(baseline) if baseline else None
-    model_type = model_type or meta.get("model_type", "Acquisition Scorecard")
-    if model_type in ("Acquisition Scorecard", "ECM Scorecard", "Bureau", "ML"):
-        from metrics.scorecard_metrics import compute_scorecard_metrics
-        metrics = compute_scorecard_metrics(y_true, y_score, y_baseline)
-    elif model_type == "Fraud":
-        from metrics.fraud_metrics import compute_fraud_metrics
-        metrics = compute_fraud_metrics(y_true, y_score, y_baseline_proba=y_baseline)
-    elif model_type == "Collections":
-        from metrics.collections_metrics import compute_collections_metrics
-        metrics = compute_collections_metrics()
-    else:
-        from metrics.scorecard_metrics import compute_scorecard_metrics
-        metrics = compute_scorecard_metrics(y_true, y_score, y_baseline)
-    from datetime import datetime
-    record = {
-        "model_id": meta.get("model_id", "unknown"),
-        "portfolio": meta.get("portfolio", ""),
-        "model_type": model_type,
-        "vintage": meta.get("vintage", ""),
-        "computed_at": datetime.utcnow().isoformat() + "Z",
-        "metrics": metrics,
-        "volume": len(data),
-    }
-    save_metrics(record)
-    return jsonify(record)
+    from services.workers import compute_metrics as compute
+    payload, status = compute(request.get_json() or {})
+    return jsonify(payload), status
+
+
+@app.route("/api/pipelines", methods=["GET", "POST"])
+def pipelines():
+    """
+    GET: monitoring pipelines (query: model_id). POST: create/replace one (body: model_id,
+    pipeline_id, schedule (cron), on_dataset, source, vintage, steps or dag, retries,
+    required_columns, options).
+    """
+    from store import get_pipelines, save_pipeline
+    if request.method == "GET":
+        return jsonify({"pipelines": get_pipelines(request.args.get("model_id") or None)})
+    from services.monitoring import StepError
+    from services.scheduler import make_pipeline
+    try:
+        pipeline = make_pipeline(request.get_json() or {})
+    except StepError as e:
+        return jsonify({"error": str(e)}), e.status
+    return jsonify(save_pipeline(pipeline)), 201
+
+
+@app.route("/api/pipelines/<pipeline_id>", methods=["DELETE"])
+def delete_pipeline(pipeline_id):
+    from store import delete_pipeline as store_delete_pipeline
+    if not store_delete_pipeline(pipeline_id):
+        return jsonify({"error": "pipeline not found"}), 404
+    return jsonify({"pipeline_id": pipeline_id, "status": "deleted"})
+
+
+@app.route("/api/pipelines/<pipeline_id>/run", methods=["POST"])
+def run_pipeline(pipeline_id):
+    """Queue a run now (body: optional dataset_id, force to ignore unchanged-input skipping)."""
+    body = request.get_json(silent=True) or {}
+    from store import queue_pipeline_run
+    queued = queue_pipeline_run(pipeline_id, "manual", dataset_id=body.get("dataset_id"), force=bool(body.get("force")))
+    if queued is None:
+        return jsonify({"error": "pipeline not found"}), 404
+    return jsonify(queued), 202
+
+
+@app.route("/api/pipelines/runs", methods=["GET"])
+def pipeline_runs():
+    """Run history, newest first (query: pipeline_id, model_id, status, limit, cursor)."""
+    from store import get_pipeline_runs
+    from services.responses import paginate
+    runs = get_pipeline_runs(
+        pipeline_id=request.args.get("pipeline_id") or None,
+        model_id=request.args.get("model_id") or None,
+        status=request.args.get("status") or None,
+    )
+    try:
+        page, next_cursor = paginate(runs, request.args.get("limit"), request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"runs": page, "next_cursor": next_cursor})
+
+
+@app.route("/api/pipelines/runs/<run_id>", methods=["GET"])
+def pipeline_run(run_id):
+    """
+    One run (status "queued" until the scheduler starts it). Long poll: wait=<seconds> (up to
+    MAX_RUN_WAIT_S) returns as soon as the run has finished, or its current state at the deadline.
+    """
+    import time
+    from store import get_pipeline_run
+    from services.scheduler import FINISHED_STATUSES, MAX_RUN_WAIT_S, RUN_POLL_INTERVAL_S
+    deadline = time.monotonic() + min(max(request.args.get("wait", default=0.0, type=float), 0.0), MAX_RUN_WAIT_S)
+    run = get_pipeline_run(run_id)
+    while run is not None and run["status"] not in FINISHED_STATUSES and time.monotonic() < deadline:
+        time.sleep(RUN_POLL_INTERVAL_S)
+        run = get_pipeline_run(run_id)
+    if run is None:
+        return jsonify({"error": "run not found"}), 404
+    return jsonify(run)
+
+
+@app.route("/api/pipelines/step-durations", methods=["GET"])
+def pipeline_step_durations():
+    """Per-step duration stats over run history, slowest total first (query: pipeline_id, model_id)."""
+    from store import get_pipeline_runs
+    from services.scheduler import step_duration_stats
+    runs = get_pipeline_runs(
+        pipeline_id=request.args.get("pipeline_id") or None,
+        model_id=request.args.get("model_id") or None,
+    )
+    return jsonify({"runs": len(runs), "steps": step_duration_stats(runs)})
+
+
+@app.route("/api/alerts", methods=["GET"])
+def alerts():
+    """Raised alerts (RAG status changes), newest first (query: model_id, status, limit, cursor)."""
+    from store import get_alerts
+    from services.responses import paginate
+    rows = get_alerts(model_id=request.args.get("model_id") or None, status=request.args.get("status") or None)
+    try:
+        page, next_cursor = paginate(rows, request.args.get("limit"), request.args.get("cursor"))
+    except ValueError:
+        return jsonify({"error": "invalid limit or cursor"}), 400
+    return jsonify({"alerts": page, "next_cursor": next_cursor})
+
+
+@app.route("/api/alerts/state", methods=["GET"])
+def alert_state():
+    """Current RAG status per model/segment with counts, engine counters and configured sinks."""
+    from store import get_alert_state
+    return jsonify(get_alert_state())
+
+
+@app.route("/api/alerts/rules", methods=["GET", "PUT"])
+def alert_rules():
+    """GET: RAG threshold rules per model type. PUT: replace rules for the model types in the body."""
+    from store import get_alert_rules, set_alert_rules
+    if request.method == "GET":
+        return jsonify(get_alert_rules())
+    try:
+        return jsonify(set_alert_rules(request.get_json() or {}))
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({"error": f"invalid rules: {e}"}), 400
 
 
 @app.route("/api/dataset/<dataset_id>", methods=["GET"])
 def get_dataset(dataset_id):
     """Get dataset status for workflow UI (metadata, qc_status, has_scores)."""
-    from store import datasets_store
-    if dataset_id not in datasets_store:
+    from store import get_dataset as store_get_dataset, get_dataset_columns
+    ds = store_get_dataset(dataset_id)
+    if ds is None:
         return jsonify({"error": "dataset not found"}), 404
-    ds = datasets_store[dataset_id]
-    data = ds.get("scored_data") or []
-    has_scores = (
-        isinstance(data, list)
-        and len(data) > 0
-        and any(
-            r.get("score") is not None or r.get("probability") is not None
-            for r in (data[:100] if len(data) > 100 else data)
-        )
+    columns = get_dataset_columns(dataset_id) or {}
+    has_scores = any(
+        name in columns and columns[name].dtype.kind in "biuf"
+        and bool((~np.isnan(np.asarray(columns[name][:100], dtype=float))).any())
+        for name in ("score", "probability")
     )
     return jsonify({
         "dataset_id": dataset_id,
         "metadata": ds.get("metadata", {}),
         "qc_status": ds.get("qc_status", "pending"),
-        "row_count": len(data) if isinstance(data, list) else 0,
+        "row_count": ds.get("row_count", 0),
         "has_scores": has_scores,
     })
 
 
+@app.route("/api/dataset/<dataset_id>/rows", methods=["POST"])
+def append_dataset_rows(dataset_id):
+    """
+    Delta ingestion: append rows (body: data, list of records with their scores). refresh (default
+    true) recomputes the dataset's metrics with its last compute-metrics options, incrementally
+    where the stored score histogram allows.
+    """
+    from services.workers import append_rows
+    payload, status = append_rows(dataset_id, request.get_json() or {})
+    return jsonify(payload), status
+
+
+@app.route("/api/dataset/<dataset_id>/target", methods=["PATCH"])
+def update_dataset_target(dataset_id):
+    """
+    Late labels: set the target of existing rows by key (body: key_column, default id; updates,
+    list of { <key_column>, target }; refresh as for appended rows).
+    """
+    from services.workers import update_target
+    payload, status = update_target(dataset_id, request.get_json() or {})
+    return jsonify(payload), status
+
+
+@app.route("/api/reports", methods=["GET", "POST"])
+def reports():
+    """
+    GET: report export jobs, newest first, and the available formats. POST: start a bulk export
+    of monitoring packs, rendered in the background (body: model_ids, or portfolio / model_type;
+    vintage; formats: csv, parquet, xlsx, pdf, png). Poll GET /api/reports/<report_id>.
+    """
+    from services.reports import available_formats, create_report
+    if request.method == "GET":
+        from store import get_report_jobs
+        return jsonify({"reports": get_report_jobs(), "formats": available_formats()})
+    from services.monitoring import StepError
+    try:
+        job = create_report(request.get_json(silent=True) or {})
+    except StepError as e:
+        return jsonify({"error": str(e)}), e.status
+    return jsonify(job), 202
+
+
+@app.route("/api/reports/<report_id>", methods=["GET"])
+def report_status(report_id):
+    """A report export job: status (queued, running, succeeded, failed) and progress."""
+    from store import get_report_job
+    job = get_report_job(report_id)
+    if job is None:
+        return jsonify({"error": "report not found"}), 404
+    return jsonify(job)
+
+
+@app.route("/api/reports/<report_id>/download", methods=["GET"])
+def report_download(report_id):
+    """The finished report as a zip (streamed from disk)."""
+    from flask import send_file
+    from store import get_report_job
+    from services.reports import report_path
+    job = get_report_job(report_id)
+    if job is None:
+        return jsonify({"error": "report not found"}), 404
+    if job["status"] != "succeeded":
+        return jsonify({"error": f"report is {job['status']}"}), 409
+    path = report_path(report_id)
+    if not path.is_file():
+        return jsonify({"error": "report file no longer available"}), 404
+    return send_file(path, mimetype="application/zip", as_attachment=True, download_name=f"monitoring_report_{report_id}.zip")
+
+
 @app.route("/api/chat", methods=["POST"])
 def chat():
     """
@@ -264,192 +780,8 @@ def chat():
     message = (body.get("message") or "").strip()
     if not message:
         return jsonify({"error": "message required"}), 400
-
-    from store import get_metrics, get_models, get_filter_options
-    import os
-
-    # Build context from store for the bot
-    metrics = get_metrics()
-    models = get_models()
-    options = get_filter_options()
-
-    # Portfolio-level counts
-    by_portfolio = {}
-    for m in metrics:
-        port = m.get("portfolio") or "Other"
-        by_portfolio[port] = by_portfolio.get(port, 0) + 1
-
-    def status_from_metrics(m):
-        ks = m.get("metrics", {}).get("KS")
-        psi = m.get("metrics", {}).get("PSI")
-        if ks is None:
-            ks = 0
-        if psi is None:
-            psi = 1
-        if ks >= 0.3 and psi < 0.2:
-            return "green"
-        if ks >= 0.2 and psi < 0.25:
-            return "amber"
-        return "red"
-
-    status_counts = {"green": 0, "amber": 0, "red": 0}
-    by_status = {"green": [], "amber": [], "red": []}
-    by_portfolio_status = {}
-    for m in metrics:
-        s = status_from_metrics(m)
-        status_counts[s] += 1
-        by_status[s].append(m.get("model_id"))
-        port = m.get("portfolio") or "Other"
-        if port not in by_portfolio_status:
-            by_portfolio_status[port] = {"green": 0, "amber": 0, "red": 0}
-        by_portfolio_status[port][s] += 1
-
-    models_with_metrics = {}
-    for m in metrics:
-        mid = m.get("model_id")
-        if mid and (mid not in models_with_metrics or (m.get("vintage") or "") > (models_with_metrics[mid].get("vintage") or "")):
-            models_with_metrics[mid] = m
-
-    context = {
-        "total_metrics_rows": len(metrics),
-        "total_models": len(models),
-        "portfolios": list(options.get("portfolios", [])),
-        "model_types": list(options.get("model_types", [])),
-        "by_portfolio_count": by_portfolio,
-        "status_counts": status_counts,
-        "by_status_models": {k: list(set(v)) for k, v in by_status.items()},
-        "by_portfolio_status": by_portfolio_status,
-        "models_with_metrics": [
-            {"model_id": m.get("model_id"), "portfolio": m.get("portfolio"), "model_type": m.get("model_type"),
-             "vintage": m.get("vintage"), "KS": m.get("metrics", {}).get("KS"), "PSI": m.get("metrics", {}).get("PSI"),
-             "status": status_from_metrics(m)}
-            for m in list(models_with_metrics.values())[:20]
-        ],
-    }
-
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if api_key:
-        try:
-            from openai import OpenAI
-            client = OpenAI(api_key=api_key)
-            system = (
-                "You are an expert Model Performance assistant for a banking model monitoring dashboard. "
-                "Answer clearly and concisely using the context below. Be specific with numbers when available.\n\n"
-                "Metrics: KS = Kolmogorov-Smirnov (discrimination, higher better). "
-                "PSI = Population Stability Index (score stability, lower better). "
-                "RAG: Green = KS >= 0.3 and PSI < 0.2; Amber = KS 0.2-0.3 or PSI 0.2-0.25; Red = needs attention.\n\n"
-                "Context:\n" + str(context)
-            )
-            resp = client.chat.completions.create(
-                model=os.environ.get("OPENAI_CHAT_MODEL", "gpt-4o-mini"),
-                messages=[
-                    {"role": "system", "content": system},
-                    {"role": "user", "content": message},
-                ],
-                max_tokens=500,
-            )
-            reply = (resp.choices[0].message.content or "").strip()
-            return jsonify({"reply": reply})
-        except ImportError:
-            reply = _rule_based_reply(message, context)
-            return jsonify({"reply": reply})
-        except Exception as e:
-            return jsonify({"reply": f"I couldn't use the AI service: {e}. Here's a quick answer from the data: " + _rule_based_reply(message, context)})
-
-    reply = _rule_based_reply(message, context)
-    return jsonify({"reply": reply})
-
-
-def _rule_based_reply(message: str, context: dict) -> str:
-    """Generate an intuitive reply from context without an LLM."""
-    q = message.lower().strip()
-    total = context.get("total_metrics_rows", 0)
-    models_count = context.get("total_models", 0)
-    status = context.get("status_counts", {})
-    by_port = context.get("by_portfolio_count", {})
-    by_status_models = context.get("by_status_models", {})
-    by_port_status = context.get("by_portfolio_status", {})
-    models_list = context.get("models_with_metrics", [])
-
-    g, a, r = status.get("green", 0), status.get("amber", 0), status.get("red", 0)
-    total_status = g + a + r
-
-    if not q or q in ("hi", "hello", "hey"):
-        return (
-            f"Hi! I'm your model performance assistant. There are {models_count} models in the current view. "
-            f"Status: {g} Green, {a} Amber, {r} Red. "
-            "Ask me: 'Which models need attention?', 'What is KS?', 'Compare portfolio performance', or 'How does RAG work?'"
-        )
-    if "help" in q or "what can" in q or "suggest" in q:
-        return (
-            "I can help with:\n"
-            "• **Status** – Which models are Green/Amber/Red, or need attention\n"
-            "• **Metrics** – What KS, PSI, and RAG thresholds mean\n"
-            "• **Portfolios** – Compare performance across Retail, Corporate, SME\n"
-            "• **Trends** – Use the Analysis tab for Volume, KS, and PSI deep dives\n"
-            "Try: 'Which models are red?', 'Explain RAG status', or 'Retail portfolio health'"
-        )
-    if ("how many" in q or "count" in q) and ("model" in q or "metric" in q):
-        return f"There are **{models_count} models** and {total} metric records. Status: {g} Green, {a} Amber, {r} Red. Use Filters to narrow by portfolio or vintage."
-    if "which" in q and ("red" in q or "attention" in q or "need" in q or "problem" in q):
-        red_list = by_status_models.get("red", [])
-        if red_list:
-            return f"Models needing attention (Red): {', '.join(red_list[:10])}{'...' if len(red_list) > 10 else ''}. These have KS < 0.2 or PSI > 0.25. Use the Analysis tab for decile and variable-level deep dives."
-        return "No Red models in the current view. All models are Green or Amber."
-    if "which" in q and ("amber" in q or "review" in q):
-        amber_list = by_status_models.get("amber", [])
-        if amber_list:
-            return f"Models under review (Amber): {', '.join(amber_list[:10])}. These have KS 0.2–0.3 or PSI 0.2–0.25. Check the Summary table and Analysis tab for details."
-        return "No Amber models. All are Green or Red."
-    if "portfolio" in q and ("list" in q or "which" in q or "what" in q or "all" in q):
-        ports = context.get("portfolios", [])
-        return f"Portfolios: {', '.join(ports) if ports else 'None'}." + (
-            f"\n\nPer-portfolio status: " + ", ".join(
-                f"{p}: {s.get('green', 0)}G/{s.get('amber', 0)}A/{s.get('red', 0)}R"
-                for p, s in by_port_status.items()
-            ) if by_port_status else ""
-        )
-    if "compare" in q and "portfolio" in q:
-        if not by_port_status:
-            return "No portfolio-level data available. Apply Filters and try again."
-        lines = [f"**{port}**: Green {s.get('green', 0)}, Amber {s.get('amber', 0)}, Red {s.get('red', 0)}" for port, s in by_port_status.items()]
-        return "Portfolio RAG comparison:\n" + "\n".join(lines)
-    if "rag" in q or ("status" in q and ("meaning" in q or "mean" in q or "work" in q)):
-        return (
-            "**RAG status** (Red–Amber–Green):\n"
-            "• **Green**: KS ≥ 0.3 and PSI < 0.2 — healthy discrimination and stable scores\n"
-            "• **Amber**: KS 0.2–0.3 or PSI 0.2–0.25 — review recommended\n"
-            "• **Red**: KS < 0.2 or PSI > 0.25 — needs attention\n"
-            f"Current view: {g} Green, {a} Amber, {r} Red."
-        )
-    if "green" in q or "amber" in q or "red" in q:
-        return f"RAG breakdown: **Green {g}**, **Amber {a}**, **Red {r}**. Green = good; Amber = review; Red = attention needed. Use the Portfolio pie chart and Summary for details."
-    if "ks" in q or "kolmogorov" in q:
-        return "**KS (Kolmogorov-Smirnov)** measures how well the model separates good vs bad. Higher is better (≥ 0.3 = Green). See the Summary table and Analysis tab for trend charts."
-    if "psi" in q or "stability" in q or "population stability" in q:
-        return "**PSI (Population Stability Index)** measures score drift vs baseline. Lower is better (< 0.2 = Green; > 0.25 = Red). Use Variable-level stability for per-variable PSI."
-    if "retail" in q or "corporate" in q or "sme" in q:
-        for port, count in by_port.items():
-            if port.lower() in q[:6]:
-                s = by_port_status.get(port, {})
-                return f"**{port}** has {count} metric records. Status: {s.get('green', 0)} Green, {s.get('amber', 0)} Amber, {s.get('red', 0)} Red."
-        return f"Portfolios: {dict(by_port)}. Select one in Filters to see its status."
-    if "status" in q or "health" in q:
-        return f"Overall model health: **Green {g}**, **Amber {a}**, **Red {r}**. Green = healthy; Red = needs action. Check the Portfolio summary pie chart for the distribution."
-    if "trend" in q or "volume" in q or "decile" in q:
-        return "For Volume, KS, and PSI trends, open the **Analysis** tab. Select a model and click Load analysis to see charts, decile-level KS reasons, and variable-level PSI."
-    if "best" in q or "worst" in q:
-        if models_list:
-            by_ks = sorted(models_list, key=lambda x: (x.get("KS") or 0), reverse=True)
-            best = by_ks[0] if by_ks else {}
-            worst = by_ks[-1] if by_ks else {}
-            return f"By KS: Best = {best.get('model_id', '?')} (KS {best.get('KS', '–')}); Worst = {worst.get('model_id', '?')} (KS {worst.get('KS', '–')}). Use Summary or Analysis for full details."
-        return "Insufficient data to rank. Apply Filters and ensure metrics are loaded."
-    return (
-        f"I have data for {models_count} models ({g} Green, {a} Amber, {r} Red). "
-        "Try: 'Which models need attention?', 'What is RAG?', 'Compare portfolios', or 'Explain KS and PSI'. "
-        "For trend and decile analysis, use the Analysis tab."
-    )
+    from services.chat import build_context, reply
+    return jsonify({"reply": reply(message, build_context())})
 
 
 @app.route("/api/score-dataset/<dataset_id>", methods=["POST"])
@@ -458,34 +790,15 @@ def score_dataset(dataset_id):
     Mock scoring: if records have target/y but no score/probability,
     add a synthetic score so compute-metrics can run. (Prototype only.)
     """
-    from store import datasets_store
-    import random
-    if dataset_id not in datasets_store:
-        return jsonify({"error": "dataset not found"}), 404
-    ds = datasets_store[dataset_id]
-    data = ds.get("scored_data") or []
-    if not isinstance(data, list) or not data:
-        return jsonify({"error": "no data to score"}), 400
-    updated = []
-    random.seed(hash(dataset_id) % (2**32))
-    for r in list(data):
-        rec = dict(r)
-        if rec.get("score") is None and rec.get("probability") is None:
-            t = rec.get("target", rec.get("y", 0))
-            # Mock: score slightly higher for target=1
-            rec["score"] = round(0.3 + 0.4 * t + random.random() * 0.3, 4)
-            rec["probability"] = rec["score"]
-        updated.append(rec)
-    ds["scored_data"] = updated
-    return jsonify({
-        "dataset_id": dataset_id,
-        "status": "scored",
-        "row_count": len(updated),
-    })
+    from services.workers import score_dataset as score
+    payload, status = score(dataset_id)
+    return jsonify(payload), status
 
 
 if __name__ == "__main__":
     import os
+    from services.scheduler import start_scheduler
+    start_scheduler()
     port = int(os.environ.get("PORT", 5000))
     debug = os.environ.get("FLASK_ENV", "development") != "production"
     app.run(host="0.0.0.0", port=port, debug=debug)
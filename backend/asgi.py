@@ -0,0 +1,170 @@
+"""
+ASGI serving mode:  python backend/asgi.py   (or: uvicorn --app-dir backend asgi:app)
+
+The I/O-bound endpoints run natively on the event loop: /api/chat awaits the LLM, uploads to
+/api/ingest and the delta/QC/compute/score routes are received without holding a thread, and
+GET /api/pipelines/runs/<run_id>?wait= long-polls with asyncio.sleep. The CPU-bound part of
+those requests (JSON parsing, ingestion, metrics) runs on a process pool of MM_ASGI_PROCESSES
+workers (default: CPU count). Every other route is served by the Flask app (app.py), mounted
+unchanged, so paths and response shapes match the WSGI deployment.
+
+Pool processes share the store through the store server (store_server.py): one is started here
+unless MM_STORE_ADDRESS names a running one.
+"""
+
+import asyncio
+import atexit
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+PROCESSES = int(os.environ.get("MM_ASGI_PROCESSES", str(os.cpu_count() or 1)))
+WSGI_THREADS = int(os.environ.get("MM_ASGI_WSGI_THREADS", "16"))
+
+
+def _ensure_store_server() -> None:
+    if os.environ.get("MM_STORE_ADDRESS"):
+        return
+    os.environ["MM_STORE_ADDRESS"] = str(Path(tempfile.gettempdir()) / f"model_monitoring_store_{os.getpid()}.sock")
+    from store_server import start_in_background
+    proc = start_in_background(os.environ["MM_STORE_ADDRESS"])
+    atexit.register(lambda: proc.poll() is None and proc.terminate())
+
+
+# Before importing the Flask app, so that it (and every pool process) uses the store server
+_ensure_store_server()
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+from app import app as flask_app
+from services.chat import areply, build_context
+from services.responses import encode_body
+from services.scheduler import FINISHED_STATUSES, MAX_RUN_WAIT_S, RUN_POLL_INTERVAL_S
+from services.workers import run_handler
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _json(request: Request, payload, status: int = 200) -> Response:
+    """JSON response encoded, compressed and CORS-tagged as the Flask app sends it."""
+    data = f"{flask_app.json.dumps(payload, separators=(',', ':'))}\n".encode()
+    headers = {}
+    if 200 <= status < 300:
+        data, encoding = encode_body(data, request.headers.get("accept-encoding", ""))
+        if encoding:
+            headers.update({"Content-Encoding": encoding, "Vary": "Accept-Encoding"})
+    origin = request.headers.get("origin")
+    headers.update({"Access-Control-Allow-Origin": origin or "*", "Access-Control-Expose-Headers": "ETag, X-Next-Cursor"})
+    if origin:
+        headers["Vary"] = ", ".join(filter(None, [headers.get("Vary"), "Origin"]))
+    return Response(data, status_code=status, headers=headers, media_type="application/json")
+
+
+async def _offload(request: Request, handler: str, *args) -> Response:
+    """Receive the body on the event loop, then parse and handle it on the process pool."""
+    raw = await request.body()
+    loop = asyncio.get_running_loop()
+    payload, status = await loop.run_in_executor(_pool, run_handler, handler, raw, *args)
+    return _json(request, payload, status)
+
+
+async def chat(request: Request) -> Response:
+    try:
+        body = json.loads(await request.body() or b"{}")
+    except ValueError:
+        return _json(request, {"error": "invalid JSON body"}, 400)
+    message = ((body if isinstance(body, dict) else {}).get("message") or "").strip()
+    if not message:
+        return _json(request, {"error": "message required"}, 400)
+    context = await run_in_threadpool(build_context)
+    return _json(request, {"reply": await areply(message, context)})
+
+
+async def ingest(request: Request) -> Response:
+    return await _offload(request, "ingest", dict(request.query_params))
+
+
+async def run_qc(request: Request) -> Response:
+    return await _offload(request, "qc", request.path_params["dataset_id"])
+
+
+async def compute_metrics(request: Request) -> Response:
+    return await _offload(request, "compute_metrics")
+
+
+async def score_dataset(request: Request) -> Response:
+    return await _offload(request, "score", request.path_params["dataset_id"])
+
+
+async def append_rows(request: Request) -> Response:
+    return await _offload(request, "append_rows", request.path_params["dataset_id"])
+
+
+async def update_target(request: Request) -> Response:
+    return await _offload(request, "update_target", request.path_params["dataset_id"])
+
+
+async def pipeline_run(request: Request) -> Response:
+    """Run status; ?wait=<seconds> holds the connection (not a thread) until the run finishes."""
+    from store import get_pipeline_run
+    run_id = request.path_params["run_id"]
+    try:
+        wait = float(request.query_params.get("wait") or 0)
+    except ValueError:
+        wait = 0.0
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + min(max(wait, 0.0), MAX_RUN_WAIT_S)
+    run = await run_in_threadpool(get_pipeline_run, run_id)
+    while run is not None and run["status"] not in FINISHED_STATUSES and loop.time() < deadline:
+        await asyncio.sleep(RUN_POLL_INTERVAL_S)
+        run = await run_in_threadpool(get_pipeline_run, run_id)
+    if run is None:
+        return _json(request, {"error": "run not found"}, 404)
+    return _json(request, run)
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    global _pool
+    _pool = ProcessPoolExecutor(max_workers=PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        yield
+    finally:
+        _pool.shutdown(cancel_futures=True)
+
+
+app = Starlette(
+    routes=[
+        Route("/api/chat", chat, methods=["POST"]),
+        Route("/api/ingest", ingest, methods=["POST"]),
+        Route("/api/qc/{dataset_id}", run_qc, methods=["POST"]),
+        Route("/api/compute-metrics", compute_metrics, methods=["POST"]),
+        Route("/api/score-dataset/{dataset_id}", score_dataset, methods=["POST"]),
+        Route("/api/dataset/{dataset_id}/rows", append_rows, methods=["POST"]),
+        Route("/api/dataset/{dataset_id}/target", update_target, methods=["PATCH"]),
+        Route("/api/pipelines/runs/{run_id}", pipeline_run, methods=["GET"]),
+        # Everything else (and CORS preflights for the routes above) goes to Flask
+        Mount("/", WSGIMiddleware(flask_app, workers=WSGI_THREADS)),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.environ.get("HOST", "0.0.0.0"), port=int(os.environ.get("PORT", 5000)))
@@ -0,0 +1,184 @@
+"""
+Benchmark: concurrent slow connections against the gunicorn (sync WSGI) and ASGI serving modes.
+
+Run from the project root:  python backend/benchmarks/asgi_capacity.py --connections 200 --wait 2
+Starts each server in turn on a local port (scheduler disabled, so a queued run never finishes),
+then opens --connections concurrent long polls on GET /api/pipelines/runs/<run_id>?wait=<wait>
+(each holds its connection for the full wait) and, separately, as many uploads to /api/ingest
+trickled over --upload-seconds. Meanwhile /health is probed every 100 ms. Prints completion
+time, request latency and probe latency per mode and scenario.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+MODEL_ID = "BENCH-ASGI-001"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--wait", type=float, default=2.0, help="long-poll wait per request (seconds)")
+    parser.add_argument("--upload-seconds", type=float, default=2.0, help="time each upload takes to send")
+    parser.add_argument("--upload-rows", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers (WEB_CONCURRENCY)")
+    parser.add_argument("--processes", type=int, default=2, help="ASGI process pool (MM_ASGI_PROCESSES)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="give up on a scenario after this long")
+    parser.add_argument("--modes", default="wsgi,asgi")
+    args = parser.parse_args()
+
+    rows = [{"id": i, "target": int(i % 9 == 0), "score": round(i / args.upload_rows, 4)} for i in range(args.upload_rows)]
+    upload = json.dumps({"data": rows}).encode()
+    for mode in args.modes.split(","):
+        port = _free_port()
+        server = _start(mode, port, args)
+        try:
+            _wait_healthy(port)
+            run_id = _queue_run(port)
+            poll = f"/api/pipelines/runs/{run_id}?wait={args.wait}"
+            ingest = f"/api/ingest?portfolio=Retail&model_type=Bureau&model_id={MODEL_ID}&vintage=2025-01"
+            for scenario, request in (
+                ("long-poll", lambda: _request(port, "GET", poll)),
+                ("slow upload", lambda: _request(port, "POST", ingest, upload, trickle=args.upload_seconds)),
+            ):
+                result = asyncio.run(_scenario(port, request, args.connections, args.timeout))
+                _report(mode, scenario, args.connections, result)
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def _start(mode: str, port: int, args) -> subprocess.Popen:
+    env = dict(os.environ, MM_SCHEDULER="0")
+    env.pop("MM_STORE_ADDRESS", None)
+    if mode == "wsgi":
+        env.update(BIND=f"127.0.0.1:{port}", WEB_CONCURRENCY=str(args.workers))
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--log-level", "warning", "backend.app:app"]
+    elif mode == "asgi":
+        env.update(HOST="127.0.0.1", PORT=str(port), MM_ASGI_PROCESSES=str(args.processes))
+        cmd = [sys.executable, "backend/asgi.py"]
+    else:
+        raise SystemExit(f"unknown mode {mode!r} (wsgi or asgi)")
+    return subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _http(port: int, method: str, path: str, body: dict | None = None) -> dict:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}{path}", data=data, method=method, headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return json.loads(resp.read())
+
+
+def _wait_healthy(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _http(port, "GET", "/health")
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def _queue_run(port: int) -> str:
+    """A run that stays queued (the scheduler is off), so every long poll waits its full time."""
+    _http(port, "POST", "/api/pipelines", {"model_id": MODEL_ID})
+    return _http(port, "POST", f"/api/pipelines/{MODEL_ID}-monitoring/run", {})["run_id"]
+
+
+async def _request(port: int, method: str, path: str, body: bytes = b"", trickle: float = 0.0) -> int:
+    """One HTTP/1.1 request on its own connection; the body is sent in 10 pieces over trickle seconds."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        )
+        if trickle and body:
+            step = -(-len(body) // 10)
+            for i in range(0, len(body), step):
+                writer.write(body[i:i + step])
+                await writer.drain()
+                await asyncio.sleep(trickle / 10)
+        else:
+            writer.write(body)
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def _scenario(port: int, request, connections: int, timeout: float) -> dict:
+    latencies: list[float] = []
+    statuses: dict = {}
+    probes: list[float] = []
+    done = asyncio.Event()
+
+    async def one():
+        start = time.perf_counter()
+        try:
+            status = await request()
+        except (OSError, ValueError, IndexError) as e:
+            status = type(e).__name__
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(_request(port, "GET", "/health"), timeout)
+            except (OSError, asyncio.TimeoutError):
+                pass
+            probes.append(time.perf_counter() - start)
+            await asyncio.sleep(0.1)
+
+    prober = asyncio.create_task(probe())
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(one()) for _ in range(connections)]
+    finished, pending = await asyncio.wait(tasks, timeout=timeout)
+    elapsed = time.perf_counter() - start
+    for task in pending:
+        task.cancel()
+    done.set()
+    await prober
+    return {"elapsed": elapsed, "latencies": latencies, "statuses": statuses, "probes": probes, "timed_out": len(pending)}
+
+
+def _report(mode: str, scenario: str, connections: int, result: dict) -> None:
+    lat = np.asarray(result["latencies"] or [0.0])
+    probes = np.asarray(result["probes"] or [0.0]) * 1000
+    print(
+        f"{mode:<5} {scenario:<12} {connections} connections in {result['elapsed']:6.2f}s  "
+        f"statuses {result['statuses']}" + (f"  timed out {result['timed_out']}" if result["timed_out"] else "")
+    )
+    print(
+        f"      request p50 {np.percentile(lat, 50):6.2f}s  p99 {np.percentile(lat, 99):6.2f}s   "
+        f"/health p50 {np.percentile(probes, 50):8.1f}ms  p99 {np.percentile(probes, 99):8.1f}ms  max {probes.max():8.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
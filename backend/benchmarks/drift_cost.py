@@ -0,0 +1,71 @@
+"""
+Benchmark: cost of the drift engine on top of the score histogram, and its robustness to outliers.
+
+Run from the project root:  python backend/benchmarks/drift_cost.py --rows 5000000 --baseline-rows 500000
+Times the score histogram that compute-metrics builds for every record, then score_drift read off
+it (binned and exact) next to calculate_psi on the rows. Then moves a small share of current
+scores far out (--outlier-share) and prints equal-width PSI next to the drift metrics.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import numpy as np
+
+from metrics.drift import score_drift
+from metrics.psi import calculate_psi
+from metrics.streaming import ScoreHistogram
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--baseline-rows", type=int, default=500_000)
+    parser.add_argument("--decimals", type=int, default=4, help="round scores (model scores usually are)")
+    parser.add_argument("--outlier-share", type=float, default=0.0005)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    # Fraud-like scores: most mass near 0, a long right tail, and a mild shift in the current vintage
+    baseline = np.round(rng.beta(0.6, 12.0, args.baseline_rows), args.decimals)
+    y = (rng.random(args.rows) < 0.02).astype(np.int64)
+    current = np.round(np.clip(rng.beta(0.6, 11.0, args.rows) + 0.3 * y * rng.random(args.rows), 0, 1), args.decimals)
+
+    hist, t_hist = _timed(lambda: ScoreHistogram().add(y, current))
+    counts = hist.pos + hist.neg
+    print(f"rows={args.rows:,}  baseline={args.baseline_rows:,}  distinct current scores={len(hist.values):,}")
+    print(f"  score histogram (built per record anyway)   {t_hist:8.3f}s")
+    for label, fn in (
+        ("calculate_psi on the rows", lambda: calculate_psi(baseline, current)),
+        ("score_drift from the histogram", lambda: score_drift(baseline, hist.values, current_weight=counts)),
+        ("score_drift exact, from the histogram", lambda: score_drift(baseline, hist.values, current_weight=counts, exact=True)),
+        ("score_drift exact, on the rows", lambda: score_drift(baseline, current, exact=True)),
+    ):
+        out, elapsed = _timed(fn)
+        print(f"  {label:<44}{elapsed:8.3f}s  ({100 * elapsed / t_hist:5.1f}% of histogram)  {out}")
+
+    shifted = current.copy()
+    n_out = max(1, int(args.rows * args.outlier_share))
+    shifted[rng.choice(args.rows, n_out, replace=False)] = 25.0  # e.g. unscaled scores leaking into the feed
+    print(f"\n{n_out:,} current scores ({100 * args.outlier_share:.3f}%) moved to 25.0:")
+    print(f"  equal-width PSI     clean {calculate_psi(baseline, current):8.4f}   with outliers {calculate_psi(baseline, shifted):8.4f}")
+    clean, dirty = score_drift(baseline, current), score_drift(baseline, shifted)
+    for name in ("psi", "ks_statistic", "js_divergence", "wasserstein"):
+        print(f"  drift {name:<14}clean {clean[name]:8.4f}   with outliers {dirty[name]:8.4f}")
+
+
+if __name__ == "__main__":
+    main()
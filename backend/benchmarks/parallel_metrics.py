@@ -0,0 +1,69 @@
+"""
+Benchmark: serial argsort metrics vs the multi-threaded histogram path on one large dataset.
+
+Run from the project root:  python backend/benchmarks/parallel_metrics.py --rows 20000000 --workers 1,4,16,32
+Prints wall time per path and checks that KS / AUC / deciles agree with the serial path.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import numpy as np
+
+from metrics.curves import build_curve_basis
+from metrics.scorecard_metrics import compute_scorecard_metrics
+from metrics.streaming import ScoreHistogram, parallel_histogram, scorecard_metrics
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--workers", default="1,2,4,8", help="comma-separated thread counts")
+    parser.add_argument("--decimals", type=int, default=None, help="round scores (default: raw floats, all distinct)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    y = (rng.random(args.rows) < 0.05).astype(np.int64)
+    score = np.clip(rng.normal(0.4 + 0.25 * y, 0.15), 0, 1)
+    if args.decimals is not None:
+        score = np.round(score, args.decimals)
+
+    serial, t_serial = _timed(lambda: (compute_scorecard_metrics(y, score), build_curve_basis(y, score)))
+    print(f"rows={args.rows:,}  serial argsort metrics + curve basis: {t_serial:.2f}s  {serial[0]}")
+    reference = ScoreHistogram.from_counts(*_serial_counts(y, score), rows=args.rows)
+    for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+        hist, t_hist = _timed(lambda: parallel_histogram(y, score, workers=workers))
+        metrics, t_metrics = _timed(lambda: (scorecard_metrics(hist), hist.deciles(), hist.curve_basis()))
+        exact = (
+            np.array_equal(hist.values, reference.values)
+            and np.allclose(hist.pos, reference.pos) and np.allclose(hist.neg, reference.neg)
+            and metrics[0]["AUC"] == serial[0]["AUC"]
+        )
+        print(
+            f"workers={workers:>3}  histogram {t_hist:.2f}s + metrics {t_metrics:.2f}s "
+            f"= {t_hist + t_metrics:.2f}s  speedup x{t_serial / (t_hist + t_metrics):.2f}  "
+            f"exact={exact}  KS={metrics[0]['KS']}"
+        )
+
+
+def _serial_counts(y: np.ndarray, score: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    values, inv = np.unique(score, return_inverse=True)
+    pos = np.bincount(inv, weights=(y == 1).astype(float), minlength=len(values))
+    return values, pos, np.bincount(inv, minlength=len(values)) - pos
+
+
+if __name__ == "__main__":
+    main()
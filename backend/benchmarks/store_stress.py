@@ -0,0 +1,210 @@
+"""
+Stress test: many threads ingesting, scoring, computing and reading the in-memory store at once.
+
+Run from the project root:  python backend/benchmarks/store_stress.py --threads 32 --seconds 10
+(--stripes 1 gives a single writer lock for comparison). Writers hit shared and distinct
+dataset_id / model_id keys; readers check that every snapshot they see is consistent. At the end
+the store is checked against what the writers did (run numbers, blob references, overview
+counters). Prints throughput and latency per operation; exits 1 on any error or inconsistency.
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+import traceback
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+import numpy as np
+
+PORTFOLIOS = ["Retail", "SME", "Corporate"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--models", type=int, default=8, help="models written to (shared by writer threads)")
+    parser.add_argument("--readers", type=float, default=0.5, help="share of threads that only read")
+    parser.add_argument("--stripes", type=int, default=None, help="MM_STORE_STRIPES (default: the store's)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.stripes is not None:
+        os.environ["MM_STORE_STRIPES"] = str(args.stripes)
+    os.environ.pop("MM_STORE_ADDRESS", None)  # in-process store
+
+    import store
+    from metrics.vintage import aggregate_increment
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies: dict[str, list[float]] = defaultdict(list)
+    failures: list[str] = []
+    saved: dict[tuple, int] = defaultdict(int)  # (model_id, vintage, segment) -> runs saved
+
+    def timed(name, fn, *a, **kw):
+        start = time.perf_counter()
+        out = fn(*a, **kw)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies[name].append(elapsed)
+        return out
+
+    def fail(message: str) -> None:
+        with lock:
+            failures.append(message)
+        stop.set()
+
+    def writer(n: int) -> None:
+        rng = random.Random(args.seed * 1000 + n)
+        datasets = []
+        while not stop.is_set():
+            op = rng.random()
+            model = f"STRESS-{rng.randrange(args.models):03d}"
+            portfolio = PORTFOLIOS[hash(model) % len(PORTFOLIOS)]
+            vintage = f"2025-{rng.randrange(1, 7):02d}"
+            if op < 0.25 or not datasets:
+                rows = rng.randrange(50, 500)
+                columns = {
+                    "target": np.asarray([rng.random() < 0.1 for _ in range(rows)], dtype=np.int64),
+                    # A few identical uploads exercise deduplication across threads
+                    "score": np.round(np.linspace(0, 1, rows) * (1 if rng.random() < 0.1 else rng.random()), 3),
+                }
+                meta = {"portfolio": portfolio, "model_type": "Bureau", "model_id": model, "vintage": vintage}
+                out = timed("add_dataset", store.add_dataset, store._new_record_id(), meta, "passed", columns)
+                datasets.append(out["dataset_id"])
+            elif op < 0.45:
+                dataset_id = rng.choice(datasets)
+                ds = store.get_dataset(dataset_id)
+                columns = store.get_dataset_columns(dataset_id)
+                if ds is None or columns is None:
+                    continue
+                scored = {**{k: np.asarray(v) for k, v in columns.items()}, "scored": np.full(ds["row_count"], float(n))}
+                timed("update_dataset_columns", store.update_dataset_columns, dataset_id, scored, expected=ds["version"])
+                timed("set_qc_status", store.set_qc_status, dataset_id, rng.choice(["passed", "warning"]))
+            elif op < 0.85:
+                segment = rng.choice([None, None, "thin_file"])
+                record = {
+                    "model_id": model,
+                    "portfolio": portfolio,
+                    "model_type": "Bureau",
+                    "vintage": vintage,
+                    "segment": segment,
+                    "volume": rng.randrange(1000, 5000),
+                    "computed_at": time.strftime("%Y-%m-%dT%H:%M:%S") + f".{time.perf_counter_ns() % 10**9:09d}Z",
+                    "metrics": {"KS": round(rng.uniform(0.1, 0.5), 4), "PSI": round(rng.uniform(0.0, 0.3), 4)},
+                }
+                timed("save_metrics", store.save_metrics, record)
+                with lock:
+                    saved[(model, vintage, segment or "")] += 1
+            else:
+                k = rng.randrange(200)
+                increment = aggregate_increment(np.array([vintage] * k), np.arange(k) % 12, np.arange(k) % 7 == 0)
+                timed("apply_vintage_increment", store.apply_vintage_increment, model, increment)
+
+    def reader(n: int) -> None:
+        rng = random.Random(args.seed * 1000 + 500 + n)
+        while not stop.is_set():
+            op = rng.random()
+            model = f"STRESS-{rng.randrange(args.models):03d}"
+            if op < 0.3:
+                view = timed("get_portfolio_overview", store.get_portfolio_overview)
+                if sum(view["status_counts"].values()) != view["rows"]:
+                    fail(f"overview status counts {view['status_counts']} do not add up to {view['rows']} rows")
+                if sum(p["rows"] for p in view["by_portfolio"]) != view["rows"]:
+                    fail("overview portfolio rows do not add up to the total")
+            elif op < 0.5:
+                rows = timed("get_metrics", store.get_metrics)
+                keys = [(r["model_id"], r["vintage"], r.get("segment") or "") for r in rows]
+                if len(keys) != len(set(keys)):
+                    fail("get_metrics returned a key twice")
+            elif op < 0.65:
+                for dataset_id, ds in timed("list_datasets", store.list_datasets)[-20:]:
+                    if store._unreferenced(ds["version"]) and store.get_dataset(dataset_id)["version"] == ds["version"]:
+                        fail(f"dataset {dataset_id} points at unreferenced version {ds['version']}")
+                    columns = store.get_dataset_columns(dataset_id)
+                    current = store.get_dataset(dataset_id)
+                    if columns is not None and current["version"] == ds["version"] and len(columns["score"]) != ds["row_count"]:
+                        fail(f"dataset {dataset_id} row_count {ds['row_count']} != {len(columns['score'])} rows")
+            elif op < 0.8:
+                history = timed("get_metrics_history", store.get_metrics_history, model_id=model, limit=50)
+                at = [r["computed_at"] for r in history["runs"]]
+                if at != sorted(at, reverse=True):
+                    fail("history runs out of computed_at order")
+            elif op < 0.9:
+                timed("get_metrics_trends", store.get_metrics_trends, model)
+                timed("get_vintage_curves", store.get_vintage_curves, model)
+            else:
+                state = timed("get_alert_state", store.get_alert_state)
+                if sum(state["counts"].values()) != len(state["models"]):
+                    fail("alert state counts do not match its models")
+
+    def guarded(fn, n):
+        try:
+            fn(n)
+        except Exception:  # noqa: BLE001 - any exception is a failure of the run
+            fail(traceback.format_exc())
+
+    n_readers = int(args.threads * args.readers)
+    threads = [
+        threading.Thread(target=guarded, args=(reader if i < n_readers else writer, i), name=f"stress-{i}")
+        for i in range(args.threads)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    stop.wait(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    _check_final(store, saved, fail)
+    print(f"threads={args.threads} (readers={n_readers})  stripes={store.STORE_STRIPES}  {elapsed:.1f}s")
+    for name, values in sorted(latencies.items()):
+        v = np.asarray(values) * 1000
+        print(
+            f"  {name:<26} {len(v):>8} ops  {len(v) / elapsed:>9.0f}/s  "
+            f"p50 {np.percentile(v, 50):7.3f}ms  p99 {np.percentile(v, 99):7.3f}ms  max {v.max():7.3f}ms"
+        )
+    if failures:
+        print(f"FAILED ({len(failures)}):")
+        for message in failures[:10]:
+            print("  " + message.strip().replace("\n", "\n  "))
+        sys.exit(1)
+    print("OK: no errors, every snapshot and the final state are consistent")
+
+
+def _check_final(store, saved: dict, fail) -> None:
+    """Compare the store with what the writers did."""
+    from services.alerts import STATUSES, evaluate_status
+    for key, count in saved.items():
+        runs = store.get_metrics_history(model_id=key[0], vintage=key[1], segment=key[2], include_compacted=True)
+        numbers = sorted(r["run"] for r in runs["runs"])
+        total = len(numbers) + sum(s["runs"] for s in runs["compacted"])
+        if total != count or numbers != list(range(count - len(numbers) + 1, count + 1)):
+            fail(f"{key}: {count} runs saved, history has {total} (run numbers {numbers[:3]}...)")
+    refs: dict[str, int] = defaultdict(int)
+    for _, ds in store.list_datasets():
+        refs[ds["version"]] += 1
+    if dict(refs) != store.blob_refs:
+        fail("blob reference counts do not match dataset versions")
+    latest = list(store.metrics_store.latest_records())
+    rules = store.get_alert_rules()
+    counts = dict.fromkeys(STATUSES, 0)
+    for record in latest:
+        counts[evaluate_status(record, rules)["status"]] += 1
+    overview = store.get_portfolio_overview()
+    if overview["status_counts"] != counts or overview["rows"] != len(latest):
+        fail(f"overview {overview['status_counts']} != recount {counts}")
+
+
+if __name__ == "__main__":
+    main()
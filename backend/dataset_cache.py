@@ -0,0 +1,232 @@
+"""
+Columnar dataset storage: ingested records are held as one NumPy array per column.
+
+Storage is content-addressed: a dataset version is a blob keyed by the hash of its columns
+(names, dtypes and values), so identical uploads or identical scoring results share one copy.
+Every blob is spilled to an on-disk arena as one .npy file per column. A
+process-local LRU tier keeps recently written datasets resident (reads refresh their
+recency), bounded by MM_DATASET_CACHE_BYTES; anything else is memory-mapped from the arena on access, so cold
+datasets are paged in zero-copy (and shared through the page cache by every worker on
+the node) instead of pinning RAM forever.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+
+def _arena_dir() -> Path:
+    """
+    Arena for this store instance: keyed by the shared store address (so all workers of one
+    deployment agree) or, for a standalone process, by its pid.
+    """
+    root = Path(os.environ.get("MM_DATASET_DIR") or Path(tempfile.gettempdir()) / "model_monitoring" / "datasets")
+    address = os.environ.get("MM_STORE_ADDRESS")
+    return root / (f"store-{zlib.crc32(address.encode()):08x}" if address else f"pid-{os.getpid()}")
+
+
+ARENA_DIR = _arena_dir()
+CACHE_BUDGET_BYTES = int(os.environ.get("MM_DATASET_CACHE_BYTES", str(512 * 1024 ** 2)))
+
+_hot: "OrderedDict[str, dict[str, np.ndarray]]" = OrderedDict()  # blob key -> columns, LRU order
+_hot_bytes = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "evicted_bytes": 0, "spills": 0, "dedup_hits": 0}
+_local_lock = threading.Lock()
+
+
+def records_to_columns(records: list[dict]) -> dict[str, np.ndarray]:
+    """
+    Pivot a list of records into typed columns. Numeric columns become int64 (no gaps)
+    or float64 (missing values as NaN); anything else becomes a unicode string column.
+    """
+    names: dict[str, None] = {}
+    for r in records:
+        names.update(dict.fromkeys(r))
+    columns = {}
+    for name in names:
+        values = [r.get(name) for r in records]
+        present = [v for v in values if v is not None]
+        if present and all(isinstance(v, (bool, int)) for v in present) and len(present) == len(values):
+            columns[name] = np.asarray(values, dtype=np.int64)
+        elif all(isinstance(v, (bool, int, float)) for v in present):
+            columns[name] = np.asarray([np.nan if v is None else v for v in values], dtype=np.float64)
+        else:
+            columns[name] = np.asarray(["" if v is None else str(v) for v in values], dtype=np.str_)
+    return columns
+
+
+def columns_to_records(columns: dict[str, np.ndarray]) -> list[dict]:
+    """Inverse of records_to_columns (NaN becomes None); for small payloads only."""
+    names = list(columns)
+    lists = []
+    for name in names:
+        arr = columns[name]
+        vals = arr.tolist()
+        if arr.dtype.kind == "f":
+            vals = [None if v != v else v for v in vals]
+        lists.append(vals)
+    return [dict(zip(names, row)) for row in zip(*lists)]
+
+
+def concat_columns(columns: dict[str, np.ndarray], more: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """
+    Rows of `more` appended to `columns` (e.g. a delta ingested with records_to_columns). A column
+    missing on one side is filled with NaN (numeric; int64 widens to float64) or "" (strings);
+    a column that is numeric on one side only becomes a string column.
+    """
+    n = len(next(iter(columns.values()))) if columns else 0
+    m = len(next(iter(more.values()))) if more else 0
+    out = {}
+    for name in list(columns) + [c for c in more if c not in columns]:
+        a, b = columns.get(name), more.get(name)
+        a = a if a is not None else _blank(b, n)
+        b = b if b is not None else _blank(a, m)
+        if a.dtype.kind in "biuf" and b.dtype.kind in "biuf":
+            dtype = np.result_type(a.dtype, b.dtype)
+            out[name] = np.concatenate([np.asarray(a, dtype=dtype), np.asarray(b, dtype=dtype)])
+        else:
+            out[name] = np.concatenate([np.asarray(a).astype(np.str_), np.asarray(b).astype(np.str_)])
+    return out
+
+
+def _blank(like: np.ndarray, n: int) -> np.ndarray:
+    return np.full(n, np.nan) if like.dtype.kind in "biuf" else np.full(n, "", dtype=np.str_)
+
+
+def nbytes(columns: dict[str, np.ndarray]) -> int:
+    return int(sum(arr.nbytes for arr in columns.values()))
+
+
+def content_hash(columns: dict[str, np.ndarray]) -> str:
+    """Blob key: blake2b over each column's name, dtype, length and raw bytes, one column at a time."""
+    h = hashlib.blake2b(digest_size=16)
+    for name, arr in columns.items():
+        h.update(f"{name}:{arr.dtype.str}:{len(arr)}".encode())
+        h.update(memoryview(np.ascontiguousarray(arr)).cast("B"))
+    return h.hexdigest()
+
+
+def _blob_dir(key: str) -> Path:
+    return ARENA_DIR / key[:2] / key
+
+
+def put(key: str, columns: dict[str, np.ndarray]) -> bool:
+    """
+    Spill columns as blob `key` (unless the arena already holds it) and keep them in the hot tier.
+    Returns True when the blob was already stored.
+    """
+    target = _blob_dir(key)
+    existed = target.is_dir()
+    if not existed:
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.mkdir(parents=True, exist_ok=True)
+        for name, arr in columns.items():
+            np.save(tmp / f"{_safe_name(name)}.npy", np.ascontiguousarray(arr), allow_pickle=False)
+        # Publish atomically so readers in other workers never see a half-written blob
+        try:
+            os.replace(tmp, target)
+        except OSError:
+            # Another worker published the same content first
+            shutil.rmtree(tmp, ignore_errors=True)
+            existed = True
+    with _local_lock:
+        _stats["dedup_hits" if existed else "spills"] += 1
+        _admit(key, columns)
+    return existed
+
+
+def get(key: str, names: list[str]) -> Optional[dict[str, np.ndarray]]:
+    """Columns of a blob: from the hot tier if resident, else memory-mapped from the arena."""
+    with _local_lock:
+        hit = _hot.get(key)
+        if hit is not None:
+            _hot.move_to_end(key)
+            _stats["hits"] += 1
+            return hit
+    directory = _blob_dir(key)
+    if not directory.is_dir():
+        return None
+    columns = {name: np.load(directory / f"{_safe_name(name)}.npy", mmap_mode="r") for name in names}
+    with _local_lock:
+        _stats["misses"] += 1
+    return columns
+
+
+def exists(key: str) -> bool:
+    return _blob_dir(key).is_dir()
+
+
+def drop(key: str) -> None:
+    """Forget a blob (once no dataset references it), locally and in the arena."""
+    global _hot_bytes
+    with _local_lock:
+        if key in _hot:
+            _hot_bytes -= nbytes(_hot.pop(key))
+    # Already-mapped pages stay valid for readers after unlink (POSIX semantics)
+    shutil.rmtree(_blob_dir(key), ignore_errors=True)
+
+
+def clear_arena() -> None:
+    """Remove every spilled blob of this store instance (the store itself is in-memory)."""
+    shutil.rmtree(ARENA_DIR, ignore_errors=True)
+
+
+def set_budget(budget_bytes: int) -> None:
+    """Change the hot-tier byte budget, evicting immediately if now over it."""
+    global CACHE_BUDGET_BYTES
+    with _local_lock:
+        CACHE_BUDGET_BYTES = int(budget_bytes)
+        _evict_to_budget()
+
+
+def stats() -> dict:
+    """Hot-tier usage and eviction counters for this process, plus arena size on disk."""
+    with _local_lock:
+        out = dict(_stats)
+        out.update(
+            pid=os.getpid(),
+            budget_bytes=CACHE_BUDGET_BYTES,
+            resident_bytes=_hot_bytes,
+            resident_datasets=len(_hot),
+        )
+    lookups = out["hits"] + out["misses"]
+    out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else None
+    out["arena_dir"] = str(ARENA_DIR)
+    out["arena_bytes"] = sum(f.stat().st_size for f in ARENA_DIR.glob("*/*/*.npy")) if ARENA_DIR.is_dir() else 0
+    out["arena_blobs"] = sum(1 for _ in ARENA_DIR.glob("*/*")) if ARENA_DIR.is_dir() else 0
+    return out
+
+
+def _admit(key: str, columns: dict[str, np.ndarray]) -> None:
+    """Insert as most recently used and evict least recently used entries over budget (lock held)."""
+    global _hot_bytes
+    previous = _hot.pop(key, None)
+    if previous is not None:
+        _hot_bytes -= nbytes(previous)
+    _hot[key] = columns
+    _hot_bytes += nbytes(columns)
+    _evict_to_budget()
+
+
+def _evict_to_budget() -> None:
+    global _hot_bytes
+    while _hot and _hot_bytes > CACHE_BUDGET_BYTES:
+        _, columns = _hot.popitem(last=False)
+        size = nbytes(columns)
+        _hot_bytes -= size
+        _stats["evictions"] += 1
+        _stats["evicted_bytes"] += size
+
+
+def _safe_name(name: str) -> str:
+    """Column name as a file name (column order/names are kept in store metadata)."""
+    return "".join(c if c.isalnum() or c in "-_" else f"%{ord(c):02x}" for c in name)
@@ -1,33 +1,88 @@
 """
-AUC and Cumulative Accuracy (CA) / Capture Rate for binary classification.
+AUC, AUC-PR and Cumulative Accuracy (CA) / Capture Rate for binary classification.
+Every metric takes an optional sample_weight (weighted cumulative sums; no row expansion).
 """
 
 import numpy as np
 
 
-def calculate_auc(y_true: np.ndarray, y_pred_proba: np.ndarray) -> float:
+def _weights(sample_weight, n: int) -> np.ndarray:
+    return np.ones(n) if sample_weight is None else np.asarray(sample_weight, dtype=float).flatten()
+
+
+def _distinct_threshold_counts(
+    y_true: np.ndarray,
+    y_pred_proba: np.ndarray,
+    sample_weight: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Cumulative (tp, fp) weights at each distinct score threshold, walking scores in descending order."""
+    order = np.argsort(y_pred_proba, kind="mergesort")[::-1]
+    y_sorted = y_true[order] == 1
+    score_sorted = y_pred_proba[order]
+    w_sorted = _weights(sample_weight, len(y_true))[order]
+    # Last index of each run of tied scores, so ties are evaluated together
+    distinct = np.where(np.diff(score_sorted))[0]
+    ends = np.r_[distinct, len(y_sorted) - 1]
+    tp = np.cumsum(w_sorted * y_sorted)[ends]
+    fp = np.cumsum(w_sorted)[ends] - tp
+    return tp, fp
+
+
+def calculate_auc(y_true: np.ndarray, y_pred_proba: np.ndarray, sample_weight: np.ndarray | None = None) -> float:
     """Compute AUC-ROC using trapezoidal rule (equivalent to sklearn roc_auc_score)."""
     y_true = np.asarray(y_true).flatten()
     y_pred_proba = np.asarray(y_pred_proba).flatten()
-    order = np.argsort(y_pred_proba)[::-1]
-    y_true_sorted = y_true[order]
-    n_pos = np.sum(y_true == 1)
-    n_neg = np.sum(y_true == 0)
+    w = _weights(sample_weight, len(y_true))
+    n_pos = w[y_true == 1].sum()
+    n_neg = w[y_true == 0].sum()
     if n_pos == 0 or n_neg == 0:
         return 0.5
-    tp = np.cumsum(y_true_sorted == 1)
-    fp = np.cumsum(y_true_sorted == 0)
-    # AUC = sum of (delta_FPR * TPR_at_mid)
-    tpr = tp / n_pos
-    fpr = fp / n_neg
-    auc = np.trapz(tpr, fpr)
+    tp, fp = _distinct_threshold_counts(y_true, y_pred_proba, sample_weight)
+    tpr = np.r_[0.0, tp / n_pos]
+    fpr = np.r_[0.0, fp / n_neg]
+    auc = np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)
     return float(np.clip(auc, 0.0, 1.0))
 
 
+def calculate_auc_pr(y_true: np.ndarray, y_pred_proba: np.ndarray, sample_weight: np.ndarray | None = None) -> float:
+    """Area under the precision-recall curve as average precision (equivalent to sklearn average_precision_score)."""
+    y_true = np.asarray(y_true).flatten()
+    y_pred_proba = np.asarray(y_pred_proba).flatten()
+    n_pos = _weights(sample_weight, len(y_true))[y_true == 1].sum()
+    if n_pos == 0 or len(y_true) == 0:
+        return 0.0
+    tp, fp = _distinct_threshold_counts(y_true, y_pred_proba, sample_weight)
+    precision = np.divide(tp, tp + fp, out=np.zeros(len(tp)), where=(tp + fp) > 0)
+    recall = tp / n_pos
+    return float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+
+
+def positives_in_top_k(
+    y_true: np.ndarray,
+    y_pred_proba: np.ndarray,
+    k_percent: float,
+    sample_weight: np.ndarray | None = None,
+) -> tuple[float, float]:
+    """
+    (positives, population) in the top k% of the population (or of total weight) by descending
+    score. Rows tied at the cut-off score count pro rata, as ScoreHistogram does, so the result
+    does not depend on how tied rows happen to be ordered.
+    """
+    y_true = np.asarray(y_true).flatten()
+    y_pred_proba = np.asarray(y_pred_proba).flatten()
+    if len(y_true) == 0:
+        return 0.0, 0.0
+    tp, fp = _distinct_threshold_counts(y_true, y_pred_proba, sample_weight)
+    cum_total = tp + fp
+    top = float(cum_total[-1] * k_percent / 100)
+    return float(np.interp(top, np.r_[0.0, cum_total], np.r_[0.0, tp])), top
+
+
 def calculate_ca_at_k(
     y_true: np.ndarray,
     y_pred_proba: np.ndarray,
     k_percent: float = 10.0,
+    sample_weight: np.ndarray | None = None,
 ) -> float:
     """
     Cumulative Accuracy / Capture rate: at top k% of population (by score),
@@ -35,12 +90,9 @@ def calculate_ca_at_k(
     """
     y_true = np.asarray(y_true).flatten()
     y_pred_proba = np.asarray(y_pred_proba).flatten()
-    n = len(y_true)
-    n_pos = np.sum(y_true == 1)
+    w = _weights(sample_weight, len(y_true))
+    n_pos = w[y_true == 1].sum()
     if n_pos == 0:
         return 0.0
-    n_top = max(1, int(n * (k_percent / 100)))
-    order = np.argsort(y_pred_proba)[::-1]
-    top_indices = order[:n_top]
-    captured = np.sum(y_true[top_indices] == 1)
+    captured, _ = positives_in_top_k(y_true, y_pred_proba, k_percent, sample_weight)
     return float(captured / n_pos)
@@ -1,33 +1,216 @@
 """
-Collections model metrics: roll rate, flow rate, recovery rate, cure rate.
-Prototype: compute from arrays of delinquency flags / balances if provided.
+Collections model metrics: delinquency-bucket transition (roll-rate) matrices, flow rate,
+cure rate and recovery rate, by cohort and balance-weighted.
+
+Input is an account-level panel (one row per account-month): previous and current days past
+due, optional balance, recoveries, charge-off flag, cohort label and period. Every matrix is
+built with a single vectorized bincount over (cohort, period, from-bucket, to-bucket) codes,
+so runs over tens of millions of account-months stay a few linear passes.
 """
 
 import numpy as np
 
+BUCKETS = ["current", "1-29", "30-59", "60-89", "90+", "charge_off"]
+N_BUCKETS = len(BUCKETS)
+CHARGE_OFF = N_BUCKETS - 1
+# Lower DPD edge of each delinquency bucket after "current"
+_DPD_EDGES = np.array([1, 30, 60, 90])
+_DELINQUENT = slice(1, CHARGE_OFF)  # 1-29 .. 90+
 
-def compute_collections_metrics(
-    current_dpd: np.ndarray | None = None,
-    prev_dpd: np.ndarray | None = None,
+
+def dpd_to_bucket(dpd: np.ndarray, charged_off: np.ndarray | None = None) -> np.ndarray:
+    """Map days past due to bucket codes 0..5 (int8); charged-off rows go to the charge_off bucket."""
+    dpd = np.nan_to_num(np.asarray(dpd, dtype=float).flatten(), nan=0.0)
+    buckets = np.digitize(dpd, _DPD_EDGES).astype(np.int8)
+    if charged_off is not None:
+        buckets[np.asarray(charged_off).flatten().astype(bool)] = CHARGE_OFF
+    return buckets
+
+
+def _factorize(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(labels, codes) for a label column; small-range integers skip the O(n log n) sort."""
+    values = np.asarray(values).flatten()
+    if values.dtype.kind in "iu" and len(values):
+        lo, hi = int(values.min()), int(values.max())
+        if hi - lo < 1_000_000:
+            present = np.bincount(values - lo, minlength=hi - lo + 1) > 0
+            lookup = np.cumsum(present) - 1
+            return np.flatnonzero(present) + lo, lookup[values - lo]
+    return np.unique(values, return_inverse=True)
+
+
+def transition_counts(
+    prev_bucket: np.ndarray,
+    curr_bucket: np.ndarray,
+    weights: np.ndarray | None = None,
+    group: np.ndarray | None = None,
+    n_groups: int = 1,
+) -> np.ndarray:
+    """
+    (n_groups, 6, 6) matrix of account counts (or summed weights) moving from bucket i to j,
+    from one bincount over combined codes group * 36 + from * 6 + to.
+    """
+    codes = prev_bucket.astype(np.int64) * N_BUCKETS + curr_bucket
+    if group is not None:
+        codes = codes + group.astype(np.int64) * (N_BUCKETS * N_BUCKETS)
+    counts = np.bincount(codes, weights=weights, minlength=n_groups * N_BUCKETS * N_BUCKETS)
+    return counts.reshape(n_groups, N_BUCKETS, N_BUCKETS)
+
+
+def transition_rates(counts: np.ndarray) -> np.ndarray:
+    """Row-normalize transition counts; charge-off is absorbing and empty rows stay in place."""
+    counts = np.asarray(counts, dtype=float)
+    totals = counts.sum(axis=-1, keepdims=True)
+    rates = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    empty = (totals[..., 0] == 0)
+    eye = np.broadcast_to(np.eye(N_BUCKETS), rates.shape)
+    rates = np.where(empty[..., None], eye, rates)
+    rates[..., CHARGE_OFF, :] = np.eye(N_BUCKETS)[CHARGE_OFF]
+    return rates
+
+
+def chain_transitions(monthly_rates: np.ndarray) -> np.ndarray:
+    """Multi-month transition matrix: ordered product of monthly (6, 6) rate matrices."""
+    out = np.eye(N_BUCKETS)
+    for rates in monthly_rates:
+        out = out @ rates
+    return out
+
+
+def project_bucket_mix(start_mix: np.ndarray, rates: np.ndarray, months: int) -> np.ndarray:
+    """Bucket distribution after `months` steps of a (stationary) monthly transition matrix."""
+    return np.asarray(start_mix, dtype=float) @ np.linalg.matrix_power(rates, months)
+
+
+def _rates_from_counts(counts: np.ndarray, balance_counts: np.ndarray, recovered: float | None = None) -> dict:
+    """
+    Headline rates from one (6, 6) count matrix and its balance-weighted twin; recovery_rate
+    when the recoveries on this month's charged-off balance are given.
+    """
+    def _ratio(num: float, den: float) -> float | None:
+        return round(float(num / den), 4) if den > 0 else None
+
+    rolled_from_30 = counts[2:CHARGE_OFF, 3:].sum()
+    delinquent_bal = balance_counts[_DELINQUENT].sum()
+    flow_bal = sum(balance_counts[k, k + 1] for k in range(1, CHARGE_OFF))
+    rates = {
+        # Accounts 30+ DPD last month that are 60+ DPD (or charged off) this month
+        "roll_rate_30": _ratio(rolled_from_30, counts[2:CHARGE_OFF].sum()),
+        # Delinquent balance flowing one bucket worse (1-29 -> 30-59, ..., 90+ -> charge-off)
+        "flow_rate": _ratio(flow_bal, delinquent_bal),
+        # Delinquent accounts (and balance) returning to current
+        "cure_rate": _ratio(counts[_DELINQUENT, 0].sum(), counts[_DELINQUENT].sum()),
+        "cure_rate_balance": _ratio(balance_counts[_DELINQUENT, 0].sum(), delinquent_bal),
+    }
+    if recovered is not None:
+        # Recoveries on balance charged off this month
+        rates["recovery_rate"] = _ratio(recovered, balance_counts[:, CHARGE_OFF].sum())
+    return rates
+
+
+def collections_analysis(
+    current_dpd: np.ndarray,
+    prev_dpd: np.ndarray,
     balance: np.ndarray | None = None,
     recovered: np.ndarray | None = None,
+    charged_off: np.ndarray | None = None,
+    cohort: np.ndarray | None = None,
+    period: np.ndarray | None = None,
+    horizon_months: int = 6,
 ) -> dict:
     """
-    Simplified collections metrics. In production these would come from
-    cohort/vintage-level roll rates and flow rates.
+    Full collections analysis for an account-month panel.
+    Returns { metrics, buckets, transition_counts, transition_matrix, balance_transition_matrix,
+    flow_rates, by_cohort, chained_transition, projection }.
+    metrics holds flat headline rates (roll_rate_30, flow_rate, cure_rate by accounts,
+    cure_rate_balance, recovery_rate when recoveries are provided, projected_charge_off_rate);
+    by_cohort rows hold the same rates per cohort, except the projection.
     """
-    if current_dpd is not None and prev_dpd is not None:
-        current_dpd = np.asarray(current_dpd).flatten()
-        prev_dpd = np.asarray(prev_dpd).flatten()
-        n_prev_30 = np.sum(prev_dpd >= 30)
-        n_roll = np.sum((prev_dpd >= 30) & (current_dpd >= 60))
-        roll_rate_30 = float(n_roll / n_prev_30) if n_prev_30 else 0.0
+    prev_b = dpd_to_bucket(prev_dpd)
+    curr_b = dpd_to_bucket(current_dpd, charged_off)
+    n = len(prev_b)
+    if n == 0 or len(curr_b) != n:
+        raise ValueError("current_dpd and prev_dpd must be non-empty and the same length")
+    bal = np.ones(n) if balance is None else np.nan_to_num(np.asarray(balance, dtype=float).flatten())
+
+    counts = transition_counts(prev_b, curr_b)[0]
+    bal_counts = transition_counts(prev_b, curr_b, weights=bal)[0]
+    rates = transition_rates(counts)
+    bal_rates = transition_rates(bal_counts)
+    # Recoveries count only on accounts charged off this month
+    rec = None
+    if recovered is not None:
+        rec = np.where(curr_b == CHARGE_OFF, np.nan_to_num(np.asarray(recovered, dtype=float).flatten()), 0.0)
+    metrics = _rates_from_counts(counts, bal_counts, rec.sum() if rec is not None else None)
+
+    # Multi-month chaining: observed monthly matrices in period order, else the pooled month.
+    # Balance-weighted either way, the same basis as start_mix and the projection.
+    if period is not None:
+        labels, codes = _factorize(period)
+        per_period = transition_rates(
+            transition_counts(prev_b, curr_b, weights=bal, group=codes, n_groups=len(labels))
+        )
+        chained = chain_transitions(per_period)
+        chained_periods = [str(p) for p in labels]
     else:
-        roll_rate_30 = 0.05  # placeholder
-    # Placeholder flow/recovery/cure for prototype
+        chained = np.linalg.matrix_power(bal_rates, horizon_months)
+        chained_periods = None
+    start_mix = np.bincount(curr_b, weights=bal, minlength=N_BUCKETS)
+    start_mix = start_mix / start_mix.sum() if start_mix.sum() > 0 else start_mix
+    projected = project_bucket_mix(start_mix, bal_rates, horizon_months)
+    metrics["projected_charge_off_rate"] = round(float(projected[CHARGE_OFF]), 4)
+
+    by_cohort = []
+    if cohort is not None:
+        labels, codes = _factorize(cohort)
+        cohort_counts = transition_counts(prev_b, curr_b, group=codes, n_groups=len(labels))
+        cohort_bal = transition_counts(prev_b, curr_b, weights=bal, group=codes, n_groups=len(labels))
+        cohort_rec = np.bincount(codes, weights=rec, minlength=len(labels)) if rec is not None else None
+        for i, label in enumerate(labels):
+            by_cohort.append({
+                "cohort": str(label),
+                "accounts": int(cohort_counts[i].sum()),
+                "balance": round(float(cohort_bal[i].sum()), 2),
+                **_rates_from_counts(cohort_counts[i], cohort_bal[i], cohort_rec[i] if cohort_rec is not None else None),
+            })
+
+    metrics = {k: v for k, v in metrics.items() if v is not None}
     return {
-        "roll_rate_30": round(roll_rate_30, 4),
-        "flow_rate": round(0.15 + np.random.rand() * 0.1, 4),
-        "recovery_rate": round(0.2 + np.random.rand() * 0.15, 4),
-        "cure_rate": round(0.25 + np.random.rand() * 0.2, 4),
+        "metrics": metrics,
+        "buckets": list(BUCKETS),
+        "transition_counts": counts.astype(np.int64).tolist(),
+        "transition_matrix": np.round(rates, 4).tolist(),
+        "balance_transition_matrix": np.round(bal_rates, 4).tolist(),
+        "flow_rates": {
+            f"{BUCKETS[k]}->{BUCKETS[k + 1]}": round(float(bal_rates[k, k + 1]), 4)
+            for k in range(CHARGE_OFF)
+        },
+        "by_cohort": by_cohort,
+        "chained_transition": {
+            "periods": chained_periods,
+            "months": len(chained_periods) if chained_periods else horizon_months,
+            "basis": "balance",
+            "matrix": np.round(chained, 4).tolist(),
+        },
+        "projection": {
+            "horizon_months": horizon_months,
+            "start_mix": np.round(start_mix, 4).tolist(),
+            "projected_mix": np.round(projected, 4).tolist(),
+        },
     }
+
+
+def compute_collections_metrics(
+    current_dpd: np.ndarray,
+    prev_dpd: np.ndarray,
+    balance: np.ndarray | None = None,
+    recovered: np.ndarray | None = None,
+    charged_off: np.ndarray | None = None,
+    cohort: np.ndarray | None = None,
+    period: np.ndarray | None = None,
+) -> dict:
+    """Headline collections metrics (flat dict) for the metrics store; see collections_analysis."""
+    return collections_analysis(
+        current_dpd, prev_dpd, balance=balance, recovered=recovered,
+        charged_off=charged_off, cohort=cohort, period=period,
+    )["metrics"]
@@ -0,0 +1,149 @@
+"""
+KS, ROC, precision-recall, lift and gain curves from sorted cumulative counts.
+
+A curve basis (cumulative positives/negatives at distinct score thresholds, reduced to a
+bounded number of population quantiles) is built once per metrics computation; every
+curve is derived from it and downsampled to a fixed number of points for the API.
+"""
+
+import numpy as np
+
+CURVE_KINDS = ("ks", "roc", "pr", "lift", "gain")
+DEFAULT_BASIS_POINTS = 2048
+DEFAULT_CURVE_POINTS = 500
+
+
+def build_curve_basis(
+    y_true: np.ndarray,
+    y_pred_proba: np.ndarray,
+    max_points: int = DEFAULT_BASIS_POINTS,
+    sample_weight: np.ndarray | None = None,
+) -> dict:
+    """
+    Sort once by descending score and keep cumulative (positives, negatives) at distinct
+    thresholds, reduced to at most ~max_points population quantiles. The KS point is
+    always retained so the stored basis reproduces the exact KS statistic.
+    With sample_weight the cumulative counts are weighted (floats instead of integers).
+    """
+    y_true = np.asarray(y_true).flatten()
+    y_pred_proba = np.asarray(y_pred_proba, dtype=float).flatten()
+    order = np.argsort(y_pred_proba, kind="mergesort")[::-1]
+    score_sorted = y_pred_proba[order]
+    is_pos = y_true[order] == 1
+    ends = np.r_[np.where(np.diff(score_sorted))[0], len(score_sorted) - 1] if len(score_sorted) else np.zeros(0, dtype=int)
+    if sample_weight is None:
+        cum_pos = np.cumsum(is_pos)[ends].astype(np.int64)
+        cum_neg = (ends + 1 - cum_pos).astype(np.int64)
+    else:
+        w_sorted = np.asarray(sample_weight, dtype=float).flatten()[order]
+        cum_pos = np.cumsum(w_sorted * is_pos)[ends]
+        cum_neg = np.cumsum(w_sorted)[ends] - cum_pos
+    return basis_from_counts(score_sorted[ends], cum_pos, cum_neg, max_points)
+
+
+def basis_from_counts(
+    thresholds: np.ndarray,
+    cum_pos: np.ndarray,
+    cum_neg: np.ndarray,
+    max_points: int = DEFAULT_BASIS_POINTS,
+) -> dict:
+    """Curve basis from cumulative (positives, negatives) at descending distinct thresholds."""
+    n_pos = cum_pos[-1].item() if len(cum_pos) else 0
+    n_neg = cum_neg[-1].item() if len(cum_neg) else 0
+    if len(thresholds) > max_points:
+        cum_total = cum_pos + cum_neg
+        targets = np.linspace(0, cum_total[-1], max_points)
+        keep = np.searchsorted(cum_total, targets, side="left")
+        gap = np.abs(_ratio(cum_pos, n_pos) - _ratio(cum_neg, n_neg))
+        keep = np.unique(np.r_[keep, int(np.argmax(gap)), len(thresholds) - 1])
+        thresholds, cum_pos, cum_neg = thresholds[keep], cum_pos[keep], cum_neg[keep]
+    return {
+        "thresholds": thresholds,
+        "cum_pos": cum_pos,
+        "cum_neg": cum_neg,
+        "n_pos": n_pos,
+        "n_neg": n_neg,
+    }
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling: indices of n_out points preserving the curve shape."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # Interior points split into n_out - 2 buckets; first and last points are always kept
+    every = (n - 2) / (n_out - 2)
+    bounds = (np.arange(n_out - 1) * every).astype(int) + 1
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        nxt_lo, nxt_hi = (bounds[i + 1], bounds[i + 2]) if i + 2 < len(bounds) else (n - 1, n)
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return np.unique(out)
+
+
+def _ratio(num: np.ndarray, den) -> np.ndarray:
+    den = np.broadcast_to(np.asarray(den, dtype=float), np.shape(num))
+    return np.divide(num, den, out=np.zeros(np.shape(num)), where=den > 0)
+
+
+def _rounded(arr: np.ndarray) -> list[float]:
+    return [round(float(v), 6) for v in arr]
+
+
+def compute_curve(basis: dict, kind: str, n_points: int = DEFAULT_CURVE_POINTS) -> dict:
+    """
+    Derive one curve from a basis and downsample it to about n_points.
+    Returns { curve, x, y, [y2], x_label, y_label, [ks, ks_x] } with plain lists for JSON.
+    """
+    if kind not in CURVE_KINDS:
+        raise ValueError(f"unknown curve kind: {kind}")
+    n_pos, n_neg = basis["n_pos"], basis["n_neg"]
+    cum_pos = np.r_[0, basis["cum_pos"]].astype(float)
+    cum_neg = np.r_[0, basis["cum_neg"]].astype(float)
+    thresholds = np.r_[np.inf, basis["thresholds"]]
+    n_total = n_pos + n_neg
+    pop = _ratio(cum_pos + cum_neg, n_total)
+    tpr = _ratio(cum_pos, n_pos)
+    fpr = _ratio(cum_neg, n_neg)
+    out: dict = {"curve": kind}
+    if kind == "ks":
+        x, y, y2 = pop, tpr, fpr
+        gap = np.abs(tpr - fpr)
+        ks_idx = int(np.argmax(gap))
+        idx = np.union1d(lttb_indices(x, gap, n_points), [ks_idx])
+        out.update(x_label="population_pct", y_label="cum_positive_pct", y2_label="cum_negative_pct",
+                   ks=round(float(gap[ks_idx]), 6), ks_x=round(float(pop[ks_idx]), 6),
+                   ks_threshold=round(float(thresholds[ks_idx]), 6) if ks_idx else None)
+        out["y2"] = _rounded(y2[idx])
+    elif kind == "roc":
+        x, y = fpr, tpr
+        idx = lttb_indices(x, y, n_points)
+        out.update(x_label="fpr", y_label="tpr")
+    elif kind == "pr":
+        x = tpr[1:]
+        y = _ratio(cum_pos[1:], cum_pos[1:] + cum_neg[1:])
+        thresholds = thresholds[1:]
+        idx = lttb_indices(x, y, n_points)
+        out.update(x_label="recall", y_label="precision")
+    elif kind == "lift":
+        x = pop[1:]
+        y = _ratio(tpr[1:], x) if n_pos else np.zeros(len(x))
+        thresholds = thresholds[1:]
+        idx = lttb_indices(x, y, n_points)
+        out.update(x_label="population_pct", y_label="lift")
+    else:  # gain
+        x, y = pop, tpr
+        idx = lttb_indices(x, y, n_points)
+        out.update(x_label="population_pct", y_label="cum_positive_pct")
+    out["x"] = _rounded(x[idx])
+    out["y"] = _rounded(y[idx])
+    out["thresholds"] = [None if not np.isfinite(t) else round(float(t), 6) for t in thresholds[idx]]
+    out["n_points"] = int(len(idx))
+    return out
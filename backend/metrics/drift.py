@@ -0,0 +1,122 @@
+"""
+Score-distribution drift between a baseline and a current population: PSI, two-sample KS
+statistic, Wasserstein-1 distance and Jensen-Shannon divergence, all from one shared pair of
+histograms.
+
+The bins are weighted quantiles of the baseline (MM_DRIFT_BINS of them, default 100), plus a
+bin each for current scores below / above the baseline's range, so each holds an equal share of
+the baseline whatever the score scale; a few extreme scores (common in fraud) only land in an
+outer bin instead of squeezing every other score into one bin, as equal-width bins over the
+combined min / max do. PSI is taken over baseline deciles (groups of fine bins), JS divergence
+over the fine bins, KS from the cumulative shares at the bin edges, and Wasserstein from each
+bin's mass and mean score (exact wherever the two CDFs do not cross inside a bin). With
+exact=True, KS and Wasserstein are computed from the sorted scores instead.
+
+Inputs can be rows or distinct scores with their counts as weights (e.g. a ScoreHistogram), so
+drift on a stored histogram costs O(distinct scores), not O(rows).
+"""
+
+import os
+
+import numpy as np
+
+DEFAULT_DRIFT_BINS = int(os.environ.get("MM_DRIFT_BINS", "100"))
+PSI_BINS = 10
+
+
+def _sorted(values: np.ndarray, weights: np.ndarray | None) -> tuple[np.ndarray, np.ndarray]:
+    v = np.asarray(values, dtype=float).flatten()
+    w = np.ones(len(v)) if weights is None else np.asarray(weights, dtype=float).flatten()
+    keep = ~np.isnan(v)
+    v, w = v[keep], w[keep]
+    order = np.argsort(v, kind="stable")
+    return v[order], w[order]
+
+
+def _cdf_at(sorted_values: np.ndarray, cum_weights: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Share of the population with score <= x."""
+    return np.r_[0.0, cum_weights][np.searchsorted(sorted_values, x, side="right")] / cum_weights[-1]
+
+
+def _quantile_edges(sorted_values: np.ndarray, cum_weights: np.ndarray, bins: int) -> np.ndarray:
+    """Distinct interior bin edges at the weighted k / bins quantiles of a sorted population."""
+    targets = cum_weights[-1] * np.arange(1, bins) / bins
+    idx = np.minimum(np.searchsorted(cum_weights, targets, side="left"), len(sorted_values) - 1)
+    return np.unique(sorted_values[idx])
+
+
+def _bin_mass(values: np.ndarray, weights: np.ndarray, edges: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (share, share x mean score) per bin; bin 0 is below edges[0], bin i holds
+    edges[i - 1] <= x < edges[i].
+    """
+    idx = np.searchsorted(edges, values, side="right")
+    total = weights.sum()
+    return (
+        np.bincount(idx, weights=weights, minlength=len(edges) + 1) / total,
+        np.bincount(idx, weights=weights * values, minlength=len(edges) + 1) / total,
+    )
+
+
+def score_drift(
+    baseline: np.ndarray,
+    current: np.ndarray,
+    baseline_weight: np.ndarray | None = None,
+    current_weight: np.ndarray | None = None,
+    bins: int = DEFAULT_DRIFT_BINS,
+    exact: bool = False,
+) -> dict:
+    """
+    { psi, ks_statistic, wasserstein, js_divergence, bins, exact } of current against baseline.
+    JS divergence is in bits (0 = identical, 1 = disjoint); Wasserstein is in score units.
+    """
+    b, wb = _sorted(baseline, baseline_weight)
+    c, wc = _sorted(current, current_weight) if exact else (
+        np.asarray(current, dtype=float).flatten(),
+        np.ones(len(current)) if current_weight is None else np.asarray(current_weight, dtype=float).flatten(),
+    )
+    if not exact:
+        keep = ~np.isnan(c)
+        c, wc = c[keep], wc[keep]
+    if not len(b) or not len(c) or not wb.sum() > 0 or not wc.sum() > 0:
+        return {"psi": 0.0, "ks_statistic": 0.0, "wasserstein": 0.0, "js_divergence": 0.0, "bins": 0, "exact": bool(exact)}
+    cum_b = np.cumsum(wb)
+    # Fine bins nest inside the PSI deciles: every decile edge is also a fine edge
+    bins = max(int(bins) // PSI_BINS, 1) * PSI_BINS
+    # Outer edges at the baseline's min and just above its max: current scores outside its range get their own bins
+    edges = np.unique(np.r_[b[0], _quantile_edges(b, cum_b, bins), np.nextafter(b[-1], np.inf)])
+    (p_b, m_b), (p_c, m_c) = _bin_mass(b, wb, edges), _bin_mass(c, wc, edges)
+
+    decile_edges = _quantile_edges(b, cum_b, PSI_BINS)
+    lower = np.r_[-np.inf, edges]
+    decile = np.searchsorted(decile_edges, lower, side="right")
+    q_b = np.clip(np.bincount(decile, weights=p_b, minlength=len(decile_edges) + 1), 1e-6, 1.0)
+    q_c = np.clip(np.bincount(decile, weights=p_c, minlength=len(decile_edges) + 1), 1e-6, 1.0)
+    psi = float(np.sum((q_c - q_b) * (np.log(q_c) - np.log(q_b))))
+
+    m = (p_b + p_c) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        js = 0.5 * np.sum(np.where(p_b > 0, p_b * np.log2(p_b / m), 0.0)) + 0.5 * np.sum(np.where(p_c > 0, p_c * np.log2(p_c / m), 0.0))
+
+    if exact:
+        points = np.unique(np.r_[b, c])
+        gap = _cdf_at(b, cum_b, points) - _cdf_at(c, np.cumsum(wc), points)
+        ks = float(np.abs(gap).max())
+        wasserstein = float(np.sum(np.abs(gap[:-1]) * np.diff(points)))
+    else:
+        # CDF gap at the left end of each bin; over a bin [lo, hi) holding share p with mean score
+        # mu, the integral of the CDF is F(lo) * (hi - lo) + p * (hi - mu)
+        lo = np.r_[min(b[0], c.min()), edges]
+        hi = np.r_[edges, max(b[-1], c.max())]
+        gap = np.r_[0.0, np.cumsum(p_b - p_c)[:-1]]
+        ks = float(np.abs(gap).max())
+        area = gap * (hi - lo) + (p_b * hi - m_b) - (p_c * hi - m_c)
+        wasserstein = float(np.abs(area).sum())
+    return {
+        "psi": round(psi, 4),
+        "ks_statistic": round(ks, 4),
+        "wasserstein": round(wasserstein, 4),
+        "js_divergence": round(float(max(js, 0.0)), 4),
+        "bins": int(len(edges) + 1),
+        "exact": bool(exact),
+    }
@@ -3,30 +3,35 @@ Transaction Fraud model metrics: AUC, AUC-PR, KS, PSI, CA, Precision/Recall @ K,
 """
 
 import numpy as np
-from ks_logistic_model import calculate_ks
+
+from .ks import calculate_ks
 from .psi import calculate_psi
-from .auc_ca import calculate_auc, calculate_ca_at_k
+from .auc_ca import _weights, calculate_auc, calculate_auc_pr, calculate_ca_at_k, positives_in_top_k
 
 
-def precision_at_k(y_true: np.ndarray, y_pred_proba: np.ndarray, k_percent: float) -> float:
+def precision_at_k(
+    y_true: np.ndarray,
+    y_pred_proba: np.ndarray,
+    k_percent: float,
+    sample_weight: np.ndarray | None = None,
+) -> float:
     """Precision when taking top k% of population by score."""
-    y_true = np.asarray(y_true).flatten()
-    y_pred_proba = np.asarray(y_pred_proba).flatten()
-    n = len(y_true)
-    n_top = max(1, int(n * (k_percent / 100)))
-    order = np.argsort(y_pred_proba)[::-1]
-    top_indices = order[:n_top]
-    tp = np.sum(y_true[top_indices] == 1)
-    return float(tp / n_top)
+    tp, selected = positives_in_top_k(y_true, y_pred_proba, k_percent, sample_weight)
+    return float(tp / selected) if selected > 0 else 0.0
 
 
-def recall_at_k(y_true: np.ndarray, y_pred_proba: np.ndarray, k_percent: float) -> float:
+def recall_at_k(
+    y_true: np.ndarray,
+    y_pred_proba: np.ndarray,
+    k_percent: float,
+    sample_weight: np.ndarray | None = None,
+) -> float:
     """Recall when taking top k% of population by score."""
     y_true = np.asarray(y_true).flatten()
     n_pos = np.sum(y_true == 1)
     if n_pos == 0:
         return 0.0
-    ca = calculate_ca_at_k(y_true, y_pred_proba, k_percent)  # recall at top k% = CA at k%
+    ca = calculate_ca_at_k(y_true, y_pred_proba, k_percent, sample_weight)  # recall at top k% = CA at k%
     return float(ca)
 
 
@@ -35,31 +40,29 @@ def compute_fraud_metrics(
     y_pred_proba: np.ndarray,
     threshold: float = 0.5,
     y_baseline_proba: np.ndarray | None = None,
+    sample_weight: np.ndarray | None = None,
+    baseline_weight: np.ndarray | None = None,
 ) -> dict:
-    """Compute fraud-specific metrics."""
+    """Compute fraud-specific metrics; sample_weight gives each row's population weight (e.g. 1 / sampling rate)."""
     y_true = np.asarray(y_true).flatten()
     y_pred_proba = np.asarray(y_pred_proba).flatten()
-    ks, _, _, _, _ = calculate_ks(y_true, y_pred_proba)
-    auc = calculate_auc(y_true, y_pred_proba)
-    ca10 = calculate_ca_at_k(y_true, y_pred_proba, 10.0)
-    prec5 = precision_at_k(y_true, y_pred_proba, 5.0)
+    w = _weights(sample_weight, len(y_true))
+    ks, _, _, _, _ = calculate_ks(y_true, y_pred_proba, sample_weight)
+    auc = calculate_auc(y_true, y_pred_proba, sample_weight)
+    ca10 = calculate_ca_at_k(y_true, y_pred_proba, 10.0, sample_weight)
+    prec5 = precision_at_k(y_true, y_pred_proba, 5.0, sample_weight)
     pred_pos = y_pred_proba >= threshold
-    n_pred_pos = np.sum(pred_pos)
-    n_total = len(y_true)
+    n_pred_pos = w[pred_pos].sum()
+    n_total = w.sum()
     alert_rate = float(n_pred_pos / n_total) if n_total else 0.0
-    tn = np.sum((y_true == 0) & (~pred_pos))
-    n_neg = np.sum(y_true == 0)
+    tn = w[(y_true == 0) & (~pred_pos)].sum()
+    n_neg = w[y_true == 0].sum()
     fpr = float(1 - tn / n_neg) if n_neg else 0.0
-    fraud_in_alerts = np.sum(y_true[pred_pos] == 1) / n_pred_pos if n_pred_pos else 0.0
-    # AUC-PR approximation (simplified)
-    from sklearn.metrics import average_precision_score
-    try:
-        auc_pr = float(average_precision_score(y_true, y_pred_proba))
-    except Exception:
-        auc_pr = 0.0
+    fraud_in_alerts = w[pred_pos & (y_true == 1)].sum() / n_pred_pos if n_pred_pos else 0.0
+    auc_pr = calculate_auc_pr(y_true, y_pred_proba, sample_weight)
     psi = 0.0
     if y_baseline_proba is not None and len(y_baseline_proba) > 0:
-        psi = calculate_psi(np.asarray(y_baseline_proba).flatten(), y_pred_proba)
+        psi = calculate_psi(np.asarray(y_baseline_proba).flatten(), y_pred_proba, baseline_weight=baseline_weight, current_weight=sample_weight)
     return {
         "KS": round(float(ks), 4),
         "PSI": round(float(psi), 4),
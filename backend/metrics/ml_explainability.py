@@ -1,25 +1,197 @@
 """
-ML model explainability: feature importance and drift (prototype).
+ML model explainability: permutation importance, linear SHAP contributions and importance drift.
+
+The monitoring store holds scores, not model objects, so importances are computed against a
+linear surrogate fitted to logit(score) on the dataset's feature columns (its R^2 is reported
+as surrogate_r2). A real model can be plugged in by passing predict_fn. Work is bounded by a
+stratified row sample, and feature permutations are spread across a process pool.
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable
+
 import numpy as np
 
+from .auc_ca import calculate_auc
+
+DEFAULT_SAMPLE_SIZE = int(os.environ.get("MM_EXPLAIN_SAMPLE_SIZE", "20000"))
+DEFAULT_REPEATS = 3
+MAX_WORKERS = int(os.environ.get("MM_EXPLAIN_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Below this many (rows x features x repeats) permutations, run in-process
+_PARALLEL_MIN_WORK = 2_000_000
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def stratified_sample(y: np.ndarray, sample_size: int, seed: int = 0) -> np.ndarray:
+    """Row indices of a sample that keeps the class mix of y (at least one row per class when possible)."""
+    y = np.asarray(y).flatten()
+    n = len(y)
+    if n <= sample_size:
+        return np.arange(n)
+    rng = np.random.default_rng(seed)
+    out = []
+    for cls in np.unique(y):
+        idx = np.flatnonzero(y == cls)
+        k = max(1, int(round(sample_size * len(idx) / n)))
+        out.append(rng.choice(idx, size=min(k, len(idx)), replace=False))
+    return np.sort(np.concatenate(out))
+
+
+class LinearSurrogate:
+    """Least-squares fit of logit(score) on standardized features; picklable for worker processes."""
+
+    def __init__(self, X: np.ndarray, score: np.ndarray):
+        p = np.clip(np.asarray(score, dtype=float), 1e-6, 1 - 1e-6)
+        target = np.log(p / (1 - p))
+        self.mean = X.mean(axis=0)
+        self.scale = np.where(X.std(axis=0) > 0, X.std(axis=0), 1.0)
+        Z = np.c_[np.ones(len(X)), (X - self.mean) / self.scale]
+        beta, *_ = np.linalg.lstsq(Z, target, rcond=None)
+        self.intercept, self.coef = beta[0], beta[1:]
+        resid = target - Z @ beta
+        total = ((target - target.mean()) ** 2).sum()
+        self.r2 = float(1 - (resid ** 2).sum() / total) if total > 0 else 0.0
+
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        return self.intercept + ((X - self.mean) / self.scale) @ self.coef
+
+    def contributions(self, X: np.ndarray) -> np.ndarray:
+        """Exact SHAP values of a linear model: coef_j * (x_j - E[x_j]) in standardized units."""
+        return ((X - self.mean) / self.scale) * self.coef
+
+
+def _permute_features(args: tuple) -> list[tuple[int, float]]:
+    """Worker task: mean AUC drop for each feature index in a group."""
+    predict_fn, X, y, base_auc, features, repeats, seed = args
+    out = []
+    for j in features:
+        # Seeded per feature so results do not depend on how features were grouped
+        rng = np.random.default_rng([seed, int(j)])
+        drops = []
+        Xp = X.copy()
+        for _ in range(repeats):
+            Xp[:, j] = X[rng.permutation(len(X)), j]
+            drops.append(base_auc - calculate_auc(y, predict_fn(Xp)))
+        out.append((j, float(np.mean(drops))))
+    return out
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: safe to start from threaded server processes
+        _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=get_context("spawn"))
+    return _pool
+
+
+def permutation_importance(
+    predict_fn: Callable[[np.ndarray], np.ndarray],
+    X: np.ndarray,
+    y: np.ndarray,
+    repeats: int = DEFAULT_REPEATS,
+    seed: int = 0,
+    parallel: bool | None = None,
+) -> np.ndarray:
+    """Mean drop in AUC when each feature column is shuffled (one value per column)."""
+    n, p = X.shape
+    base_auc = calculate_auc(y, predict_fn(X))
+    if parallel is None:
+        parallel = MAX_WORKERS > 1 and p > 1 and n * p * repeats >= _PARALLEL_MIN_WORK
+    groups = [list(g) for g in np.array_split(np.arange(p), MAX_WORKERS if parallel else 1) if len(g)]
+    tasks = [(predict_fn, X, y, base_auc, g, repeats, seed) for g in groups]
+    results = _get_pool().map(_permute_features, tasks) if parallel else map(_permute_features, tasks)
+    importance = np.zeros(p)
+    for group in results:
+        for j, drop in group:
+            importance[j] = drop
+    return importance
+
+
+def _normalized(values: np.ndarray) -> np.ndarray:
+    values = np.clip(values, 0, None)
+    total = values.sum()
+    return values / total if total > 0 else np.full(len(values), 1 / max(len(values), 1))
+
+
+def compute_feature_importance(
+    X: np.ndarray,
+    y: np.ndarray,
+    score: np.ndarray,
+    feature_names: list[str],
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    repeats: int = DEFAULT_REPEATS,
+    predict_fn: Callable[[np.ndarray], np.ndarray] | None = None,
+    seed: int = 0,
+) -> dict:
+    """
+    Explainability summary for one dataset:
+    { method, sample_size, surrogate_r2, feature_importance: [ { feature, importance,
+      permutation_auc_drop, mean_abs_shap } ] } sorted by importance (normalized to sum to 1).
+    """
+    X = np.asarray(X, dtype=float)
+    X = np.where(np.isnan(X), np.nanmean(X, axis=0), X) if np.isnan(X).any() else X
+    idx = stratified_sample(y, sample_size, seed)
+    Xs, ys, ss = X[idx], np.asarray(y)[idx], np.asarray(score, dtype=float)[idx]
+    surrogate = LinearSurrogate(Xs, ss)
+    fn = predict_fn or surrogate
+    perm = permutation_importance(fn, Xs, ys, repeats=repeats, seed=seed)
+    shap = np.abs(surrogate.contributions(Xs)).mean(axis=0)
+    # Permutation importance when it carries signal, else the SHAP magnitudes
+    importance = _normalized(perm) if (perm > 0).any() else _normalized(shap)
+    order = np.argsort(-importance)
+    return {
+        "method": "permutation_auc_drop" + ("" if predict_fn else "+linear_surrogate"),
+        "sample_size": int(len(idx)),
+        "surrogate_r2": round(surrogate.r2, 4),
+        "feature_importance": [
+            {
+                "feature": feature_names[j],
+                "importance": round(float(importance[j]), 4),
+                "permutation_auc_drop": round(float(perm[j]), 4),
+                "mean_abs_shap": round(float(shap[j]), 4),
+            }
+            for j in order
+        ],
+    }
+
 
-def get_feature_importance(feature_names: list[str], n: int = 5) -> list[dict]:
-    """Placeholder: return mock feature importance for UI."""
-    np.random.seed(hash(tuple(feature_names)) % 2**32)
-    imp = np.random.dirichlet(np.ones(len(feature_names)))
-    imp = imp / imp.sum()
-    out = [
-        {"feature": name, "importance": round(float(val), 4)}
-        for name, val in sorted(zip(feature_names, imp), key=lambda x: -x[1])
-    ]
-    return out[:n]
+def _spearman(a: np.ndarray, b: np.ndarray) -> float:
+    def _ranks(x):
+        order = np.argsort(x, kind="mergesort")
+        ranks = np.empty(len(x))
+        ranks[order] = np.arange(len(x))
+        # Average ranks over ties
+        _, inv, counts = np.unique(x, return_inverse=True, return_counts=True)
+        sums = np.bincount(inv, weights=ranks)
+        return (sums / counts)[inv]
+    ra, rb = _ranks(a), _ranks(b)
+    if ra.std() == 0 or rb.std() == 0:
+        return 1.0 if np.array_equal(ra, rb) else 0.0
+    return float(np.corrcoef(ra, rb)[0, 1])
 
 
 def get_importance_drift(
     baseline_importance: list[dict],
     current_importance: list[dict],
-) -> float:
-    """Rank correlation or simple drift between two importance vectors (placeholder)."""
-    return round(0.05 + np.random.rand() * 0.15, 4)
+) -> dict:
+    """
+    Spearman rank correlation of importances over the features both runs share; features only
+    one run has are listed as added / dropped, not ranked. importance_drift = (1 - rho) / 2:
+    0 = same ranking, 1 = reversed.
+    """
+    base = {f["feature"]: f["importance"] for f in baseline_importance}
+    curr = {f["feature"]: f["importance"] for f in current_importance}
+    features = sorted(set(base) & set(curr))
+    changed = {"added_features": sorted(set(curr) - set(base)), "dropped_features": sorted(set(base) - set(curr))}
+    if len(features) < 2:
+        return {"rank_correlation": 1.0, "importance_drift": 0.0, "n_features": len(features), **changed}
+    rho = _spearman(np.array([base[f] for f in features]), np.array([curr[f] for f in features]))
+    return {
+        "rank_correlation": round(rho, 4),
+        "importance_drift": round((1 - rho) / 2, 4),
+        "n_features": len(features),
+        **changed,
+    }
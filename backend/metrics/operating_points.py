@@ -0,0 +1,114 @@
+"""
+Operating points for alerting models (fraud): precision, recall, FPR, alert rate and expected
+cost at every distinct score threshold.
+
+OperatingCurve does one descending sort and keeps cumulative (tp, fp) counts per distinct
+threshold. Every query afterwards is a lookup or binary search: metrics at a threshold or grid,
+the highest-recall threshold within an alert budget (alerts grow monotonically as the threshold
+drops), and the minimum-cost threshold for a cost matrix (always a vertex of the ROC convex hull).
+"""
+
+import numpy as np
+
+DEFAULT_COSTS = {"tp": 0.0, "fp": 1.0, "fn": 10.0, "tn": 0.0}
+
+
+class OperatingCurve:
+    """
+    Cumulative confusion counts at each distinct threshold; index 0 is 'alert on nothing'.
+    With sample_weight (e.g. 1 / sampling rate of downsampled negatives) counts are population-weighted.
+    """
+
+    def __init__(self, y_true: np.ndarray, y_score: np.ndarray, sample_weight: np.ndarray | None = None):
+        y_true = np.asarray(y_true).flatten() == 1
+        y_score = np.asarray(y_score, dtype=float).flatten()
+        w = np.ones(len(y_score)) if sample_weight is None else np.asarray(sample_weight, dtype=float).flatten()
+        order = np.argsort(y_score, kind="mergesort")[::-1]
+        s, pos, ws = y_score[order], y_true[order], w[order]
+        ends = np.r_[np.flatnonzero(np.diff(s)), len(s) - 1] if len(s) else np.zeros(0, dtype=np.int64)
+        cum_pos, cum_w = np.cumsum(ws * pos), np.cumsum(ws)
+        # Alerting on score >= thresholds[k] flags tp[k] positives and fp[k] negatives
+        self.thresholds = np.r_[np.inf, s[ends]]
+        self.tp = np.r_[0.0, cum_pos[ends]]
+        self.fp = np.r_[0.0, cum_w[ends]] - self.tp
+        self.n = float(ws.sum())
+        self.n_pos = float((ws * pos).sum())
+        self.n_neg = self.n - self.n_pos
+        self._hull = self._roc_hull()
+
+    def _roc_hull(self) -> np.ndarray:
+        """Indices of the upper convex hull of the (fp, tp) points, from (0, 0) outwards."""
+        hull: list[int] = []
+        for k in range(len(self.tp)):
+            while len(hull) >= 2:
+                a, b = hull[-2], hull[-1]
+                cross = (self.fp[b] - self.fp[a]) * (self.tp[k] - self.tp[a]) - (self.tp[b] - self.tp[a]) * (self.fp[k] - self.fp[a])
+                if cross >= 0:
+                    hull.pop()
+                else:
+                    break
+            hull.append(k)
+        return np.asarray(hull, dtype=np.int64)
+
+    def index_at(self, thresholds) -> np.ndarray:
+        """Curve index for each threshold (alert when score >= threshold)."""
+        ascending = self.thresholds[:0:-1]
+        return len(ascending) - np.searchsorted(ascending, np.asarray(thresholds, dtype=float), side="left")
+
+    def grid(self, n_points: int) -> np.ndarray:
+        """Curve indices at n_points evenly spaced alert-rate quantiles (always includes both ends)."""
+        alerts = self.tp + self.fp
+        targets = np.linspace(0, self.n, max(n_points, 2))
+        return np.unique(np.clip(np.searchsorted(alerts, targets, side="left"), 0, len(alerts) - 1))
+
+    def cost(self, costs: dict | None = None) -> np.ndarray:
+        c = {**DEFAULT_COSTS, **(costs or {})}
+        fn, tn = self.n_pos - self.tp, self.n_neg - self.fp
+        return c["tp"] * self.tp + c["fp"] * self.fp + c["fn"] * fn + c["tn"] * tn
+
+    def points(self, idx: np.ndarray | None = None, costs: dict | None = None) -> dict[str, list]:
+        """Column-oriented metrics at the given curve indices (default: every distinct threshold)."""
+        idx = np.arange(1, len(self.tp)) if idx is None else np.asarray(idx, dtype=np.int64)
+        tp, fp = self.tp[idx], self.fp[idx]
+        alerts = tp + fp
+
+        def _ratio(num, den):
+            return np.divide(num, den, out=np.zeros(len(idx)), where=den > 0)
+
+        columns = {
+            "threshold": self.thresholds[idx],
+            "alerts": alerts,
+            "alert_rate": _ratio(alerts, np.full(len(idx), self.n)),
+            "precision": _ratio(tp, alerts),
+            "recall": _ratio(tp, np.full(len(idx), self.n_pos)),
+            "fpr": _ratio(fp, np.full(len(idx), self.n_neg)),
+            "cost": self.cost(costs)[idx],
+        }
+        return {
+            k: [None if not np.isfinite(v) else round(float(v), 6) for v in arr]
+            for k, arr in columns.items()
+        }
+
+    def _point(self, k: int, costs: dict | None = None) -> dict:
+        return {key: values[0] for key, values in self.points(np.array([k]), costs).items()}
+
+    def max_recall_within(self, max_alerts: float, costs: dict | None = None) -> dict:
+        """Lowest threshold (highest recall) whose alert count is at most max_alerts."""
+        k = int(np.searchsorted(self.tp + self.fp, max_alerts, side="right")) - 1
+        return {**self._point(max(k, 0), costs), "max_alerts": max_alerts}
+
+    def min_cost(self, costs: dict | None = None) -> dict:
+        """
+        Threshold minimizing expected cost. cost = const + a * fp - b * tp with a = c_fp - c_tn and
+        b = c_fn - c_tp; for a, b >= 0 the optimum is the hull vertex where edge slopes drop below a / b.
+        """
+        c = {**DEFAULT_COSTS, **(costs or {})}
+        a, b = c["fp"] - c["tn"], c["fn"] - c["tp"]
+        if a >= 0 and b > 0:
+            h = self._hull
+            dfp, dtp = np.diff(self.fp[h]), np.diff(self.tp[h])
+            slopes = np.divide(dtp, dfp, out=np.full(len(dfp), np.inf), where=dfp > 0)
+            k = int(h[np.searchsorted(-slopes, -a / b, side="left")])
+        else:
+            k = int(np.argmin(self.cost(c)))
+        return {**self._point(k, c), "costs": c}
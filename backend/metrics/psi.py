@@ -9,15 +9,20 @@ def calculate_psi(
     baseline: np.ndarray,
     current: np.ndarray,
     n_bins: int = 10,
+    baseline_weight: np.ndarray | None = None,
+    current_weight: np.ndarray | None = None,
 ) -> float:
     """
     Compute PSI between baseline and current score/probability distributions.
-    PSI > 0.25 often indicates significant shift.
+    PSI > 0.25 often indicates significant shift. Optional weights give each row's share of its population.
     """
-    def _bin_pcts(arr: np.ndarray, edges: np.ndarray) -> np.ndarray:
-        pcts = np.zeros(len(edges) - 1)
-        for i in range(len(edges) - 1):
-            pcts[i] = np.sum((arr >= edges[i]) & (arr < edges[i + 1])) / len(arr)
+    def _bin_pcts(arr: np.ndarray, edges: np.ndarray, weights: np.ndarray | None) -> np.ndarray:
+        weights = np.ones(len(arr)) if weights is None else np.asarray(weights, dtype=float).flatten()
+        # Bin i holds edges[i] <= x < edges[i + 1]
+        idx = np.searchsorted(edges, arr, side="right") - 1
+        inside = (idx >= 0) & (idx < len(edges) - 1)
+        total = weights.sum()
+        pcts = np.bincount(idx[inside], weights=weights[inside], minlength=len(edges) - 1) / total if total > 0 else np.zeros(len(edges) - 1)
         pcts = np.clip(pcts, 1e-6, 1.0)  # avoid log(0)
         return pcts
 
@@ -28,7 +33,7 @@ def calculate_psi(
     if max_val <= min_val:
         return 0.0
     edges = np.linspace(min_val, max_val, n_bins + 1)
-    p_baseline = _bin_pcts(baseline, edges)
-    p_current = _bin_pcts(current, edges)
+    p_baseline = _bin_pcts(baseline, edges, baseline_weight)
+    p_current = _bin_pcts(current, edges, current_weight)
     psi = np.sum((p_current - p_baseline) * (np.log(p_current) - np.log(p_baseline)))
     return float(psi)
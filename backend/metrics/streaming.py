@@ -0,0 +1,356 @@
+"""
+Out-of-core binary-classification metrics: KS, AUC, AUC-PR, CA@k, PSI, alert counts and score
+deciles for datasets read in chunks (e.g. memory-mapped arena columns), with memory bounded by
+the chunk size instead of the row count.
+
+ScoreHistogram keeps weighted positive / negative counts per distinct score. Each chunk is
+reduced with np.unique and merged in, so every metric is exact while the number of distinct
+scores stays under max_distinct (model scores are usually rounded). Past that, scores are
+snapped to a power-of-two grid that is coarsened until they fit; the histogram then reports its
+resolution and metrics are exact up to ties within one grid cell. Histograms merge, so chunks can
+be reduced independently (or in parallel) and combined; appended rows (add) and late labels
+(relabel) update a stored histogram without revisiting the rows already in it.
+
+parallel_histogram builds an exact, uncapped histogram of in-memory arrays on worker threads
+(NumPy sorts release the GIL), as a parallel sample sort: blocks of rows are reduced to sorted
+runs, then disjoint score ranges are merged across blocks and concatenated in order.
+"""
+
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import numpy as np
+
+from .curves import DEFAULT_BASIS_POINTS, basis_from_counts
+from .psi import calculate_psi
+
+DEFAULT_CHUNK_ROWS = int(os.environ.get("MM_CHUNK_ROWS", str(1_000_000)))
+DEFAULT_MAX_DISTINCT = int(os.environ.get("MM_HIST_MAX_DISTINCT", str(1 << 20)))
+# Worker threads for parallel_histogram, and the row count above which compute-metrics uses it
+DEFAULT_WORKERS = int(os.environ.get("MM_METRIC_WORKERS", str(os.cpu_count() or 1)))
+PARALLEL_MIN_ROWS = int(os.environ.get("MM_PARALLEL_ROWS", str(2_000_000)))
+
+
+def iter_chunks(columns: dict[str, np.ndarray], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[dict[str, np.ndarray]]:
+    """Row slices of the given columns; slices of memory-mapped columns are views, so only touched pages are read."""
+    n = len(next(iter(columns.values()))) if columns else 0
+    for start in range(0, n, max(int(chunk_rows), 1)):
+        yield {name: arr[start:start + chunk_rows] for name, arr in columns.items()}
+
+
+class ScoreHistogram:
+    """Weighted positive / negative counts per distinct (or grid-snapped) score, ascending."""
+
+    def __init__(self, max_distinct: int = DEFAULT_MAX_DISTINCT):
+        self.max_distinct = max(int(max_distinct), 2)
+        self.values = np.zeros(0)
+        self.pos = np.zeros(0)
+        self.neg = np.zeros(0)
+        self.resolution = 0.0  # 0: exact distinct scores; else width of the grid cells
+        self.min = np.inf
+        self.max = -np.inf
+        self.rows = 0
+        self.weighted = False
+        self._desc: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
+
+    @classmethod
+    def from_counts(
+        cls, values: np.ndarray, pos: np.ndarray, neg: np.ndarray, rows: int, weighted: bool = False
+    ) -> "ScoreHistogram":
+        """Histogram from ascending distinct scores and their counts; the cap admits at least all of them."""
+        hist = cls(max_distinct=max(len(values), DEFAULT_MAX_DISTINCT))
+        hist.values, hist.pos, hist.neg = values, pos, neg
+        hist._desc = None
+        hist.rows, hist.weighted = int(rows), weighted
+        if len(values):
+            hist.min, hist.max = float(values[0]), float(values[-1])
+        return hist
+
+    @property
+    def exact(self) -> bool:
+        return self.resolution == 0
+
+    @property
+    def n_pos(self) -> float:
+        return float(self.pos.sum())
+
+    @property
+    def n_neg(self) -> float:
+        return float(self.neg.sum())
+
+    @property
+    def total(self) -> float:
+        return self.n_pos + self.n_neg
+
+    def add(self, y_true: np.ndarray, y_score: np.ndarray, sample_weight: np.ndarray | None = None) -> "ScoreHistogram":
+        """Reduce one chunk of rows into the histogram."""
+        y = np.asarray(y_true).flatten() == 1
+        s = np.asarray(y_score, dtype=float).flatten()
+        if not len(s):
+            return self
+        w = np.ones(len(s)) if sample_weight is None else np.asarray(sample_weight, dtype=float).flatten()
+        self.weighted |= sample_weight is not None
+        self.rows += len(s)
+        self.min, self.max = min(self.min, float(s.min())), max(self.max, float(s.max()))
+        if self.resolution:
+            s = self._snap(s, self.resolution)
+        values, inv = np.unique(s, return_inverse=True)
+        pos = np.bincount(inv, weights=w * y, minlength=len(values))
+        neg = np.bincount(inv, weights=w * ~y, minlength=len(values))
+        self._merge(values, pos, neg)
+        return self
+
+    def relabel(
+        self, y_old: np.ndarray, y_new: np.ndarray, y_score: np.ndarray, sample_weight: np.ndarray | None = None
+    ) -> "ScoreHistogram":
+        """
+        Move rows already in the histogram between negatives and positives (label updates), in
+        O(updated rows + distinct scores): their scores, and so every score's total, are unchanged.
+        """
+        s = np.asarray(y_score, dtype=float).flatten()
+        if not len(s):
+            return self
+        w = np.ones(len(s)) if sample_weight is None else np.asarray(sample_weight, dtype=float).flatten()
+        shift = w * ((np.asarray(y_new).flatten() == 1).astype(float) - (np.asarray(y_old).flatten() == 1))
+        if self.resolution:
+            s = self._snap(s, self.resolution)
+        values, inv = np.unique(s, return_inverse=True)
+        moved = np.bincount(inv, weights=shift, minlength=len(values))
+        self._merge(values, moved, -moved)
+        return self
+
+    def copy(self) -> "ScoreHistogram":
+        """Independent copy (updates replace the count arrays rather than writing into them)."""
+        return copy.copy(self)
+
+    def merge(self, other: "ScoreHistogram") -> "ScoreHistogram":
+        """Fold another histogram (e.g. of a different chunk) into this one."""
+        self.rows += other.rows
+        self.weighted |= other.weighted
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        resolution = max(self.resolution, other.resolution)
+        if resolution > self.resolution:
+            self._rebin(resolution)
+        values = self._snap(other.values, resolution) if resolution > other.resolution else other.values
+        self._merge(values, other.pos, other.neg)
+        return self
+
+    @staticmethod
+    def _snap(values: np.ndarray, resolution: float) -> np.ndarray:
+        return np.floor(values / resolution) * resolution
+
+    def _merge(self, values: np.ndarray, pos: np.ndarray, neg: np.ndarray) -> None:
+        merged, inv = np.unique(np.r_[self.values, values], return_inverse=True)
+        self.pos = np.bincount(inv, weights=np.r_[self.pos, pos], minlength=len(merged))
+        self.neg = np.bincount(inv, weights=np.r_[self.neg, neg], minlength=len(merged))
+        self.values = merged
+        self._desc = None
+        while len(self.values) > self.max_distinct:
+            # Power-of-two cells nest, so coarsening again only merges whole cells
+            span = self.max - self.min
+            self._rebin(self.resolution * 2 if self.resolution else 2.0 ** np.ceil(np.log2(2 * span / self.max_distinct)))
+
+    def _rebin(self, resolution: float) -> None:
+        self.resolution = resolution
+        values, inv = np.unique(self._snap(self.values, resolution), return_inverse=True)
+        self.pos = np.bincount(inv, weights=self.pos, minlength=len(values))
+        self.neg = np.bincount(inv, weights=self.neg, minlength=len(values))
+        self.values = values
+        self._desc = None
+
+    def _descending(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(thresholds, cum_pos, cum_total) walking scores from the highest, at each distinct score (cached)."""
+        if self._desc is None:
+            counts = (self.pos + self.neg)[::-1]
+            keep = counts > 0
+            self._desc = self.values[::-1][keep], np.cumsum(self.pos[::-1])[keep], np.cumsum(counts)[keep]
+        return self._desc
+
+    def _pos_at(self, population: np.ndarray) -> np.ndarray:
+        """Positives among the top `population` rows by score; rows tied at the cut-off count pro rata."""
+        _, cum_pos, cum_total = self._descending()
+        return np.interp(population, np.r_[0.0, cum_total], np.r_[0.0, cum_pos])
+
+    def ks(self) -> tuple[float, float]:
+        """(KS, threshold) evaluated at distinct scores (ties are never split)."""
+        thresholds, cum_pos, cum_total = self._descending()
+        n_pos, n_neg = self.n_pos, self.n_neg
+        if not len(thresholds) or n_pos == 0 or n_neg == 0:
+            return 0.0, 0.0
+        gap = np.abs(cum_pos / n_pos - (cum_total - cum_pos) / n_neg)
+        i = int(np.argmax(gap))
+        return float(gap[i]), float(thresholds[i])
+
+    def auc(self) -> float:
+        """ROC AUC by the trapezoid rule over distinct thresholds (as calculate_auc)."""
+        _, cum_pos, cum_total = self._descending()
+        n_pos, n_neg = self.n_pos, self.n_neg
+        if n_pos == 0 or n_neg == 0:
+            return 0.5
+        tpr = np.r_[0.0, cum_pos / n_pos]
+        fpr = np.r_[0.0, (cum_total - cum_pos) / n_neg]
+        return float(np.clip(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2), 0.0, 1.0))
+
+    def auc_pr(self) -> float:
+        """Average precision over distinct thresholds (as calculate_auc_pr)."""
+        _, cum_pos, cum_total = self._descending()
+        n_pos = self.n_pos
+        if n_pos == 0:
+            return 0.0
+        precision = np.divide(cum_pos, cum_total, out=np.zeros(len(cum_pos)), where=cum_total > 0)
+        return float(np.sum(np.diff(np.r_[0.0, cum_pos / n_pos]) * precision))
+
+    def ca_at_k(self, k_percent: float = 10.0) -> float:
+        """Share of positives captured in the top k% of the population."""
+        n_pos = self.n_pos
+        return float(self._pos_at(np.array([self.total * k_percent / 100]))[0] / n_pos) if n_pos else 0.0
+
+    def precision_at_k(self, k_percent: float) -> float:
+        top = self.total * k_percent / 100
+        return float(self._pos_at(np.array([top]))[0] / top) if top > 0 else 0.0
+
+    def counts_at(self, threshold: float) -> tuple[float, float]:
+        """(positives, negatives) with score >= threshold."""
+        i = int(np.searchsorted(self.values, threshold, side="left"))
+        return float(self.pos[i:].sum()), float(self.neg[i:].sum())
+
+    def psi(self, baseline: "ScoreHistogram", n_bins: int = 10) -> float:
+        """PSI of this (current) distribution against a baseline histogram, binned as calculate_psi."""
+        if not len(self.values) or not len(baseline.values):
+            return 0.0
+        return calculate_psi(
+            baseline.values, self.values, n_bins,
+            baseline_weight=baseline.pos + baseline.neg, current_weight=self.pos + self.neg,
+        )
+
+    def deciles(self, n: int = 10) -> list[dict]:
+        """Score deciles (1 = highest scores): [ { decile, count, bad_count, bad_rate, min_score, max_score } ]."""
+        thresholds, _, cum_total = self._descending()
+        total = self.total
+        if not len(thresholds) or total <= 0:
+            return []
+        edges = total * np.arange(n + 1) / n
+        if not self.weighted:
+            edges = np.floor(edges + 1e-9)
+        bads = np.diff(self._pos_at(edges))
+        counts = np.diff(edges)
+        # Score range: the distinct scores holding the first and last row of each decile
+        first = np.searchsorted(cum_total, edges[:-1], side="right")
+        first = np.clip(first, 0, len(thresholds) - 1)
+        last = np.clip(np.searchsorted(cum_total, edges[1:], side="left"), 0, len(thresholds) - 1)
+        out = []
+        for d in range(n):
+            if counts[d] <= 0:
+                continue
+            out.append({
+                "decile": d + 1,
+                "count": round(float(counts[d]), 4) if self.weighted else int(counts[d]),
+                "bad_count": round(float(bads[d]), 4) if self.weighted else int(round(bads[d])),
+                "bad_rate": round(float(bads[d] / counts[d]), 4),
+                "min_score": round(float(thresholds[last[d]]), 6),
+                "max_score": round(float(thresholds[first[d]]), 6),
+            })
+        return out
+
+    def curve_basis(self, max_points: int = DEFAULT_BASIS_POINTS) -> dict:
+        """Curve basis (see metrics.curves) from the histogram instead of the rows."""
+        thresholds, cum_pos, cum_total = self._descending()
+        return basis_from_counts(thresholds, cum_pos, cum_total - cum_pos, max_points)
+
+    def describe(self) -> dict:
+        return {"rows": self.rows, "distinct_scores": int(len(self.values)), "exact": bool(self.exact), "resolution": float(self.resolution)}
+
+
+def _reduce(y: np.ndarray, s: np.ndarray, w: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    values, inv = np.unique(s, return_inverse=True)
+    return (
+        values,
+        np.bincount(inv, weights=w * y, minlength=len(values)),
+        np.bincount(inv, weights=w * ~y, minlength=len(values)),
+    )
+
+
+def parallel_histogram(
+    y_true: np.ndarray,
+    y_score: np.ndarray,
+    sample_weight: np.ndarray | None = None,
+    workers: int | None = None,
+) -> ScoreHistogram:
+    """
+    Exact ScoreHistogram (no distinct-score cap) of in-memory arrays using `workers` threads.
+    Pass 1 reduces contiguous row blocks to sorted (score, pos, neg) runs; pass 2 merges each
+    score range, split at quantiles of a strided sample, across all blocks.
+    """
+    y = np.asarray(y_true).flatten() == 1
+    s = np.asarray(y_score, dtype=float).flatten()
+    w = np.ones(len(s)) if sample_weight is None else np.asarray(sample_weight, dtype=float).flatten()
+    n = len(s)
+    workers = max(1, min(int(workers or DEFAULT_WORKERS), n // 2 or 1))
+    if workers == 1:
+        return ScoreHistogram.from_counts(*_reduce(y, s, w), rows=n, weighted=sample_weight is not None)
+    bounds = np.linspace(0, n, workers + 1).astype(np.int64)
+    splits = np.unique(np.quantile(s[::max(1, n // (256 * workers))], np.linspace(0, 1, workers + 1)[1:-1]))
+    edges = np.r_[-np.inf, splits, np.inf]
+
+    def reduce_block(i: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        lo, hi = bounds[i], bounds[i + 1]
+        return _reduce(y[lo:hi], s[lo:hi], w[lo:hi])
+
+    def merge_range(j: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        parts = []
+        for values, pos, neg in blocks:
+            lo, hi = np.searchsorted(values, edges[j], side="left"), np.searchsorted(values, edges[j + 1], side="left")
+            parts.append((values[lo:hi], pos[lo:hi], neg[lo:hi]))
+        values, inv = np.unique(np.concatenate([p[0] for p in parts]), return_inverse=True)
+        return (
+            values,
+            np.bincount(inv, weights=np.concatenate([p[1] for p in parts]), minlength=len(values)),
+            np.bincount(inv, weights=np.concatenate([p[2] for p in parts]), minlength=len(values)),
+        )
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mm-metrics") as pool:
+        blocks = list(pool.map(reduce_block, range(workers)))
+        ranges = list(pool.map(merge_range, range(len(edges) - 1)))
+    return ScoreHistogram.from_counts(
+        np.concatenate([r[0] for r in ranges]),
+        np.concatenate([r[1] for r in ranges]),
+        np.concatenate([r[2] for r in ranges]),
+        rows=n,
+        weighted=sample_weight is not None,
+    )
+
+
+def scorecard_metrics(hist: ScoreHistogram, baseline: ScoreHistogram | None = None) -> dict:
+    """compute_scorecard_metrics from a histogram (KS is evaluated at distinct scores)."""
+    ks, ks_threshold = hist.ks()
+    auc = hist.auc()
+    psi = hist.psi(baseline) if baseline is not None else 0.0
+    return {
+        "KS": round(float(ks), 4),
+        "PSI": round(float(psi), 4),
+        "AUC": round(float(auc), 4),
+        "CA_at_10": round(hist.ca_at_k(10.0), 4),
+        "Gini": round(float(2 * auc - 1), 4),
+        "KS_threshold": round(float(ks_threshold), 4),
+    }
+
+
+def fraud_metrics(hist: ScoreHistogram, threshold: float = 0.5, baseline: ScoreHistogram | None = None) -> dict:
+    """compute_fraud_metrics from a histogram."""
+    ks, _ = hist.ks()
+    tp, fp = hist.counts_at(threshold)
+    alerts, total, n_neg = tp + fp, hist.total, hist.n_neg
+    psi = hist.psi(baseline) if baseline is not None else 0.0
+    return {
+        "KS": round(float(ks), 4),
+        "PSI": round(float(psi), 4),
+        "AUC": round(float(hist.auc()), 4),
+        "AUC_PR": round(float(hist.auc_pr()), 4),
+        "CA_at_10": round(hist.ca_at_k(10.0), 4),
+        "precision_at_5": round(hist.precision_at_k(5.0), 4),
+        "alert_rate": round(alerts / total, 4) if total else 0.0,
+        "fpr_at_threshold": round(fp / n_neg, 4) if n_neg else 0.0,
+        "fraud_rate_in_alerts": round(tp / alerts, 4) if alerts else 0.0,
+    }
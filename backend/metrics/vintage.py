@@ -0,0 +1,158 @@
+"""
+Vintage / cohort analysis: bad rate by months-on-book (MOB) per origination vintage.
+
+Performance arrives monthly. Each batch is first reduced to a small (vintage x MOB) cell
+increment with one bincount (aggregate_increment, O(new rows)); VintageCurves keeps the
+running per-cell accumulators and applies increments in O(cells touched), so curves never
+need the full performance history. Maturity-adjusted bad rates use chain-ladder development
+factors estimated from vintages that have already reached later MOBs.
+"""
+
+import numpy as np
+
+DEFAULT_TARGET_MOB = 12
+
+
+def aggregate_increment(
+    vintage: np.ndarray,
+    mob: np.ndarray,
+    bad: np.ndarray,
+    balance: np.ndarray | None = None,
+) -> dict:
+    """
+    Reduce performance rows (one per account at a MOB; bad = cumulative bad flag at that MOB)
+    to per-cell sums: { vintages, max_mob, accounts, bads, balance, bad_balance } with
+    (n_vintages, max_mob + 1) arrays.
+    """
+    vintage = np.asarray(vintage).flatten().astype(str)
+    mob = np.asarray(mob).flatten().astype(np.int64)
+    bad = np.nan_to_num(np.asarray(bad, dtype=float).flatten()) > 0
+    if len(vintage) != len(mob) or len(mob) != len(bad):
+        raise ValueError("vintage, mob and bad must have the same length")
+    if len(mob) and mob.min() < 0:
+        raise ValueError("mob must be non-negative")
+    labels, v_codes = np.unique(vintage, return_inverse=True)
+    width = int(mob.max()) + 1 if len(mob) else 1
+    codes = v_codes * width + mob
+    size = len(labels) * width
+    bal = np.ones(len(mob)) if balance is None else np.nan_to_num(np.asarray(balance, dtype=float).flatten())
+
+    def _cells(weights=None):
+        return np.bincount(codes, weights=weights, minlength=size).reshape(len(labels), width)
+
+    return {
+        "vintages": [str(v) for v in labels],
+        "max_mob": width - 1,
+        "accounts": _cells(),
+        "bads": _cells(bad.astype(float)),
+        "balance": _cells(bal),
+        "bad_balance": _cells(bal * bad),
+    }
+
+
+class VintageCurves:
+    """Running per-vintage, per-MOB accumulators for one model."""
+
+    _FIELDS = ("accounts", "bads", "balance", "bad_balance")
+
+    def __init__(self):
+        self.vintages: list[str] = []
+        self._index: dict[str, int] = {}
+        self._cells = {f: np.zeros((0, 1)) for f in self._FIELDS}
+        self.updated_cells = 0
+
+    def _ensure(self, vintages: list[str], max_mob: int) -> np.ndarray:
+        """Grow accumulators to cover vintages and MOBs; returns row index per vintage."""
+        for v in vintages:
+            if v not in self._index:
+                self._index[v] = len(self.vintages)
+                self.vintages.append(v)
+        rows, cols = len(self.vintages), max(max_mob + 1, self._cells["accounts"].shape[1])
+        for f, arr in self._cells.items():
+            if arr.shape != (rows, cols):
+                grown = np.zeros((rows, cols))
+                grown[:arr.shape[0], :arr.shape[1]] = arr
+                self._cells[f] = grown
+        return np.array([self._index[v] for v in vintages], dtype=np.int64)
+
+    def apply(self, increment: dict, replace: bool = False) -> int:
+        """
+        Add an aggregate_increment result. With replace=True, cells present in the increment
+        overwrite the stored ones (restated months). Returns the number of cells touched.
+        """
+        rows = self._ensure(increment["vintages"], increment["max_mob"])
+        touched = increment["accounts"] > 0
+        width = increment["accounts"].shape[1]
+        for f in self._FIELDS:
+            target = self._cells[f][rows, :width]
+            delta = np.asarray(increment[f], dtype=float)
+            self._cells[f][rows, :width] = np.where(touched, delta, target + delta) if replace else target + delta
+        n = int(touched.sum())
+        self.updated_cells += n
+        return n
+
+    def bad_rates(self, balance_weighted: bool = False) -> np.ndarray:
+        """(n_vintages, n_mob) bad rate; NaN where a vintage has not reached that MOB."""
+        num = self._cells["bad_balance" if balance_weighted else "bads"]
+        den = self._cells["balance" if balance_weighted else "accounts"]
+        return np.divide(num, den, out=np.full(num.shape, np.nan), where=den > 0)
+
+    def development_factors(self, balance_weighted: bool = False) -> np.ndarray:
+        """
+        Chain-ladder factors f[m] = sum bad_rate(m+1) / sum bad_rate(m) over vintages observed at
+        both m and m+1 (1.0 where there is no evidence).
+        """
+        rates = self.bad_rates(balance_weighted)
+        if rates.shape[1] < 2:
+            return np.ones(0)
+        both = ~np.isnan(rates[:, :-1]) & ~np.isnan(rates[:, 1:])
+        num = np.where(both, rates[:, 1:], 0).sum(axis=0)
+        den = np.where(both, rates[:, :-1], 0).sum(axis=0)
+        return np.divide(num, den, out=np.ones(len(num)), where=den > 0)
+
+    def curves(self, vintages: list[str] | None = None, balance_weighted: bool = False) -> dict:
+        """Bad-rate-by-MOB curves: { mob, vintages: [ { vintage, bad_rate, accounts } ] } (None past observed MOB)."""
+        rates = self.bad_rates(balance_weighted)
+        accounts = self._cells["accounts"]
+        out = []
+        for v in vintages or self.vintages:
+            i = self._index.get(v)
+            if i is None:
+                continue
+            observed = accounts[i] > 0
+            last = int(np.flatnonzero(observed)[-1]) + 1 if observed.any() else 0
+            out.append({
+                "vintage": v,
+                "bad_rate": [None if np.isnan(r) else round(float(r), 4) for r in rates[i, :last]],
+                "accounts": [int(a) for a in accounts[i, :last]],
+            })
+        return {"mob": list(range(rates.shape[1])), "vintages": out}
+
+    def maturity_adjusted(self, target_mob: int = DEFAULT_TARGET_MOB, balance_weighted: bool = False) -> list[dict]:
+        """
+        Per vintage: latest observed MOB and bad rate, and the bad rate projected to target_mob
+        by multiplying the development factors between the two.
+        """
+        rates = self.bad_rates(balance_weighted)
+        factors = self.development_factors(balance_weighted)
+        out = []
+        for v in self.vintages:
+            row = rates[self._index[v]]
+            seen = np.flatnonzero(~np.isnan(row))
+            if not len(seen):
+                continue
+            mob = int(seen[-1])
+            observed = float(row[mob])
+            if mob >= target_mob:
+                adjusted = float(row[target_mob]) if not np.isnan(row[target_mob]) else observed
+            else:
+                steps = factors[mob:target_mob]
+                adjusted = observed * float(np.prod(steps)) if len(steps) == target_mob - mob else None
+            out.append({
+                "vintage": v,
+                "observed_mob": mob,
+                "observed_bad_rate": round(observed, 4),
+                "target_mob": target_mob,
+                "maturity_adjusted_bad_rate": None if adjusted is None else round(min(adjusted, 1.0), 4),
+            })
+        return out
@@ -0,0 +1,231 @@
+"""
+Versioned metrics history: every compute-metrics run is kept per (model_id, vintage, segment) key.
+
+Dashboard reads go through a latest pointer per key (O(1) per key, O(keys) for a filtered list);
+audit reads use per-key run lists kept in computed_at order, so a range query is a bisect per
+key plus a k-way merge of the matching slices. Superseded runs are compacted into one summary per
+key and calendar month of computed_at ({ runs, first / last computed_at, min / max / mean / last of
+each metric }): automatically beyond MM_METRICS_MAX_RUNS full runs per key, and for runs older than
+MM_METRICS_RETENTION_DAYS via compact() (daily from the scheduler). The latest run of a key is
+never compacted.
+
+Writers of one key must not run concurrently (the store serializes them per model_id); writers of
+different keys may. A key's run list is only appended to or replaced, its summaries are replaced,
+and readers copy the indexes before iterating them, so reads need no lock.
+"""
+
+import copy
+import heapq
+import itertools
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+# Full (uncompacted) runs kept per key before the oldest superseded ones are summarized
+MAX_RUNS_PER_KEY = int(os.environ.get("MM_METRICS_MAX_RUNS", "100"))
+# Superseded runs older than this are compacted by the scheduler once a day (0: never)
+RETENTION_DAYS = float(os.environ.get("MM_METRICS_RETENTION_DAYS", "90"))
+
+
+def retention_cutoff(days: float = RETENTION_DAYS) -> str:
+    """computed_at timestamp (same ISO format as records) `days` ago."""
+    return (datetime.utcnow() - timedelta(days=days)).isoformat() + "Z"
+
+
+def record_key(record: dict) -> tuple[str, str, str]:
+    return (record["model_id"], record["vintage"], record.get("segment") or "")
+
+
+class MetricsHistory:
+    """Metrics records by key: latest pointers, full runs in computed_at order and compacted summaries."""
+
+    def __init__(self, max_runs: int = MAX_RUNS_PER_KEY):
+        self.max_runs = max(int(max_runs), 1)
+        self.latest: dict[tuple, dict] = {}  # key -> latest record, keys in first-computed order
+        self.runs: dict[tuple, list[dict]] = {}  # key -> full records, ascending computed_at (append-only or replaced)
+        self.compacted: dict[tuple, list[dict]] = {}  # key -> monthly summaries, ascending period
+        self.by_id: dict[str, dict] = {}  # record_id -> full record
+        self._by_vintage: dict[tuple[str, str], dict[tuple, None]] = {}  # (model_id, vintage) -> keys
+        self._vintages: dict[str, dict[tuple, None]] = {}  # vintage -> keys
+        self._models: dict[str, dict[tuple, None]] = {}  # model_id -> keys
+        self._run_counts: dict[tuple, int] = {}  # key -> runs ever added (numbering survives compaction)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def add(self, record: dict) -> tuple[dict, list[str]]:
+        """
+        Store a run; it becomes the key's latest unless an already stored run is newer.
+        Returns ({ run, supersedes }, record_ids compacted to stay within max_runs).
+        """
+        key = record_key(record)
+        previous = self.latest.get(key)
+        self._run_counts[key] = self._run_counts.get(key, 0) + 1
+        info = {"run": self._run_counts[key], "supersedes": previous["record_id"] if previous else None}
+        record.update(info)
+        self.by_id[record["record_id"]] = record
+        runs, at = self.runs.get(key, []), _computed_at(record)
+        newest = not runs or _computed_at(runs[-1]) <= at
+        if newest:
+            # Appending in place only extends what readers see
+            runs.append(record)
+        else:
+            # Out-of-order run: insert into a copy (readers keep bisecting the list they hold)
+            runs = list(runs)
+            runs.insert(bisect_right(runs, at, key=_computed_at), record)
+        self.runs[key] = runs
+        if newest:
+            self.latest[key] = record
+        self._by_vintage.setdefault(key[:2], {})[key] = None
+        self._vintages.setdefault(key[1], {})[key] = None
+        self._models.setdefault(key[0], {})[key] = None
+        removed = self._compact_key(key, len(runs) - self.max_runs) if len(runs) > self.max_runs else []
+        return info, removed
+
+    def load(self, records: list[dict]) -> None:
+        """
+        Bulk add() (e.g. seeding): when every record is the first run of a key not stored yet, the
+        indexes are filled in one pass per index; otherwise the records are added one by one.
+        """
+        keys = [record_key(r) for r in records]
+        if len(set(keys)) < len(keys) or not self._run_counts.keys().isdisjoint(keys):
+            for record in records:
+                self.add(record)
+            return
+        for record in records:
+            record.update(run=1, supersedes=None)
+        self._run_counts.update(dict.fromkeys(keys, 1))
+        self.by_id.update((r["record_id"], r) for r in records)
+        self.runs.update((k, [r]) for k, r in zip(keys, records))
+        self.latest.update(zip(keys, records))
+        for key in keys:
+            self._by_vintage.setdefault(key[:2], {})[key] = None
+            self._vintages.setdefault(key[1], {})[key] = None
+            self._models.setdefault(key[0], {})[key] = None
+
+    def latest_records(self, vintage: Optional[str] = None) -> Iterator[dict]:
+        """Latest record per key (one vintage: only that vintage's keys)."""
+        keys = list(self._vintages.get(vintage, ()) if vintage else self.latest)
+        return (self.latest[k] for k in keys)
+
+    def get(self, model_id: str, vintage: str, segment: Optional[str] = None) -> Optional[dict]:
+        """
+        Latest record for a model and vintage. segment=None prefers the unsegmented key (the
+        compute-metrics record) and otherwise takes the most recently computed segment.
+        """
+        if segment is not None:
+            return self.latest.get((model_id, vintage, segment))
+        keys = list(self._by_vintage.get((model_id, vintage), ()))
+        if not keys:
+            return None
+        if (model_id, vintage, "") in keys:
+            return self.latest[(model_id, vintage, "")]
+        return max((self.latest[k] for k in keys), key=_computed_at)
+
+    def keys(self, model_id: Optional[str] = None, vintage: Optional[str] = None) -> list[tuple]:
+        """Keys of a model and / or vintage (all keys without either), in first-computed order."""
+        if model_id and vintage:
+            return list(self._by_vintage.get((model_id, vintage), {}))
+        if model_id:
+            return list(self._models.get(model_id, {}))
+        return list(self._vintages.get(vintage, {}) if vintage else self.latest)
+
+    def query(
+        self,
+        keys: list[tuple],
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> tuple[list[dict], bool]:
+        """
+        Full runs of the given keys with since <= computed_at <= until (ISO strings), newest first.
+        Returns (runs[offset:offset + limit], more) without materializing the rest of the range.
+        """
+        slices = []
+        for key in keys:
+            runs = self.runs.get(key, [])
+            lo = bisect_left(runs, since, key=_computed_at) if since else 0
+            hi = bisect_right(runs, until, key=_computed_at) if until else len(runs)
+            if hi > lo:
+                slices.append(reversed(runs[lo:hi]))
+        merged = heapq.merge(*slices, key=_computed_at, reverse=True)
+        stop = None if limit is None else offset + limit + 1
+        page = list(itertools.islice(merged, offset, stop))
+        more = limit is not None and len(page) > limit
+        return (page[:limit] if more else page), more
+
+    def summaries(self, keys: list[tuple], since: Optional[str] = None, until: Optional[str] = None) -> list[dict]:
+        """Compacted monthly summaries of the given keys overlapping [since, until]."""
+        out = []
+        for key in keys:
+            for s in self.compacted.get(key, []):
+                if (since and s["last_computed_at"] < since) or (until and s["first_computed_at"] > until):
+                    continue
+                out.append(s)
+        return out
+
+    def compact(self, before: str, keep_runs: int = 1) -> list[str]:
+        """
+        Summarize superseded runs computed before `before` (ISO timestamp), keeping at least the
+        newest keep_runs full runs per key. Returns the record_ids removed from full history.
+        """
+        removed = []
+        for key, runs in list(self.runs.items()):
+            older = bisect_left(runs, before, key=_computed_at)
+            removed.extend(self._compact_key(key, min(older, len(runs) - max(int(keep_runs), 1))))
+        return removed
+
+    def _compact_key(self, key: tuple, count: int) -> list[str]:
+        """Fold the key's oldest `count` full runs (never the latest) into its monthly summaries."""
+        runs = self.runs[key]
+        count = min(count, len(runs) - 1)
+        if count <= 0:
+            return []
+        folded = runs[:count]
+        summaries = list(self.compacted.get(key, ()))
+        if summaries:
+            summaries[-1] = copy.deepcopy(summaries[-1])  # the open month is folded into, not shared
+        for record in folded:
+            _fold(summaries, key, record)
+        self.compacted[key] = summaries
+        self.runs[key] = runs[count:]
+        for record in folded:
+            self.by_id.pop(record["record_id"], None)
+        return [r["record_id"] for r in folded]
+
+
+def _computed_at(record: dict) -> str:
+    return record.get("computed_at") or ""
+
+
+def _fold(summaries: list[dict], key: tuple, record: dict) -> None:
+    """Add a run to its month's summary (runs are folded oldest first, so months arrive in order)."""
+    at = record.get("computed_at") or ""
+    period = at[:7]
+    if not summaries or summaries[-1]["period"] != period:
+        summaries.append({
+            "model_id": key[0],
+            "vintage": key[1],
+            "segment": key[2] or None,
+            "period": period,
+            "runs": 0,
+            "first_computed_at": at,
+            "last_computed_at": at,
+            "metrics": {},
+        })
+    summary = summaries[-1]
+    summary["runs"] += 1
+    summary["last_computed_at"] = max(summary["last_computed_at"], at)
+    summary["volume"] = record.get("volume")
+    for name, value in (record.get("metrics") or {}).items():
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            continue
+        stats = summary["metrics"].get(name)
+        if stats is None:
+            summary["metrics"][name] = {"min": value, "max": value, "mean": value, "last": value, "n": 1}
+            continue
+        stats["n"] += 1
+        stats["min"], stats["max"], stats["last"] = min(stats["min"], value), max(stats["max"], value), value
+        stats["mean"] = round(stats["mean"] + (value - stats["mean"]) / stats["n"], 6)
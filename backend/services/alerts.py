@@ -0,0 +1,335 @@
+"""
+Alerting: RAG threshold rules per model type, evaluated incrementally on every saved metrics record.
+
+The store calls AlertEngine.observe for each record it appends (in the store-owning process),
+which is a constant-time rule check plus a lookup of the model's last status: an alert is
+raised only when a model/segment changes status. Alerts are handed to a background dispatcher
+thread, so slow sinks (webhook, file, email via a local SMTP server) never delay writes.
+
+Rules: { model_type: [ { metric, direction, amber, red } ] }. `metric` names a key of the
+record's metrics, or a dotted path into the record (e.g. explainability.importance_drift).
+direction "min": amber below `amber`, red below `red`; "max": amber at or above `amber`,
+red at or above `red`. The worst rule decides the status. Override defaults with a JSON file
+named by MM_ALERT_RULES or via PUT /api/alerts/rules.
+"""
+
+import json
+import os
+import queue
+import smtplib
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+STATUSES = ("green", "amber", "red")
+MAX_ALERT_HISTORY = 10000
+
+_SCORECARD_RULES = [
+    {"metric": "KS", "direction": "min", "amber": 0.3, "red": 0.2},
+    {"metric": "PSI", "direction": "max", "amber": 0.2, "red": 0.25},
+    # Score drift against the baseline (records computed with baseline scores); Wasserstein is in
+    # score units, so it has no default and is left to per-model-type overrides
+    {"metric": "drift.ks_statistic", "direction": "max", "amber": 0.1, "red": 0.2},
+    {"metric": "drift.js_divergence", "direction": "max", "amber": 0.05, "red": 0.1},
+]
+DEFAULT_RULES: dict[str, list[dict]] = {
+    "Acquisition Scorecard": _SCORECARD_RULES,
+    "ECM Scorecard": _SCORECARD_RULES,
+    "Bureau": _SCORECARD_RULES,
+    "ML": _SCORECARD_RULES + [
+        {"metric": "explainability.importance_drift", "direction": "max", "amber": 0.2, "red": 0.35},
+    ],
+    "Fraud": _SCORECARD_RULES + [
+        {"metric": "AUC", "direction": "min", "amber": 0.75, "red": 0.7},
+        {"metric": "fpr_at_threshold", "direction": "max", "amber": 0.05, "red": 0.1},
+    ],
+    "Collections": [
+        {"metric": "roll_rate_30", "direction": "max", "amber": 0.1, "red": 0.15},
+        {"metric": "flow_rate", "direction": "max", "amber": 0.3, "red": 0.4},
+        {"metric": "cure_rate", "direction": "min", "amber": 0.2, "red": 0.1},
+        {"metric": "recovery_rate", "direction": "min", "amber": 0.15, "red": 0.1},
+    ],
+}
+
+
+def load_rules() -> dict[str, list[dict]]:
+    """Default rules, with model types overridden from the MM_ALERT_RULES JSON file if set."""
+    rules = {k: list(v) for k, v in DEFAULT_RULES.items()}
+    path = os.environ.get("MM_ALERT_RULES")
+    if path:
+        rules.update(validate_rules(json.loads(Path(path).read_text())))
+    return rules
+
+
+def validate_rules(rules: dict) -> dict[str, list[dict]]:
+    """Check a { model_type: [rule] } mapping; raises ValueError on a malformed rule."""
+    if not isinstance(rules, dict):
+        raise ValueError("rules must map model_type to a list of rules")
+    out = {}
+    for model_type, items in rules.items():
+        checked = []
+        for r in items:
+            if not r.get("metric") or r.get("direction") not in ("min", "max"):
+                raise ValueError(f"{model_type}: each rule needs metric and direction min|max")
+            amber, red = float(r["amber"]), float(r["red"])
+            if (r["direction"] == "min" and red > amber) or (r["direction"] == "max" and red < amber):
+                raise ValueError(f"{model_type}/{r['metric']}: red threshold must be beyond amber")
+            checked.append({"metric": r["metric"], "direction": r["direction"], "amber": amber, "red": red})
+        out[model_type] = checked
+    return out
+
+
+def _metric_value(record: dict, metric: str) -> Optional[float]:
+    if "." in metric:
+        value = record
+        for part in metric.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+    else:
+        value = record.get("metrics", {}).get(metric)
+    return float(value) if isinstance(value, (int, float)) and value == value else None
+
+
+def evaluate_status(record: dict, rules: dict[str, list[dict]]) -> dict:
+    """{ status, breaches: [ { metric, value, status, threshold } ] } for one metrics record."""
+    worst, breaches = 0, []
+    for rule in rules.get(record.get("model_type"), []):
+        value = _metric_value(record, rule["metric"])
+        if value is None:
+            continue
+        if rule["direction"] == "min":
+            level = 2 if value < rule["red"] else 1 if value < rule["amber"] else 0
+        else:
+            level = 2 if value >= rule["red"] else 1 if value >= rule["amber"] else 0
+        if level:
+            breaches.append({
+                "metric": rule["metric"],
+                "value": round(value, 4),
+                "status": STATUSES[level],
+                "threshold": rule["red" if level == 2 else "amber"],
+                "direction": rule["direction"],
+            })
+        worst = max(worst, level)
+    return {"status": STATUSES[worst], "breaches": breaches}
+
+
+def _metric_values(records: list[dict], metric: str) -> np.ndarray:
+    """_metric_value of each record as one float array, NaN where it is None."""
+    if "." in metric:
+        first, *path = metric.split(".")
+        raw = [r.get(first) for r in records]
+        for part in path:
+            raw = [v.get(part) if isinstance(v, dict) else None for v in raw]
+    else:
+        raw = [r.get("metrics", {}).get(metric) for r in records]
+    return np.array([v if isinstance(v, (int, float)) else np.nan for v in raw], dtype=float)
+
+
+def evaluate_statuses(records: list[dict], rules: dict[str, list[dict]]) -> list[str]:
+    """
+    evaluate_status(record, rules)["status"] for many records at once: each rule compares one
+    array of its metric's values (NaN where missing), so bulk loads avoid a rule loop per record.
+    """
+    by_type: dict[Optional[str], list[int]] = {}
+    for i, record in enumerate(records):
+        by_type.setdefault(record.get("model_type"), []).append(i)
+    levels = np.zeros(len(records), dtype=np.int64)
+    for model_type, index in by_type.items():
+        group = [records[i] for i in index]
+        worst = np.zeros(len(group), dtype=np.int64)
+        for rule in rules.get(model_type, []):
+            value = _metric_values(group, rule["metric"])
+            if rule["direction"] == "min":
+                level = np.where(value < rule["red"], 2, np.where(value < rule["amber"], 1, 0))
+            else:
+                level = np.where(value >= rule["red"], 2, np.where(value >= rule["amber"], 1, 0))
+            np.maximum(worst, level, out=worst)
+        levels[index] = worst
+    return [STATUSES[level] for level in levels.tolist()]
+
+
+class AlertSink:
+    """Delivery channel for alerts; send raises on failure."""
+
+    name = "sink"
+
+    def send(self, alert: dict) -> None:
+        raise NotImplementedError
+
+
+class WebhookSink(AlertSink):
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url, self.timeout = url, timeout
+
+    def send(self, alert: dict) -> None:
+        req = urllib.request.Request(
+            self.url, data=json.dumps(alert).encode(), headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(req, timeout=self.timeout):
+            pass
+
+
+class FileSink(AlertSink):
+    """Appends one JSON line per alert."""
+
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def send(self, alert: dict) -> None:
+        with self._lock, self.path.open("a") as f:
+            f.write(json.dumps(alert) + "\n")
+
+
+class EmailSink(AlertSink):
+    """Plain-text email through an SMTP server (e.g. a local stub: python -m aiosmtpd -n -l localhost:1025)."""
+
+    name = "email"
+
+    def __init__(self, host: str, port: int, recipients: list[str], sender: str = "model-monitoring@localhost"):
+        self.host, self.port, self.recipients, self.sender = host, port, recipients, sender
+
+    def send(self, alert: dict) -> None:
+        msg = EmailMessage()
+        msg["Subject"] = f"[{alert['status'].upper()}] {alert['model_id']} {alert.get('vintage', '')}".strip()
+        msg["From"], msg["To"] = self.sender, ", ".join(self.recipients)
+        lines = [f"{alert['model_id']} ({alert.get('model_type')}) went {alert['previous_status'] or 'new'} -> {alert['status']}."]
+        lines += [f"- {b['metric']} = {b['value']} ({b['status']}, threshold {b['threshold']})" for b in alert["breaches"]]
+        msg.set_content("\n".join(lines))
+        with smtplib.SMTP(self.host, self.port, timeout=5) as smtp:
+            smtp.send_message(msg)
+
+
+def sinks_from_env() -> list[AlertSink]:
+    """Sinks configured by MM_ALERT_WEBHOOK_URL, MM_ALERT_FILE and MM_ALERT_SMTP (host:port) + MM_ALERT_EMAIL_TO."""
+    sinks: list[AlertSink] = []
+    if os.environ.get("MM_ALERT_WEBHOOK_URL"):
+        sinks.append(WebhookSink(os.environ["MM_ALERT_WEBHOOK_URL"]))
+    if os.environ.get("MM_ALERT_FILE"):
+        sinks.append(FileSink(os.environ["MM_ALERT_FILE"]))
+    if os.environ.get("MM_ALERT_SMTP") and os.environ.get("MM_ALERT_EMAIL_TO"):
+        host, _, port = os.environ["MM_ALERT_SMTP"].rpartition(":")
+        sinks.append(EmailSink(
+            host or "localhost",
+            int(port or 25),
+            [a.strip() for a in os.environ["MM_ALERT_EMAIL_TO"].split(",") if a.strip()],
+            os.environ.get("MM_ALERT_EMAIL_FROM", "model-monitoring@localhost"),
+        ))
+    return sinks
+
+
+class AlertEngine:
+    """Per-model/segment RAG state, alert history and the background dispatcher."""
+
+    def __init__(self, rules: dict[str, list[dict]] | None = None, sinks: list[AlertSink] | None = None):
+        self.rules = rules if rules is not None else load_rules()
+        self.sinks = sinks if sinks is not None else sinks_from_env()
+        self.state: dict[tuple[str, str], dict] = {}  # (model_id, segment) -> { vintage, status, record_id }
+        self.history: list[dict] = []
+        self.stats = {"evaluated": 0, "raised": 0, "delivered": 0, "failed": 0}
+        self._queue: "queue.Queue[dict]" = queue.Queue()
+        self._dispatcher: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink: AlertSink) -> None:
+        self.sinks.append(sink)
+
+    def observe(self, record: dict, notify: bool = True) -> Optional[dict]:
+        """
+        Evaluate a newly saved record and update its model/segment state. Returns the alert when
+        the status changed (a first status only alerts if not green); records for a vintage older
+        than the latest seen are evaluated but do not change state.
+        """
+        result = evaluate_status(record, self.rules)
+        key = (record.get("model_id"), record.get("segment") or "")
+        vintage = record.get("vintage") or ""
+        with self._lock:
+            self.stats["evaluated"] += 1
+            prev = self.state.get(key)
+            if prev is not None and vintage < prev["vintage"]:
+                return None
+            self.state[key] = {"vintage": vintage, "status": result["status"], "record_id": record.get("record_id")}
+            previous_status = prev["status"] if prev else None
+            if result["status"] == (previous_status or "green") or not notify:
+                return None
+            alert = {
+                "alert_id": str(uuid.uuid4())[:8],
+                "model_id": record.get("model_id"),
+                "portfolio": record.get("portfolio"),
+                "model_type": record.get("model_type"),
+                "segment": record.get("segment"),
+                "vintage": vintage,
+                "record_id": record.get("record_id"),
+                "previous_status": previous_status,
+                "status": result["status"],
+                "breaches": result["breaches"],
+                "raised_at": datetime.utcnow().isoformat() + "Z",
+                "deliveries": [],
+            }
+            # Copy-on-write: lock-free readers (get_alerts) keep a consistent list
+            self.history = (self.history + [alert])[-MAX_ALERT_HISTORY:]
+            self.stats["raised"] += 1
+        if self.sinks:
+            self._queue.put(alert)
+            self._ensure_dispatcher()
+        return alert
+
+    def prime(self, records: list[dict]) -> None:
+        """Set initial state from already-stored records without raising alerts."""
+        # Only each model / segment's latest vintage can end up in the state: evaluate just those
+        latest: dict[tuple, dict] = {}
+        for record in records:
+            key = (record.get("model_id"), record.get("segment") or "")
+            if key not in latest or (record.get("vintage") or "") >= (latest[key].get("vintage") or ""):
+                latest[key] = record
+        # As observe(record, notify=False) for each, with the rules checked in one bulk pass
+        statuses = evaluate_statuses(list(latest.values()), self.rules)
+        with self._lock:
+            self.stats["evaluated"] += len(latest)
+            for (key, record), status in zip(latest.items(), statuses):
+                vintage = record.get("vintage") or ""
+                prev = self.state.get(key)
+                if prev is None or vintage >= prev["vintage"]:
+                    self.state[key] = {"vintage": vintage, "status": status, "record_id": record.get("record_id")}
+
+    def _ensure_dispatcher(self) -> None:
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name="mm-alerts", daemon=True)
+                self._dispatcher.start()
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            alert = self._queue.get()
+            for sink in list(self.sinks):
+                try:
+                    sink.send(alert)
+                    outcome = {"sink": sink.name, "ok": True}
+                except Exception as e:  # noqa: BLE001 - delivery failures are recorded on the alert
+                    outcome = {"sink": sink.name, "ok": False, "error": str(e)}
+                with self._lock:
+                    # Published alerts are never mutated: swap in a copy with the new delivery
+                    updated = {**alert, "deliveries": [*alert["deliveries"], outcome]}
+                    self.history = [updated if a is alert else a for a in self.history]
+                    alert = updated
+                    self.stats["delivered" if outcome["ok"] else "failed"] += 1
+            self._queue.task_done()
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Wait (up to timeout seconds) until queued alerts have been handed to every sink."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+engine = AlertEngine()
@@ -0,0 +1,176 @@
+"""
+Dashboard chat assistant: answers questions about model performance from the portfolio overview
+(services.overview), through OpenAI when OPENAI_API_KEY is set and the openai package is
+installed, else with rules over the same context. reply() serves the Flask route; areply()
+serves the ASGI one (asgi.py) and awaits the LLM without holding a thread.
+"""
+
+import os
+
+SYSTEM_PROMPT = (
+    "You are an expert Model Performance assistant for a banking model monitoring dashboard. "
+    "Answer clearly and concisely using the context below. Be specific with numbers when available.\n\n"
+    "Metrics: KS = Kolmogorov-Smirnov (discrimination, higher better). "
+    "PSI = Population Stability Index (score stability, lower better). "
+    "RAG: Green = KS >= 0.3 and PSI < 0.2; Amber = KS 0.2-0.3 or PSI 0.2-0.25; Red = needs attention.\n\n"
+    "Context:\n"
+)
+
+
+def build_context() -> dict:
+    """Context for the bot from the store (the same counters as /api/metrics/overview)."""
+    from services.alerts import STATUSES
+    from store import get_models, get_filter_options, get_overview_models, get_portfolio_overview
+    overview = get_portfolio_overview(worst_n=20)
+    models = get_models()
+    options = get_filter_options()
+    return {
+        "total_metrics_rows": overview["rows"],
+        "total_models": len(models),
+        "portfolios": list(options.get("portfolios", [])),
+        "model_types": list(options.get("model_types", [])),
+        "by_portfolio_count": {p["portfolio"]: p["rows"] for p in overview["by_portfolio"]},
+        "status_counts": overview["status_counts"],
+        "by_status_models": {s: [m["model_id"] for m in get_overview_models(status=s, limit=20)["models"]] for s in STATUSES},
+        "by_portfolio_status": {p["portfolio"]: p["status_counts"] for p in overview["by_portfolio"]},
+        "models_with_metrics": overview["worst_ks"],
+    }
+
+
+def _completion_args(message: str, context: dict) -> dict:
+    return {
+        "model": os.environ.get("OPENAI_CHAT_MODEL", "gpt-4o-mini"),
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT + str(context)},
+            {"role": "user", "content": message},
+        ],
+        "max_tokens": 500,
+    }
+
+
+def _fallback(error: Exception, message: str, context: dict) -> str:
+    return f"I couldn't use the AI service: {error}. Here's a quick answer from the data: " + rule_based_reply(message, context)
+
+
+def reply(message: str, context: dict) -> str:
+    """Answer a question (blocking while the LLM responds)."""
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return rule_based_reply(message, context)
+    try:
+        from openai import OpenAI
+    except ImportError:
+        return rule_based_reply(message, context)
+    try:
+        resp = OpenAI(api_key=api_key).chat.completions.create(**_completion_args(message, context))
+        return (resp.choices[0].message.content or "").strip()
+    except Exception as e:
+        return _fallback(e, message, context)
+
+
+async def areply(message: str, context: dict) -> str:
+    """Answer a question on the event loop (the LLM call is awaited, not blocking)."""
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return rule_based_reply(message, context)
+    try:
+        from openai import AsyncOpenAI
+    except ImportError:
+        return rule_based_reply(message, context)
+    try:
+        resp = await AsyncOpenAI(api_key=api_key).chat.completions.create(**_completion_args(message, context))
+        return (resp.choices[0].message.content or "").strip()
+    except Exception as e:
+        return _fallback(e, message, context)
+
+
+def rule_based_reply(message: str, context: dict) -> str:
+    """Generate an intuitive reply from context without an LLM."""
+    q = message.lower().strip()
+    total = context.get("total_metrics_rows", 0)
+    models_count = context.get("total_models", 0)
+    status = context.get("status_counts", {})
+    by_port = context.get("by_portfolio_count", {})
+    by_status_models = context.get("by_status_models", {})
+    by_port_status = context.get("by_portfolio_status", {})
+    models_list = context.get("models_with_metrics", [])
+
+    g, a, r = status.get("green", 0), status.get("amber", 0), status.get("red", 0)
+    total_status = g + a + r
+
+    if not q or q in ("hi", "hello", "hey"):
+        return (
+            f"Hi! I'm your model performance assistant. There are {models_count} models in the current view. "
+            f"Status: {g} Green, {a} Amber, {r} Red. "
+            "Ask me: 'Which models need attention?', 'What is KS?', 'Compare portfolio performance', or 'How does RAG work?'"
+        )
+    if "help" in q or "what can" in q or "suggest" in q:
+        return (
+            "I can help with:\n"
+            "• **Status** – Which models are Green/Amber/Red, or need attention\n"
+            "• **Metrics** – What KS, PSI, and RAG thresholds mean\n"
+            "• **Portfolios** – Compare performance across Retail, Corporate, SME\n"
+            "• **Trends** – Use the Analysis tab for Volume, KS, and PSI deep dives\n"
+            "Try: 'Which models are red?', 'Explain RAG status', or 'Retail portfolio health'"
+        )
+    if ("how many" in q or "count" in q) and ("model" in q or "metric" in q):
+        return f"There are **{models_count} models** and {total} metric records. Status: {g} Green, {a} Amber, {r} Red. Use Filters to narrow by portfolio or vintage."
+    if "which" in q and ("red" in q or "attention" in q or "need" in q or "problem" in q):
+        red_list = by_status_models.get("red", [])
+        if red_list:
+            return f"Models needing attention (Red): {', '.join(red_list[:10])}{'...' if len(red_list) > 10 else ''}. These have KS < 0.2 or PSI > 0.25. Use the Analysis tab for decile and variable-level deep dives."
+        return "No Red models in the current view. All models are Green or Amber."
+    if "which" in q and ("amber" in q or "review" in q):
+        amber_list = by_status_models.get("amber", [])
+        if amber_list:
+            return f"Models under review (Amber): {', '.join(amber_list[:10])}. These have KS 0.2–0.3 or PSI 0.2–0.25. Check the Summary table and Analysis tab for details."
+        return "No Amber models. All are Green or Red."
+    if "portfolio" in q and ("list" in q or "which" in q or "what" in q or "all" in q):
+        ports = context.get("portfolios", [])
+        return f"Portfolios: {', '.join(ports) if ports else 'None'}." + (
+            f"\n\nPer-portfolio status: " + ", ".join(
+                f"{p}: {s.get('green', 0)}G/{s.get('amber', 0)}A/{s.get('red', 0)}R"
+                for p, s in by_port_status.items()
+            ) if by_port_status else ""
+        )
+    if "compare" in q and "portfolio" in q:
+        if not by_port_status:
+            return "No portfolio-level data available. Apply Filters and try again."
+        lines = [f"**{port}**: Green {s.get('green', 0)}, Amber {s.get('amber', 0)}, Red {s.get('red', 0)}" for port, s in by_port_status.items()]
+        return "Portfolio RAG comparison:\n" + "\n".join(lines)
+    if "rag" in q or ("status" in q and ("meaning" in q or "mean" in q or "work" in q)):
+        return (
+            "**RAG status** (Red–Amber–Green):\n"
+            "• **Green**: KS ≥ 0.3 and PSI < 0.2 — healthy discrimination and stable scores\n"
+            "• **Amber**: KS 0.2–0.3 or PSI 0.2–0.25 — review recommended\n"
+            "• **Red**: KS < 0.2 or PSI > 0.25 — needs attention\n"
+            f"Current view: {g} Green, {a} Amber, {r} Red."
+        )
+    if "green" in q or "amber" in q or "red" in q:
+        return f"RAG breakdown: **Green {g}**, **Amber {a}**, **Red {r}**. Green = good; Amber = review; Red = attention needed. Use the Portfolio pie chart and Summary for details."
+    if "ks" in q or "kolmogorov" in q:
+        return "**KS (Kolmogorov-Smirnov)** measures how well the model separates good vs bad. Higher is better (≥ 0.3 = Green). See the Summary table and Analysis tab for trend charts."
+    if "psi" in q or "stability" in q or "population stability" in q:
+        return "**PSI (Population Stability Index)** measures score drift vs baseline. Lower is better (< 0.2 = Green; > 0.25 = Red). Use Variable-level stability for per-variable PSI."
+    if "retail" in q or "corporate" in q or "sme" in q:
+        for port, count in by_port.items():
+            if port.lower() in q[:6]:
+                s = by_port_status.get(port, {})
+                return f"**{port}** has {count} metric records. Status: {s.get('green', 0)} Green, {s.get('amber', 0)} Amber, {s.get('red', 0)} Red."
+        return f"Portfolios: {dict(by_port)}. Select one in Filters to see its status."
+    if "status" in q or "health" in q:
+        return f"Overall model health: **Green {g}**, **Amber {a}**, **Red {r}**. Green = healthy; Red = needs action. Check the Portfolio summary pie chart for the distribution."
+    if "trend" in q or "volume" in q or "decile" in q:
+        return "For Volume, KS, and PSI trends, open the **Analysis** tab. Select a model and click Load analysis to see charts, decile-level KS reasons, and variable-level PSI."
+    if "best" in q or "worst" in q:
+        if models_list:
+            by_ks = sorted(models_list, key=lambda x: (x.get("KS") or 0), reverse=True)
+            best = by_ks[0] if by_ks else {}
+            worst = by_ks[-1] if by_ks else {}
+            return f"By KS: Best = {best.get('model_id', '?')} (KS {best.get('KS', '–')}); Worst = {worst.get('model_id', '?')} (KS {worst.get('KS', '–')}). Use Summary or Analysis for full details."
+        return "Insufficient data to rank. Apply Filters and ensure metrics are loaded."
+    return (
+        f"I have data for {models_count} models ({g} Green, {a} Amber, {r} Red). "
+        "Try: 'Which models need attention?', 'What is RAG?', 'Compare portfolios', or 'Explain KS and PSI'. "
+        "For trend and decile analysis, use the Analysis tab."
+    )
@@ -1,15 +1,19 @@
 """
 Data ingestion: accept payload and store with metadata (portfolio, model_type, vintage).
+Storage is content-addressed, so a re-uploaded file does not create a second copy.
 """
 
 import uuid
 from datetime import datetime
 
 
-def ingest(payload: dict, portfolio: str, model_type: str, model_id: str, vintage: str) -> dict:
+def ingest(payload: dict, portfolio: str, model_type: str, model_id: str, vintage: str, notify: bool = True) -> dict:
     """
     Ingest a dataset. Payload can be list of records or base64 file content in production.
-    Returns dataset_id and status.
+    Returns dataset_id and status; with notify, queues the model's dataset-triggered pipelines.
+    Identical content already ingested for the same portfolio, model type, model and vintage returns
+    the existing dataset (status "duplicate", nothing queued). Content ingested under other metadata
+    is shared: the new dataset starts from that dataset's QC status and scored version (shared_with).
     """
     dataset_id = str(uuid.uuid4())[:8]
     metadata = {
@@ -20,6 +24,22 @@ def ingest(payload: dict, portfolio: str, model_type: str, model_id: str, vintag
         "ingestion_time": datetime.utcnow().isoformat() + "Z",
         "row_count": len(payload) if isinstance(payload, list) else 0,
     }
-    from store import add_dataset
-    add_dataset(dataset_id, metadata, qc_status="pending", scored_data=payload)
-    return {"dataset_id": dataset_id, "status": "ingested", "metadata": metadata}
+    from store import add_dataset, get_dataset
+    stored = add_dataset(dataset_id, metadata, qc_status="pending", scored_data=payload if isinstance(payload, list) else [])
+    if stored["deduplicated"]:
+        existing = get_dataset(stored["dataset_id"]) or {}
+        return {
+            "dataset_id": stored["dataset_id"],
+            "status": "duplicate",
+            "metadata": existing.get("metadata", metadata),
+            "content_hash": stored["content_hash"],
+        }
+    result = {"dataset_id": dataset_id, "status": "ingested", "metadata": metadata, "content_hash": stored["content_hash"]}
+    if stored["shared_with"]:
+        result["shared_with"] = stored["shared_with"]
+    if notify:
+        from services.scheduler import notify_dataset_landed
+        queued = notify_dataset_landed(dataset_id, metadata)
+        if queued:
+            result["pipeline_runs"] = [r["run_id"] for r in queued]
+    return result
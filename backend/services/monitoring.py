@@ -0,0 +1,637 @@
+"""
+Monitoring steps on a stored dataset: QC, (mock) scoring and metric computation, delta ingestion
+(appended rows, late labels) with incremental metric refresh, plus the cached operating curve
+behind the fraud threshold sweep.
+
+Shared by the API routes and the pipeline scheduler. Steps raise StepError with the HTTP
+status the API should return when their input is unusable.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable
+
+import numpy as np
+
+
+class StepError(Exception):
+    """A monitoring step could not run on its input."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+# Process-local LRUs per content version (shared by datasets with identical content): operating
+# curves, the score histograms that delta refreshes update, and key indexes for label updates
+MAX_CACHED_CURVES = 16
+MAX_CACHED_HISTOGRAMS = 64
+MAX_CACHED_KEY_INDEXES = 8
+_DATE_COLUMNS = ("date", "txn_date", "transaction_date")
+_operating_curves: "OrderedDict[str, dict]" = OrderedDict()
+_histograms: "OrderedDict[tuple[str, str | None], Any]" = OrderedDict()  # (version, weight column) -> ScoreHistogram
+_key_indexes: "OrderedDict[tuple[str, str], tuple[np.ndarray, np.ndarray]]" = OrderedDict()  # (version, key column) -> (order, sorted keys)
+_cache_lock = threading.Lock()
+
+# Datasets above this many rows are computed out of core: chunked over the memory-mapped columns
+OUT_OF_CORE_ROWS = int(os.environ.get("MM_OUT_OF_CORE_ROWS", str(10_000_000)))
+
+# Columns that are never model features for explainability
+_NON_FEATURE_COLUMNS = {"target", "y", "score", "probability", "id", "sample_weight", "weight"}
+# Row weight columns picked up automatically (e.g. 1 / sampling rate of downsampled goods)
+_WEIGHT_COLUMNS = ("sample_weight", "weight")
+
+
+# compute-metrics options that change the result (memo key together with the content and model type)
+_METRIC_OPTIONS = (
+    "baseline_scores", "baseline_weights", "weight_column", "feature_columns", "explain_sample_size",
+    "segment_columns", "out_of_core", "chunk_rows", "drift_exact",
+)
+
+
+def content_hash(*parts) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def _cached(cache: OrderedDict, key):
+    with _cache_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    return None
+
+
+def _remember(cache: OrderedDict, key, value, limit: int):
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+    return value
+
+
+def numeric_column(columns: dict, *names: str, default: float) -> np.ndarray:
+    """First present column among names as float; missing values fall back to default."""
+    n = len(next(iter(columns.values()))) if columns else 0
+    for name in names:
+        if name in columns and columns[name].dtype.kind in "biuf":
+            arr = np.asarray(columns[name], dtype=float)
+            return np.where(np.isnan(arr), default, arr)
+    return np.full(n, default, dtype=float)
+
+
+def weight_column(columns: dict, name: str | None = None) -> str | None:
+    """The named weight column, else a sample_weight / weight column if present (None: unweighted)."""
+    for col in (name,) if name else _WEIGHT_COLUMNS:
+        if col in columns and columns[col].dtype.kind in "biuf":
+            return col
+    if name:
+        raise StepError(f"unknown or non-numeric weight column: {name}")
+    return None
+
+
+def _weights(arr: np.ndarray, col: str) -> np.ndarray:
+    w = np.asarray(arr, dtype=float)
+    w = np.where(np.isnan(w), 0.0, w)
+    if (w < 0).any():
+        raise StepError(f"weight column {col} has negative values")
+    return w
+
+
+def sample_weights(columns: dict, name: str | None = None) -> np.ndarray | None:
+    """
+    Row weights from weight_column(columns, name); None when the dataset is unweighted.
+    Missing weights count as 0; negative weights are an error.
+    """
+    col = weight_column(columns, name)
+    if col is None:
+        return None
+    w = _weights(columns[col], col)
+    if not w.sum() > 0:
+        raise StepError(f"weight column {col} sums to zero")
+    return w
+
+
+def score_histogram(columns: dict, weight_col: str | None = None, chunk_rows: int | None = None):
+    """
+    metrics.streaming.ScoreHistogram of target vs score, reading the columns chunk by chunk so
+    memory-mapped datasets are never fully resident; each chunk is reduced on MM_METRIC_WORKERS threads.
+    """
+    from metrics.streaming import DEFAULT_CHUNK_ROWS, ScoreHistogram, iter_chunks, parallel_histogram
+    names = [c for c in ("target", "y", "score", "probability", weight_col) if c and c in columns]
+    hist = ScoreHistogram()
+    for chunk in iter_chunks({c: columns[c] for c in names}, chunk_rows or DEFAULT_CHUNK_ROWS):
+        hist.merge(parallel_histogram(
+            numeric_column(chunk, "target", "y", default=0),
+            numeric_column(chunk, "score", "probability", default=0.5),
+            _weights(chunk[weight_col], weight_col) if weight_col else None,
+        ))
+    if weight_col and not hist.total > 0:
+        raise StepError(f"weight column {weight_col} sums to zero")
+    return hist
+
+
+def feature_columns(columns: dict, requested: list[str] | None = None) -> list[str]:
+    """Requested feature columns, else every numeric non-constant column (with a finite value) that is not a target, score or id."""
+    if requested:
+        return [name for name in requested if name in columns and columns[name].dtype.kind in "biuf"]
+    return [
+        name for name, arr in columns.items()
+        if name.lower() not in _NON_FEATURE_COLUMNS and not name.lower().endswith("_id")
+        and arr.dtype.kind in "biuf" and np.isfinite(arr).any() and np.nanmin(arr) != np.nanmax(arr)
+    ]
+
+
+def run_dataset_qc(dataset_id: str, required_columns: list[str] | None = None) -> dict:
+    """
+    Run QC on a stored dataset and record its qc_status; returns the QC report. Reports are
+    memoized per content version, so re-submitted content is not checked again.
+    """
+    from store import get_dataset, get_dataset_columns, get_memo, set_memo, set_qc_status
+    from services.qc import run_qc
+    ds = get_dataset(dataset_id)
+    if ds is None:
+        raise StepError("dataset not found", 404)
+    key = content_hash("qc", ds["version"], sorted(required_columns or []))
+    result = get_memo(key)
+    if result is None:
+        columns = get_dataset_columns(dataset_id)
+        if columns is None:
+            raise StepError("dataset not found", 404)
+        result = run_qc(columns, required_columns=required_columns or [])
+        set_memo(key, result)
+    set_qc_status(dataset_id, "passed" if result["pass"] else "failed")
+    return result
+
+
+def score_dataset(dataset_id: str) -> dict:
+    """
+    Mock scoring: if records have target/y but no score/probability,
+    add a synthetic score so compute-metrics can run. (Prototype only.)
+    Scores are seeded by the content version, so identical content gets the identical (shared) scored blob.
+    """
+    from store import get_dataset, get_dataset_columns, get_memo, set_dataset_version, set_memo, update_dataset_columns
+    ds = get_dataset(dataset_id)
+    if ds is None:
+        raise StepError("dataset not found", 404)
+    if not ds.get("row_count"):
+        raise StepError("no data to score")
+    key = content_hash("score", ds["version"])
+    scored = get_memo(key)
+    if scored is not None and set_dataset_version(dataset_id, scored["version"], scored["columns"], scored["row_count"]):
+        return {"dataset_id": dataset_id, "status": "scored", "row_count": scored["row_count"], "reused": True}
+    columns = get_dataset_columns(dataset_id)
+    if columns is None:
+        raise StepError("dataset not found", 404)
+    n = len(next(iter(columns.values()))) if columns else 0
+    score = numeric_column(columns, "score", default=np.nan)
+    probability = numeric_column(columns, "probability", default=np.nan)
+    unscored = np.isnan(score) & np.isnan(probability)
+    rng = np.random.default_rng(zlib.crc32(ds["version"].encode()))
+    t = numeric_column(columns, "target", "y", default=0)
+    # Mock: score slightly higher for target=1
+    mock = np.round(0.3 + 0.4 * t + rng.random(n) * 0.3, 4)
+    updated = dict(columns)
+    updated["score"] = np.where(unscored, mock, score)
+    updated["probability"] = np.where(unscored, mock, probability)
+    version = update_dataset_columns(dataset_id, updated)
+    if version:
+        set_memo(key, {"version": version, "columns": list(updated), "row_count": n})
+    return {
+        "dataset_id": dataset_id,
+        "status": "scored",
+        "row_count": n,
+    }
+
+
+def _binary_metrics(model_type, y_true, y_score, y_baseline, weights, w_baseline) -> dict | None:
+    """Flat metrics for score-based model types (None for Collections, which has its own analysis)."""
+    if model_type == "Collections":
+        return None
+    if model_type == "Fraud":
+        from metrics.fraud_metrics import compute_fraud_metrics
+        return compute_fraud_metrics(
+            y_true, y_score, y_baseline_proba=y_baseline, sample_weight=weights, baseline_weight=w_baseline
+        )
+    from metrics.scorecard_metrics import compute_scorecard_metrics
+    return compute_scorecard_metrics(y_true, y_score, y_baseline, weights, w_baseline)
+
+
+def _baseline(options: dict) -> tuple[np.ndarray | None, np.ndarray | None]:
+    """(baseline scores, baseline weights) for PSI from compute-metrics options."""
+    baseline = options.get("baseline_scores")
+    y_baseline = np.array(baseline) if baseline else None
+    baseline_weights = options.get("baseline_weights")
+    w_baseline = np.asarray(baseline_weights, dtype=float) if baseline_weights and y_baseline is not None else None
+    if w_baseline is not None and len(w_baseline) != len(y_baseline):
+        raise StepError("baseline_weights must match baseline_scores in length")
+    return y_baseline, w_baseline
+
+
+def _out_of_core(ds: dict, model_type: str, options: dict) -> bool:
+    out_of_core = options.get("out_of_core")
+    return model_type != "Collections" and (
+        bool(out_of_core) if out_of_core is not None else ds["row_count"] > OUT_OF_CORE_ROWS
+    )
+
+
+def _histogram_metrics(hist, model_type: str, y_baseline: np.ndarray | None, w_baseline: np.ndarray | None) -> dict:
+    """Flat binary metrics from a metrics.streaming.ScoreHistogram (PSI against the baseline scores)."""
+    from metrics import streaming
+    baseline_hist = None
+    if y_baseline is not None:
+        baseline_hist = streaming.ScoreHistogram().add(np.zeros(len(y_baseline)), y_baseline, w_baseline)
+    if model_type == "Fraud":
+        return streaming.fraud_metrics(hist, baseline=baseline_hist)
+    return streaming.scorecard_metrics(hist, baseline_hist)
+
+
+def _score_drift(hist, y_baseline: np.ndarray, w_baseline: np.ndarray | None, options: dict) -> dict:
+    """
+    metrics.drift.score_drift of the current scores against the baseline, read off the score
+    histogram (distinct scores weighted by their counts) instead of the rows.
+    """
+    from metrics.drift import score_drift
+    drift = score_drift(
+        y_baseline, hist.values, baseline_weight=w_baseline, current_weight=hist.pos + hist.neg,
+        exact=bool(options.get("drift_exact")),
+    )
+    if not hist.exact:
+        drift.update(exact=False, resolution=float(hist.resolution))
+    return drift
+
+
+def _content_metrics(ds: dict, columns: dict, model_type: str, options: dict) -> tuple[dict, dict, dict | None]:
+    """(metrics, extra detail, curve basis) that depend only on the dataset content, model type and options."""
+    weight_col = weight_column(columns, options.get("weight_column"))
+    y_baseline, w_baseline = _baseline(options)
+    out_of_core = _out_of_core(ds, model_type, options)
+    if out_of_core and options.get("segment_columns"):
+        raise StepError("segment breakdowns are not computed out of core")
+    extra = {}  # model-type specific detail stored alongside the flat metrics
+    hist = None
+    if out_of_core:
+        hist = score_histogram(columns, weight_col, options.get("chunk_rows"))
+        extra["out_of_core"] = hist.describe()
+        y_true = y_score = weights = None
+    else:
+        # Expect columns 'target' (or 'y') and 'score' (or 'probability')
+        y_true = numeric_column(columns, "target", "y", default=0)
+        y_score = numeric_column(columns, "score", "probability", default=0.5)
+        weights = sample_weights(columns, weight_col)
+        from metrics.streaming import PARALLEL_MIN_ROWS, parallel_histogram
+        if model_type != "Collections" and len(y_true) >= PARALLEL_MIN_ROWS:
+            # Large in-memory dataset: one exact multi-threaded histogram replaces the per-metric sorts
+            hist = parallel_histogram(y_true, y_score, weights)
+    if hist is not None:
+        metrics = _histogram_metrics(hist, model_type, y_baseline, w_baseline)
+    else:
+        metrics = _binary_metrics(model_type, y_true, y_score, y_baseline, weights, w_baseline)
+    if model_type == "Collections":
+        # Account-month panel: prev_dpd + current_dpd (or dpd), optional balance, recovered,
+        # charged_off, cohort and period columns
+        from metrics.collections_metrics import collections_analysis
+        current_dpd = columns.get("current_dpd", columns.get("dpd"))
+        if current_dpd is None or "prev_dpd" not in columns:
+            raise StepError("Collections datasets need prev_dpd and current_dpd (or dpd) columns")
+        analysis = collections_analysis(
+            current_dpd,
+            columns["prev_dpd"],
+            balance=columns.get("balance"),
+            recovered=columns.get("recovered"),
+            charged_off=columns.get("charged_off"),
+            cohort=columns.get("cohort"),
+            period=columns.get("period"),
+        )
+        metrics = analysis.pop("metrics")
+        extra["collections"] = analysis
+    features = feature_columns(columns, options.get("feature_columns")) if model_type == "ML" and not out_of_core else []
+    if features:
+        from metrics.ml_explainability import DEFAULT_SAMPLE_SIZE, compute_feature_importance
+        extra["explainability"] = compute_feature_importance(
+            np.column_stack([np.asarray(columns[name], dtype=float) for name in features]),
+            y_true,
+            y_score,
+            features,
+            sample_size=int(options.get("explain_sample_size") or DEFAULT_SAMPLE_SIZE),
+        )
+    segment_columns = options.get("segment_columns") or (["segment"] if "segment" in columns else [])
+    if segment_columns and model_type != "Collections" and not out_of_core:
+        missing = [c for c in segment_columns if c not in columns]
+        if missing:
+            raise StepError(f"unknown segment columns: {', '.join(missing)}")
+        from metrics.segments import segment_metrics
+        extra["segment_columns"] = list(segment_columns)
+        extra["segments"] = segment_metrics(
+            y_true, y_score, {c: columns[c] for c in segment_columns}, sample_weight=weights
+        )
+    curve_basis = None
+    if hist is not None:
+        curve_basis = hist.curve_basis()
+    elif model_type != "Collections":
+        from metrics.curves import build_curve_basis
+        from metrics.streaming import ScoreHistogram
+        hist = ScoreHistogram().add(y_true, y_score, weights)
+        curve_basis = build_curve_basis(y_true, y_score, sample_weight=weights)
+    if hist is not None:
+        metrics["bad_rate"] = round(hist.n_pos / hist.total, 4) if hist.total else 0.0
+        extra["deciles"] = hist.deciles()
+        if y_baseline is not None and len(y_baseline):
+            extra["drift"] = _score_drift(hist, y_baseline, w_baseline, options)
+        # Kept for delta refreshes of this version (refresh_dataset_metrics)
+        _remember(_histograms, (ds["version"], weight_col), hist, MAX_CACHED_HISTOGRAMS)
+    if weight_col:
+        extra["weight_column"] = weight_col
+        extra["weighted_volume"] = round(hist.total if hist is not None else float(weights.sum()), 4)
+    return metrics, extra, curve_basis
+
+
+def _metrics_key(version: str, model_type: str, options: dict) -> str:
+    return content_hash("metrics", version, model_type, {k: options.get(k) for k in _METRIC_OPTIONS})
+
+
+def _save_record(dataset_id: str, ds: dict, model_type: str, metrics: dict, extra: dict, curve_basis: dict | None, **fields) -> dict:
+    """Build and save the metrics record; ML importance drift is taken against the model's own baseline."""
+    from store import explain_baseline, save_metrics
+    meta = ds["metadata"]
+    model_id = meta.get("model_id", "unknown")
+    extra = dict(extra)
+    if "explainability" in extra:
+        # Importance drift is relative to this model's own baseline, so it is never memoized
+        from metrics.ml_explainability import get_importance_drift
+        explain = dict(extra["explainability"])
+        baseline = explain_baseline(model_id, explain["feature_importance"])
+        explain.update(get_importance_drift(baseline, explain["feature_importance"]))
+        extra["explainability"] = explain
+    record = {
+        "model_id": model_id,
+        "dataset_id": dataset_id,
+        "portfolio": meta.get("portfolio", ""),
+        "model_type": model_type,
+        "vintage": meta.get("vintage", ""),
+        "computed_at": datetime.utcnow().isoformat() + "Z",
+        "metrics": metrics,
+        "volume": int(ds["row_count"]),
+        **extra,
+        **fields,
+    }
+    save_metrics(record, curve_basis=curve_basis)
+    return record
+
+
+def compute_dataset_metrics(dataset_id: str, options: dict | None = None) -> dict:
+    """
+    Compute and save the metrics record for a dataset. options: model_type, baseline_scores,
+    baseline_weights (with baseline scores, the record's drift holds PSI, KS statistic, Wasserstein
+    distance and JS divergence from metrics.drift; drift_exact for exact KS / Wasserstein); weight_column (default: a sample_weight / weight column if present);
+    ML: feature_columns, explain_sample_size; segment_columns (default: a `segment` column if present).
+    out_of_core (default: above MM_OUT_OF_CORE_ROWS rows) computes the binary metrics, deciles and
+    curves from a chunked score histogram (chunk_rows per chunk) instead of the full arrays; segment
+    breakdowns and explainability are skipped in that mode.
+    Results are memoized per content version, model type and options: re-submitted content is not
+    recomputed, and the record's reused_from names the record it was computed for. The model type
+    and options are kept with the dataset for delta refreshes.
+    """
+    from store import get_dataset, get_dataset_columns, get_memo, set_memo, set_metrics_options
+    options = options or {}
+    ds = get_dataset(dataset_id) if dataset_id else None
+    if ds is None:
+        raise StepError("dataset_id not found", 404)
+    if not ds.get("row_count"):
+        raise StepError("no scored data")
+    model_type = options.get("model_type") or ds["metadata"].get("model_type", "Acquisition Scorecard")
+    key = _metrics_key(ds["version"], model_type, options)
+    cached = get_memo(key)
+    if cached is None:
+        columns = get_dataset_columns(dataset_id)
+        if columns is None:
+            raise StepError("dataset_id not found", 404)
+        metrics, extra, curve_basis = _content_metrics(ds, columns, model_type, options)
+        record = _save_record(dataset_id, ds, model_type, metrics, extra, curve_basis)
+        set_memo(key, {"record_id": record["record_id"], "metrics": metrics, "extra": extra, "curve_basis": curve_basis})
+    else:
+        record = _save_record(
+            dataset_id, ds, model_type, dict(cached["metrics"]), cached["extra"], cached["curve_basis"],
+            reused_from=cached["record_id"],
+        )
+    set_metrics_options(dataset_id, model_type, {k: options[k] for k in _METRIC_OPTIONS if options.get(k) is not None})
+    return record
+
+
+def _commit_delta(dataset_id: str, change: Callable[[dict, dict], tuple[dict, dict]]) -> tuple[str, str, dict, dict]:
+    """
+    Apply change(dataset, columns) -> (columns, delta) to the dataset's current version and commit the
+    result as its new source content; retried when a concurrent update wins.
+    Returns (previous version, new version, new columns, delta).
+    """
+    from store import get_dataset, get_dataset_columns, update_dataset_columns
+    for _ in range(3):
+        ds = get_dataset(dataset_id)
+        columns = get_dataset_columns(dataset_id) if ds is not None else None
+        if columns is None:
+            raise StepError("dataset not found", 404)
+        updated, delta = change(ds, columns)
+        version = update_dataset_columns(dataset_id, updated, expected=ds["version"], source=True)
+        if version is not None:
+            return ds["version"], version, updated, delta
+    raise StepError("dataset was updated concurrently; retry", 409)
+
+
+def _key_index(version: str, key_column: str, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(row order, sorted keys) of a unique key column, cached per version."""
+    index = _cached(_key_indexes, (version, key_column))
+    if index is None:
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = np.asarray(keys)[order]
+        if (sorted_keys[1:] == sorted_keys[:-1]).any():
+            raise StepError(f"key column {key_column} has duplicate values")
+        index = _remember(_key_indexes, (version, key_column), (order, sorted_keys), MAX_CACHED_KEY_INDEXES)
+    return index
+
+
+def append_dataset_rows(dataset_id: str, records: list[dict], refresh: bool = True) -> dict:
+    """
+    Delta ingestion: append records to a stored dataset as a new content version. Appended rows
+    should carry their score / probability; the dataset's QC status goes back to pending. With
+    refresh, metrics are recomputed with the dataset's last compute-metrics options
+    (see refresh_dataset_metrics).
+    """
+    from dataset_cache import concat_columns, records_to_columns
+    from store import set_qc_status
+    if not records or not isinstance(records, list):
+        raise StepError("data must be a non-empty list of records")
+    more = records_to_columns(records)
+
+    def change(ds: dict, columns: dict) -> tuple[dict, dict]:
+        n = len(next(iter(columns.values()))) if columns else 0
+        return concat_columns(columns, more), {"rows": np.arange(n, n + len(records))}
+
+    previous, version, columns, delta = _commit_delta(dataset_id, change)
+    set_qc_status(dataset_id, "pending")
+    result = {
+        "dataset_id": dataset_id,
+        "status": "appended",
+        "rows_appended": len(records),
+        "row_count": len(next(iter(columns.values()))),
+        "version": version,
+    }
+    if refresh:
+        result.update(refresh_dataset_metrics(dataset_id, previous, version, columns, delta))
+    return result
+
+
+def update_dataset_target(dataset_id: str, updates: list[dict], key_column: str = "id", refresh: bool = True) -> dict:
+    """
+    Delta ingestion of late-maturing labels: set the target (`target` or `y` column) of existing rows
+    by key. updates: [ { <key_column>: key, target: label } ]; the last update of a key wins, unknown
+    keys are counted in not_found. Keys must be unique. Rows are located through a sorted key index
+    built once per version and carried to the patched version. With refresh, metrics are recomputed
+    as in append_dataset_rows.
+    """
+    if not updates or not isinstance(updates, list):
+        raise StepError("updates must be a non-empty list")
+
+    def change(ds: dict, columns: dict) -> tuple[dict, dict]:
+        if key_column not in columns:
+            raise StepError(f"unknown key column: {key_column}")
+        target_col = next((c for c in ("target", "y") if c in columns and columns[c].dtype.kind in "biuf"), None)
+        if target_col is None:
+            raise StepError("dataset has no numeric target or y column")
+        index = _key_index(ds["version"], key_column, columns[key_column])
+        order, sorted_keys = index
+        raw = [u.get(key_column) for u in updates]
+        labels = [u.get(target_col, u.get("target")) for u in updates]
+        if any(isinstance(v, (str, type(None))) for v in labels):
+            raise StepError(f"every update needs {key_column} and a numeric target")
+        try:
+            keys = np.asarray(raw, dtype=float) if sorted_keys.dtype.kind in "biuf" else np.asarray([str(k) for k in raw])
+        except (TypeError, ValueError):
+            raise StepError(f"keys do not match the type of {key_column}")
+        labels = np.asarray(labels, dtype=float)
+        pos = np.searchsorted(sorted_keys, keys)
+        found = pos < len(sorted_keys)
+        found[found] = sorted_keys[pos[found]] == keys[found]
+        # Last update per row wins
+        rows, last = np.unique(order[pos[found]][::-1], return_index=True)
+        labels = labels[found][::-1][last]
+        target = columns[target_col]
+        integral = target.dtype.kind in "biu" and np.array_equal(labels, np.round(labels))
+        patched = np.array(target, dtype=target.dtype if integral else np.result_type(target.dtype, np.float64))
+        y_old = numeric_column({target_col: target[rows]}, target_col, default=0)
+        patched[rows] = labels
+        delta = {"rows": rows, "y_old": y_old, "not_found": int((~found).sum()), "index": index, "key_column": key_column}
+        return {**columns, target_col: patched}, delta
+
+    previous, version, columns, delta = _commit_delta(dataset_id, change)
+    # The key column is unchanged, so its index carries over to the new version
+    _remember(_key_indexes, (version, key_column), delta["index"], MAX_CACHED_KEY_INDEXES)
+    result = {
+        "dataset_id": dataset_id,
+        "status": "updated",
+        "rows_updated": int(len(delta["rows"])),
+        "not_found": delta["not_found"],
+        "row_count": len(next(iter(columns.values()))),
+        "version": version,
+    }
+    if refresh and len(delta["rows"]):
+        result.update(refresh_dataset_metrics(dataset_id, previous, version, columns, delta))
+    return result
+
+
+def refresh_dataset_metrics(dataset_id: str, previous: str, version: str, columns: dict, delta: dict) -> dict:
+    """
+    Recompute a dataset's metrics after a delta (previous -> version) with the model type and options
+    of its last compute-metrics. Score-based models without a segment breakdown or explainability
+    update the previous version's cached score histogram with the changed rows only (delta rows,
+    plus y_old for label updates), so KS / AUC / bad rate / deciles / curves cost O(changed rows +
+    distinct scores), with KS evaluated at distinct scores as on the histogram path. Otherwise (or
+    when this worker has no histogram for the previous version) the metrics are recomputed in full.
+    Returns { refresh: incremental | full | None, metrics: record }.
+    """
+    from store import get_dataset, set_memo
+    ds = get_dataset(dataset_id)
+    last = ds.get("metrics_options") if ds else None
+    if not last:
+        return {"refresh": None}
+    model_type, options = last["model_type"], last["options"]
+    weight_col = weight_column(columns, options.get("weight_column"))
+    hist = None
+    if (
+        ds["version"] == version and model_type not in ("Collections", "ML")
+        and not options.get("segment_columns") and "segment" not in columns
+    ):
+        hist = _cached(_histograms, (previous, weight_col))
+    if hist is None:
+        return {"refresh": "full", "metrics": compute_dataset_metrics(dataset_id, {**options, "model_type": model_type})}
+    names = [c for c in ("target", "y", "score", "probability", weight_col) if c and c in columns]
+    changed = {c: columns[c][delta["rows"]] for c in names}
+    y_true = numeric_column(changed, "target", "y", default=0)
+    y_score = numeric_column(changed, "score", "probability", default=0.5)
+    weights = _weights(changed[weight_col], weight_col) if weight_col else None
+    hist = hist.copy()
+    if "y_old" in delta:
+        hist.relabel(delta["y_old"], y_true, y_score, weights)
+    else:
+        hist.add(y_true, y_score, weights)
+    if weight_col and not hist.total > 0:
+        raise StepError(f"weight column {weight_col} sums to zero")
+    _remember(_histograms, (version, weight_col), hist, MAX_CACHED_HISTOGRAMS)
+    y_baseline, w_baseline = _baseline(options)
+    metrics = _histogram_metrics(hist, model_type, y_baseline, w_baseline)
+    metrics["bad_rate"] = round(hist.n_pos / hist.total, 4) if hist.total else 0.0
+    extra = {"deciles": hist.deciles()}
+    if y_baseline is not None and len(y_baseline):
+        extra["drift"] = _score_drift(hist, y_baseline, w_baseline, options)
+    if _out_of_core(ds, model_type, options):
+        extra["out_of_core"] = hist.describe()
+    if weight_col:
+        extra["weight_column"] = weight_col
+        extra["weighted_volume"] = round(hist.total, 4)
+    curve_basis = hist.curve_basis()
+    record = _save_record(
+        dataset_id, ds, model_type, metrics, extra, curve_basis,
+        delta={"from_version": previous, "rows_changed": int(len(delta["rows"]))},
+    )
+    set_memo(
+        _metrics_key(version, model_type, options),
+        {"record_id": record["record_id"], "metrics": metrics, "extra": extra, "curve_basis": curve_basis},
+    )
+    return {"refresh": "incremental", "metrics": record}
+
+
+def operating_curve(dataset_id: str) -> dict:
+    """
+    { curve: metrics.operating_points.OperatingCurve, days } for a scored dataset, built once per
+    dataset version and cached; days = distinct values of a date column (1 if there is none).
+    Rows are weighted by a sample_weight / weight column when the dataset has one.
+    """
+    from store import get_dataset, get_dataset_columns
+    from metrics.operating_points import OperatingCurve
+    ds = get_dataset(dataset_id)
+    if ds is None:
+        raise StepError("dataset not found", 404)
+    key = ds["version"]
+    cached = _cached(_operating_curves, key)
+    if cached is not None:
+        return cached
+    columns = get_dataset_columns(dataset_id)
+    if not columns or not ds.get("row_count"):
+        raise StepError("no scored data")
+    date_col = next((c for c in _DATE_COLUMNS if c in columns), None)
+    entry = {
+        "curve": OperatingCurve(
+            numeric_column(columns, "target", "y", default=0),
+            numeric_column(columns, "score", "probability", default=0.5),
+            sample_weight=sample_weights(columns),
+        ),
+        "days": len(np.unique(columns[date_col])) if date_col else 1,
+    }
+    return _remember(_operating_curves, key, entry, MAX_CACHED_CURVES)
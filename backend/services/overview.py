@@ -0,0 +1,335 @@
+"""
+Portfolio overview: RAG counts, portfolio x model type status matrices, worst models by KS / PSI
+and volume totals for any portfolio / model type / vintage / segment filter.
+
+The store updates the overview on every saved metrics record (in the store-owning process). Each
+model / vintage / segment key contributes its latest run to one counter cell per (portfolio,
+model_type, vintage, segment), replacing the contribution of the run it supersedes, so a query sums
+a bounded number of cells whatever the size of the metrics history. Model-level counts use each
+model's status at its latest vintage (or the filtered one): the worst status among its segments,
+or that of the filtered segment. Statuses follow the alert rules and are rebuilt when they change.
+Per-model rows (the model cards) are served a page at a time by models(), in model_id order from
+an index kept sorted on write, so a page scans only until it is full.
+
+Writers (one at a time) copy the cells and models they change into a new top layer over the
+published view's layers and publish the new view with one assignment; summary() reads whichever
+view is current, so readers never lock or see a record half-counted. Layers are merged once the
+top one is at least half the size of the one below, so a write copies only what it changes plus
+an amortized O(log n) share of merges, and a lookup visits O(log n) layers.
+"""
+
+import heapq
+import itertools
+import threading
+from bisect import bisect_left, insort
+from collections import ChainMap
+from typing import Iterable, Optional
+
+from services.alerts import STATUSES, evaluate_status, evaluate_statuses
+
+DEFAULT_WORST_N = 5
+_LEVELS = {status: level for level, status in enumerate(STATUSES)}
+
+
+def _counts() -> dict:
+    return {"rows": 0, "volume": 0, **dict.fromkeys(STATUSES, 0)}
+
+
+def _layers(view: Optional["_View"], name: str) -> ChainMap:
+    """A writable empty layer over the published view's (never mutated) layers."""
+    return ChainMap({}, *getattr(view, name).maps) if view else ChainMap()
+
+
+def _lookup(layered: ChainMap, name):
+    """layered.get(name) in one pass over the layers."""
+    for layer in layered.maps:
+        if name in layer:
+            return layer[name]
+    return None
+
+
+def _merged(maps: list[dict]) -> list[dict]:
+    """Merge the newest layers while one is at least half the size of the layer below it."""
+    maps = list(maps)
+    while len(maps) > 1 and 2 * len(maps[0]) >= len(maps[1]):
+        maps[:2] = [{**maps[1], **maps[0]}]
+    return maps
+
+
+def _flat(layered: ChainMap) -> dict:
+    """The layers as one dict (newest wins), merged at dict.update speed for a full scan."""
+    flat = {}
+    for layer in reversed(layered.maps):
+        flat.update(layer)
+    return flat
+
+
+class _View:
+    """Published counters; a writer copies what it changes (own_*) into its top layer and publishes a new _View."""
+
+    def __init__(self, view: Optional["_View"] = None):
+        # (portfolio, model_type, vintage, segment) -> counts + ks / psi: sorted [(value, key, entry)], worst first
+        self.cells: ChainMap = _layers(view, "cells")
+        # model_id -> { portfolio, model_type, entries: {(vintage, segment): entry}, views: {(vintage|None, segment|None): status} }
+        self.models: ChainMap = _layers(view, "models")
+        self.model_cells: ChainMap = _layers(view, "model_cells")  # (portfolio, model_type, vintage|None, segment|None) -> status counts
+        self.model_ids: list[str] = view.model_ids if view else []  # sorted; replaced, never mutated, when a model is added
+
+    def own_cell(self, name: tuple) -> dict:
+        top = self.cells.maps[0]
+        if name not in top:
+            cell = _lookup(self.cells, name)
+            top[name] = {**cell, "ks": list(cell["ks"]), "psi": list(cell["psi"])} if cell else {**_counts(), "ks": [], "psi": []}
+        return top[name]
+
+    def own_model_cell(self, name: tuple) -> dict:
+        top = self.model_cells.maps[0]
+        if name not in top:
+            counts = _lookup(self.model_cells, name)
+            top[name] = dict(counts) if counts else dict.fromkeys(STATUSES, 0)
+        return top[name]
+
+    def seal(self) -> "_View":
+        """Merge layers before publishing; the published layers are never written again."""
+        for layered in (self.cells, self.models, self.model_cells):
+            layered.maps = _merged(layered.maps)
+        return self
+
+
+class PortfolioOverview:
+    """Counters for the overview, maintained incrementally from the latest run of each key."""
+
+    def __init__(self):
+        self.rows: dict[tuple, dict] = {}  # (model_id, vintage, segment) -> contribution of its latest run (writers only)
+        self.view = _View()
+        self._lock = threading.Lock()
+
+    def observe(self, record: dict, rules: dict) -> None:
+        """Count a key's latest run in place of the run it supersedes (copies only the cells and model it changes)."""
+        with self._lock:
+            view = _View(self.view)
+            self._observe(view, record, rules)
+            self.view = view.seal()
+
+    def rebuild(self, records: Iterable[dict], rules: dict) -> None:
+        """
+        Recount from the latest run of every key (at startup, and after the alert rules changed)
+        in one bulk pass: statuses are evaluated together and each cell's KS / PSI ranking is
+        sorted once rather than kept sorted record by record.
+        """
+        records = list(records)
+        statuses = evaluate_statuses(records, rules)
+        with self._lock:
+            self.rows = {}
+            view = _View()
+            cells = view.cells.maps[0]
+            entries: dict[str, dict] = {}
+            latest: dict[str, dict] = {}
+            for record, status in zip(records, statuses):
+                key, entry = _entry(record, status)
+                self.rows[key] = entry
+                cell = cells.get(entry["cell"])
+                if cell is None:
+                    cell = cells[entry["cell"]] = {**_counts(), "ks": [], "psi": []}
+                cell["rows"] += 1
+                cell["volume"] += entry["volume"]
+                cell[status] += 1
+                if isinstance(entry["KS"], (int, float)):
+                    cell["ks"].append((float(entry["KS"]), key, entry))
+                if isinstance(entry["PSI"], (int, float)):
+                    cell["psi"].append((-float(entry["PSI"]), key, entry))
+                entries.setdefault(key[0], {})[key[1:]] = entry
+                latest[key[0]] = entry
+            for cell in cells.values():
+                cell["ks"].sort()
+                cell["psi"].sort()
+            # Model views once per model, not once per record
+            for model_id, entry in latest.items():
+                self._set_model(view, model_id, entry, entries[model_id])
+            view.model_ids = sorted(latest)
+            self.view = view.seal()
+
+    def _observe(self, view: _View, record: dict, rules: dict) -> None:
+        key, entry = self._count_row(view, record, rules)
+        model = _lookup(view.models, key[0])
+        if model is None:
+            view.model_ids = list(view.model_ids)
+            insort(view.model_ids, key[0])
+        self._set_model(view, key[0], entry, {**(model["entries"] if model else {}), key[1:]: entry})
+
+    def _count_row(self, view: _View, record: dict, rules: dict) -> tuple[tuple, dict]:
+        """Move a key's row counts from its previous latest run to this one; returns (key, entry)."""
+        key, entry = _entry(record, evaluate_status(record, rules)["status"])
+        previous = self.rows.get(key)
+        if previous is not None:
+            self._count(view, key, previous, -1)
+        self.rows[key] = entry
+        self._count(view, key, entry, 1)
+        return key, entry
+
+    def _count(self, view: _View, key: tuple, entry: dict, sign: int) -> None:
+        cell = view.own_cell(entry["cell"])
+        cell["rows"] += sign
+        cell["volume"] += sign * entry["volume"]
+        cell[entry["status"]] += sign
+        for name, ranked, value in (("KS", cell["ks"], entry["KS"]), ("PSI", cell["psi"], entry["PSI"])):
+            if not isinstance(value, (int, float)):
+                continue
+            item = (float(value) if name == "KS" else -float(value), key)
+            if sign > 0:
+                insort(ranked, (*item, entry))
+            else:
+                del ranked[bisect_left(ranked, item)]
+
+    def _set_model(self, view: _View, model_id: str, entry: dict, entries: dict) -> None:
+        """Recompute a model's statuses per (vintage|latest, segment|all) view and move its counts."""
+        model = _lookup(view.models, model_id)
+        if model is not None:
+            self._count_views(view, model, -1)
+        model = {"portfolio": entry["cell"][0], "model_type": entry["cell"][1], "entries": entries}
+        # Worst status level per vintage, for all segments (None) and for each segment, in one pass
+        levels: dict[Optional[str], dict[str, int]] = {}
+        for (vintage, s), e in entries.items():
+            level = _LEVELS[e["status"]]
+            for segment in (None, s):
+                by_vintage = levels.setdefault(segment, {})
+                if level >= by_vintage.get(vintage, 0):
+                    by_vintage[vintage] = level
+        views = {}
+        for segment, by_vintage in levels.items():
+            for vintage, level in by_vintage.items():
+                views[(vintage, segment)] = STATUSES[level]
+            views[(None, segment)] = STATUSES[by_vintage[max(by_vintage)]]
+        model["views"] = views
+        view.models[model_id] = model
+        self._count_views(view, model, 1)
+
+    def _count_views(self, view: _View, model: dict, sign: int) -> None:
+        for (vintage, segment), status in model["views"].items():
+            view.own_model_cell((model["portfolio"], model["model_type"], vintage, segment))[status] += sign
+
+    def summary(
+        self,
+        portfolio: Optional[str] = None,
+        model_type: Optional[str] = None,
+        vintage: Optional[str] = None,
+        segment: Optional[str] = None,
+        worst_n: int = DEFAULT_WORST_N,
+    ) -> dict:
+        """
+        Overview for a filter: status counts over metrics rows (latest run per model / vintage /
+        segment) and over models, per-portfolio and portfolio x model type breakdowns, volume totals
+        and the worst_n rows by KS (lowest) and PSI (highest). Per-model rows come from models().
+        """
+        def selected(p: str, t: str) -> bool:
+            return (portfolio is None or p == portfolio) and (model_type is None or t == model_type)
+
+        view = self.view
+        totals, by_portfolio, matrix, ks_lists, psi_lists = _counts(), {}, {}, [], []
+        for (p, t, v, s), cell in _flat(view.cells).items():
+            if not cell["rows"] or not selected(p, t) or (vintage and v != vintage) or (segment is not None and s != segment):
+                continue
+            for group in (totals, by_portfolio.setdefault(p, _counts()), matrix.setdefault((p, t), _counts())):
+                for name in ("rows", "volume", *STATUSES):
+                    group[name] += cell[name]
+            ks_lists.append(cell["ks"])
+            psi_lists.append(cell["psi"])
+        model_totals, model_portfolio, model_matrix = dict.fromkeys(STATUSES, 0), {}, {}
+        for (p, t, v, s), counts in _flat(view.model_cells).items():
+            if v != (vintage or None) or s != segment or not selected(p, t):
+                continue
+            for group in (model_totals, model_portfolio.setdefault(p, dict.fromkeys(STATUSES, 0)), model_matrix.setdefault((p, t), dict.fromkeys(STATUSES, 0))):
+                for status in STATUSES:
+                    group[status] += counts[status]
+
+        def breakdown(counts: dict, models: dict) -> dict:
+            return {
+                "rows": counts["rows"],
+                "volume": counts["volume"],
+                "status_counts": {s: counts[s] for s in STATUSES},
+                "models": sum(models.values()),
+                "model_status_counts": models,
+            }
+
+        empty = dict.fromkeys(STATUSES, 0)
+        return {
+            "filters": {"portfolio": portfolio, "model_type": model_type, "vintage": vintage, "segment": segment},
+            **breakdown(totals, model_totals),
+            "by_portfolio": [
+                {"portfolio": p, **breakdown(by_portfolio[p], model_portfolio.get(p, empty))} for p in sorted(by_portfolio)
+            ],
+            "status_matrix": [
+                {"portfolio": p, "model_type": t, **breakdown(matrix[(p, t)], model_matrix.get((p, t), empty))}
+                for p, t in sorted(matrix)
+            ],
+            "worst_ks": [_row(key, entry) for _, key, entry in itertools.islice(heapq.merge(*ks_lists), worst_n)],
+            "worst_psi": [_row(key, entry) for _, key, entry in itertools.islice(heapq.merge(*psi_lists), worst_n)],
+        }
+
+    def models(
+        self,
+        portfolio: Optional[str] = None,
+        model_type: Optional[str] = None,
+        vintage: Optional[str] = None,
+        segment: Optional[str] = None,
+        status: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[dict], Optional[int]]:
+        """
+        One row per model with its status for the filter (as the model counts use it), optionally
+        only models in one status, in model_id order from position offset of the model index.
+        Returns (rows, offset to continue from, or None when no models are left).
+        """
+        view = self.view
+        ids, rows = view.model_ids, []
+        for i in range(offset, len(ids)):
+            model = _lookup(view.models, ids[i])
+            shown = model["views"].get((vintage or None, segment))
+            if not shown or (status is not None and shown != status):
+                continue
+            if (portfolio is not None and model["portfolio"] != portfolio) or (model_type is not None and model["model_type"] != model_type):
+                continue
+            if len(rows) == limit:
+                return rows, i
+            rows.append(_model_row(ids[i], model, vintage, segment, shown))
+        return rows, None
+
+
+def _entry(record: dict, status: str) -> tuple[tuple, dict]:
+    """(model_id, vintage, segment) key and counted contribution of a key's latest run."""
+    metrics = record.get("metrics") or {}
+    key = (record.get("model_id"), record.get("vintage") or "", record.get("segment") or "")
+    return key, {
+        "cell": (record.get("portfolio") or "Other", record.get("model_type") or "", key[1], key[2]),
+        "status": status,
+        "KS": metrics.get("KS"),
+        "PSI": metrics.get("PSI"),
+        "volume": int(record.get("volume") or 0),
+    }
+
+
+def _row(key: tuple, entry: dict) -> dict:
+    return {
+            "model_id": key[0],
+            "portfolio": entry["cell"][0],
+            "model_type": entry["cell"][1],
+            "vintage": key[1],
+            "segment": key[2] or None,
+            "KS": entry["KS"],
+            "PSI": entry["PSI"],
+            "status": entry["status"],
+            "volume": entry["volume"],
+        }
+
+
+def _model_row(model_id: str, model: dict, vintage: Optional[str], segment: Optional[str], status: str) -> dict:
+    """A model's status for the filter with the run it is shown with (its unsegmented run if any)."""
+    shown = vintage or max(v for v, s in model["entries"] if segment is None or s == segment)
+    runs = [(s, e) for (v, s), e in model["entries"].items() if v == shown and (segment is None or s == segment)]
+    # The unsegmented run, else the segment that sets the model's status
+    run_segment, entry = min(runs, key=lambda run: (run[0] != "", run[1]["status"] != status, run[0]))
+    return {**_row((model_id, shown, run_segment), entry), "status": status}
+
+
+overview = PortfolioOverview()
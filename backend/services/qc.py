@@ -2,21 +2,24 @@
 Data QC: completeness, schema, basic validity. Returns pass/fail and report.
 """
 
+import numpy as np
 
-def run_qc(data: list[dict], required_columns: list[str] | None = None) -> dict:
+
+def run_qc(columns: dict[str, np.ndarray], required_columns: list[str] | None = None) -> dict:
     """
-    Run QC on a list of records. required_columns: if provided, check presence.
+    Run QC on a columnar dataset (column name -> array). required_columns: if provided, check presence.
     """
-    if not data:
+    row_count = len(next(iter(columns.values()))) if columns else 0
+    if not row_count:
         return {"pass": False, "reason": "empty_data", "details": "No records"}
     required_columns = required_columns or []
-    cols = list(data[0].keys()) if data else []
+    cols = list(columns)
     missing = [c for c in required_columns if c not in cols]
     if missing:
         return {"pass": False, "reason": "schema", "details": f"Missing columns: {missing}"}
     return {
         "pass": True,
         "reason": "ok",
-        "details": f"Rows: {len(data)}, Columns: {len(cols)}",
-        "row_count": len(data),
+        "details": f"Rows: {row_count}, Columns: {len(cols)}",
+        "row_count": row_count,
     }
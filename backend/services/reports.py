@@ -0,0 +1,453 @@
+"""
+Report export: monthly governance packs for many models at once, rendered off the request path.
+
+Each model's pack is read from stored results only: its latest metrics records with their
+stored deciles and cached KS curves (store.get_curve), the KS / PSI / volume trend with
+commentary (services.insights) and variable stability. Nothing is recomputed. Charts (PNG) and
+the per-model PDF pack are rendered headless (matplotlib Figure objects, no pyplot) on a pool of
+MM_REPORT_PROCESSES worker processes, one model per task; rendered output is cached by pack
+content under MM_REPORT_DIR, so a model whose results have not changed is not rendered again by
+the next report. Data tables (summary, trends, deciles, stability) are written as CSV, Parquet
+(needs pyarrow) and one XLSX workbook (needs openpyxl or xlsxwriter). Everything goes into one
+zip per report, served by GET /api/reports/<report_id>/download.
+"""
+
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import textwrap
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from services.monitoring import StepError, content_hash
+
+REPORT_DIR = Path(os.environ.get("MM_REPORT_DIR") or Path(tempfile.gettempdir()) / "model_monitoring" / "reports")
+REPORT_PROCESSES = int(os.environ.get("MM_REPORT_PROCESSES", str(min(os.cpu_count() or 1, 4))))
+REPORT_CACHE_SECONDS = float(os.environ.get("MM_REPORT_CACHE_SECONDS", str(24 * 3600)))
+FORMATS = ("csv", "parquet", "xlsx", "pdf", "png")
+CHART_FORMATS = ("pdf", "png")
+KS_CURVE_POINTS = 200
+# Formats that need an optional package: format -> any of these
+_ENGINES = {"parquet": ("pyarrow",), "xlsx": ("openpyxl", "xlsxwriter")}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def available_formats() -> list[str]:
+    return [f for f in FORMATS if f not in _ENGINES or any(importlib.util.find_spec(e) for e in _ENGINES[f])]
+
+
+def report_path(report_id: str) -> Path:
+    return REPORT_DIR / f"{report_id}.zip"
+
+
+def create_report(spec: dict) -> dict:
+    """
+    Validate an export request and start it in a background thread; returns the queued job.
+    spec: model_ids, or portfolio / model_type filters (default: every model); vintage (default:
+    each model's latest); formats (subset of FORMATS, default: every available one).
+    """
+    from store import get_models, record_report_job
+    available = available_formats()
+    formats = spec.get("formats") or available
+    if isinstance(formats, str):
+        formats = [f.strip() for f in formats.split(",") if f.strip()]
+    unknown = sorted(set(formats) - set(FORMATS))
+    if unknown:
+        raise StepError(f"unknown formats: {unknown} (available: {available})")
+    missing = sorted(set(formats) - set(available))
+    if missing:
+        raise StepError(f"formats need packages that are not installed: {missing}")
+    models = get_models(portfolio=spec.get("portfolio") or None, model_type=spec.get("model_type") or None)
+    if spec.get("model_ids"):
+        if not isinstance(spec["model_ids"], list):
+            raise StepError("model_ids must be a list")
+        wanted = set(spec["model_ids"])
+        models = [m for m in models if m["model_id"] in wanted]
+    if not models:
+        raise StepError("no models match", 404)
+    job = {
+        "report_id": str(uuid.uuid4())[:8],
+        "status": "queued",
+        "created_at": _now(),
+        "filters": {k: spec.get(k) or None for k in ("portfolio", "model_type", "vintage")},
+        "formats": [f for f in FORMATS if f in formats],
+        "model_ids": [m["model_id"] for m in models],
+        "progress": {"done": 0, "reused": 0, "total": len(models)},
+    }
+    record_report_job(job)
+    threading.Thread(target=_run, args=(job,), name=f"mm-report-{job['report_id']}", daemon=True).start()
+    return job
+
+
+def _run(job: dict) -> None:
+    from store import record_report_job
+    job = {**job, "status": "running", "started_at": _now()}
+    record_report_job(job)
+    try:
+        packs = _packs(job["model_ids"], job["filters"]["vintage"])
+        job["skipped"] = [m for m in job["model_ids"] if m not in packs]
+        job["progress"]["total"] = len(packs)
+        rendered = {}
+        charts = [f for f in job["formats"] if f in CHART_FORMATS]
+        for model_id, model_dir, reused in _render_all(packs, charts) if charts else ():
+            rendered[model_id] = model_dir
+            job["progress"]["done"] += 1
+            job["progress"]["reused"] += int(reused)
+            record_report_job(job)
+        path = _write_zip(job, packs, rendered)
+        job["progress"]["done"] = len(packs)
+        job.update(status="succeeded", finished_at=_now(), size_bytes=path.stat().st_size)
+    except Exception as e:  # noqa: BLE001 - the job records any failure
+        job.update(status="failed", finished_at=_now(), error=str(e))
+    record_report_job(job)
+    _prune()
+
+
+def _packs(model_ids: list[str], vintage: Optional[str]) -> dict[str, dict]:
+    """model_id -> pack, for the models that have metrics (at the vintage, if given)."""
+    from store import get_alert_rules, get_metrics
+    wanted = set(model_ids)
+    by_model: dict[str, list[dict]] = {}
+    for record in get_metrics(vintage=vintage):
+        if record["model_id"] in wanted:
+            by_model.setdefault(record["model_id"], []).append(record)
+    rules = get_alert_rules()
+    return {m: model_pack(by_model[m], rules) for m in model_ids if m in by_model}
+
+
+def model_pack(records: list[dict], rules: dict) -> dict:
+    """One model's report data from its latest records (the latest vintage among them, every segment)."""
+    from store import get_curve, get_decile_metrics, get_metrics_trends, get_variable_stability
+    from services.alerts import evaluate_status
+    from services.insights import generate_decile_commentary, generate_ks_trigger_insight, generate_trend_commentary
+    vintage = max(r["vintage"] for r in records)
+    latest = sorted((r for r in records if r["vintage"] == vintage), key=lambda r: r.get("segment") or "")
+    model_id = latest[0]["model_id"]
+    segments = []
+    for r in latest:
+        deciles = r.get("deciles") or get_decile_metrics(model_id, vintage, segment=r.get("segment"))
+        segments.append({
+            "segment": r.get("segment"),
+            "record_id": r["record_id"],
+            "computed_at": r.get("computed_at"),
+            "volume": r.get("volume"),
+            "metrics": {k: v for k, v in (r.get("metrics") or {}).items() if isinstance(v, (int, float, str)) or v is None},
+            **evaluate_status(r, rules),
+            "deciles": deciles,
+            "decile_commentary": generate_decile_commentary(deciles),
+            "ks_trigger_insight": generate_ks_trigger_insight((r.get("metrics") or {}).get("KS"), deciles),
+            "ks_curve": get_curve(r["record_id"], "ks", KS_CURVE_POINTS),
+        })
+    trend = get_metrics_trends(model_id) or {}
+    return {
+        "model_id": model_id,
+        "portfolio": latest[0].get("portfolio"),
+        "model_type": latest[0].get("model_type"),
+        "vintage": vintage,
+        "trend": {**trend, "commentary": generate_trend_commentary(trend)} if trend else {},
+        "segments": segments,
+        "stability": get_variable_stability(model_id, vintage),
+    }
+
+
+def _render_all(packs: dict[str, dict], formats: list[str]) -> Iterator[tuple[str, Path, bool]]:
+    """(model_id, rendered directory, reused from cache) per model, as each one is ready."""
+    pending = {}
+    for model_id, pack in packs.items():
+        model_dir = REPORT_DIR / "models" / content_hash("report", pack, formats)
+        if model_dir.is_dir():
+            os.utime(model_dir)
+            yield model_id, model_dir, True
+        else:
+            pending[model_id] = model_dir
+    if REPORT_PROCESSES <= 0:
+        for model_id, model_dir in pending.items():
+            render_model(packs[model_id], formats, str(model_dir))
+            yield model_id, model_dir, False
+        return
+    pool = _get_pool()
+    try:
+        futures = {pool.submit(render_model, packs[m], formats, str(d)): (m, d) for m, d in pending.items()}
+        for future in as_completed(futures):
+            future.result()
+            yield *futures[future], False
+    except BrokenProcessPool:
+        _drop_pool(pool)
+        raise
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=REPORT_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _drop_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a pool whose worker died, so the next report starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_model(pack: dict, formats: list[str], model_dir: str) -> None:
+    """Render one model's charts (PNG) and PDF pack into model_dir (runs in a pool process)."""
+    from matplotlib.backends.backend_pdf import PdfPages
+    target = Path(model_dir)
+    tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    tmp.mkdir(parents=True, exist_ok=True)
+    charts = _charts(pack)
+    if "png" in formats:
+        for name, fig in charts:
+            fig.savefig(tmp / f"{name}.png", dpi=110)
+    if "pdf" in formats:
+        with PdfPages(tmp / f"{_safe_name(pack['model_id'])}.pdf") as pdf:
+            pdf.savefig(_summary_page(pack))
+            for _, fig in charts:
+                pdf.savefig(fig)
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        # Rendered concurrently for another report: keep that one
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _charts(pack: dict) -> list[tuple[str, "Figure"]]:
+    import numpy as np
+    from matplotlib.figure import Figure
+
+    def values(name: str) -> np.ndarray:
+        return np.array([np.nan if v is None else v for v in trend.get(name) or []], dtype=float)
+
+    charts = []
+    title = f"{pack['model_id']} ({pack['model_type']}, {pack['portfolio']})"
+    trend = pack["trend"]
+    vintages = trend.get("vintages") or []
+    ks, psi = values("ks"), values("psi")
+    if vintages and (np.isfinite(ks).any() or np.isfinite(psi).any()):
+        fig = Figure(figsize=(8, 4.5))
+        ax = fig.subplots()
+        ax.plot(vintages, ks, marker="o", color="tab:blue", label="KS")
+        ax.plot(vintages, psi, marker="s", color="tab:orange", label="PSI")
+        ax.axhline(0.3, color="tab:blue", linestyle=":", linewidth=1, label="KS green (0.3)")
+        ax.axhline(0.2, color="tab:orange", linestyle=":", linewidth=1, label="PSI amber (0.2)")
+        ax.set_title(f"KS and PSI by vintage - {title}")
+        ax.set_xlabel("Vintage")
+        ax.legend(loc="best", fontsize=8)
+        ax.grid(True, alpha=0.3)
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
+        charts.append(("ks_psi_trend", fig))
+    if vintages:
+        fig = Figure(figsize=(8, 4.5))
+        ax = fig.subplots()
+        ax.bar(vintages, values("volume"), color="tab:gray", alpha=0.6, label="Volume")
+        ax.set_ylabel("Volume")
+        bad_rate = values("bad_rate")
+        if np.isfinite(bad_rate).any():
+            ax2 = ax.twinx()
+            ax2.plot(vintages, bad_rate * 100, marker="o", color="tab:red", label="Bad rate %")
+            ax2.set_ylabel("Bad rate (%)")
+        ax.set_title(f"Volume and bad rate by vintage - {title}")
+        ax.tick_params(axis="x", labelrotation=45)
+        fig.tight_layout()
+        charts.append(("volume_trend", fig))
+    with_deciles = [s for s in pack["segments"] if s["deciles"]]
+    if with_deciles:
+        fig = Figure(figsize=(8, 4.5))
+        ax = fig.subplots()
+        width = 0.8 / len(with_deciles)
+        for i, seg in enumerate(with_deciles):
+            x = np.array([d["decile"] for d in seg["deciles"]]) + (i - (len(with_deciles) - 1) / 2) * width
+            ax.bar(x, [d["bad_rate"] * 100 for d in seg["deciles"]], width=width, label=seg["segment"] or "All")
+        ax.set_xticks(range(1, 11))
+        ax.set_xlabel("Score decile (1 = highest risk)")
+        ax.set_ylabel("Bad rate (%)")
+        ax.set_title(f"Bad rate by decile, {pack['vintage']} - {title}")
+        ax.legend(fontsize=8)
+        ax.grid(True, axis="y", alpha=0.3)
+        fig.tight_layout()
+        charts.append(("deciles", fig))
+    with_curves = [s for s in pack["segments"] if s["ks_curve"]]
+    if with_curves:
+        fig = Figure(figsize=(8, 5))
+        ax = fig.subplots()
+        for seg in with_curves:
+            curve, label = seg["ks_curve"], seg["segment"] or "All"
+            x = np.asarray(curve["x"]) * 100
+            ax.plot(x, np.asarray(curve["y"]) * 100, linewidth=2, label=f"Cumulative % bads ({label})")
+            ax.plot(x, np.asarray(curve["y2"]) * 100, linewidth=2, label=f"Cumulative % goods ({label})")
+            ax.axvline(curve["ks_x"] * 100, color="green", linestyle="--", label=f"KS = {curve['ks']:.4f} ({label})")
+        ax.set_xlabel("Percentile of population (sorted by score)")
+        ax.set_ylabel("Cumulative percentage (%)")
+        ax.set_title(f"Kolmogorov-Smirnov curve, {pack['vintage']} - {title}")
+        ax.set_xlim(0, 100)
+        ax.set_ylim(0, 100)
+        ax.legend(loc="lower right", fontsize=8)
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
+        charts.append(("ks_curve", fig))
+    if pack["stability"]:
+        colors = {"green": "tab:green", "amber": "tab:orange", "red": "tab:red"}
+        fig = Figure(figsize=(8, 4))
+        ax = fig.subplots()
+        rows = pack["stability"]
+        ax.barh([r["variable"] for r in rows], [r["psi"] for r in rows], color=[colors.get(r["status"], "tab:gray") for r in rows])
+        ax.axvline(0.1, color="tab:orange", linestyle=":", linewidth=1)
+        ax.axvline(0.2, color="tab:red", linestyle=":", linewidth=1)
+        ax.set_xlabel("PSI")
+        ax.set_title(f"Variable stability, {pack['vintage']} - {title}")
+        fig.tight_layout()
+        charts.append(("variable_stability", fig))
+    return charts
+
+
+def _summary_page(pack: dict) -> "Figure":
+    """A4 text page: model, status and metrics per segment, breaches and commentary."""
+    from matplotlib.figure import Figure
+    lines = [
+        (f"{pack['model_id']} - monitoring pack", 15, "bold"),
+        (f"{pack['model_type']} | {pack['portfolio']} | vintage {pack['vintage']}", 10, "normal"),
+        ("", 10, "normal"),
+    ]
+    for seg in pack["segments"]:
+        lines.append((f"{seg['segment'] or 'All accounts'}: {seg['status'].upper()} (volume {seg['volume']})", 11, "bold"))
+        metrics = ", ".join(f"{k} {v}" for k, v in seg["metrics"].items())
+        lines += [(text, 9, "normal") for text in textwrap.wrap(metrics, 100)]
+        for b in seg["breaches"]:
+            lines.append((f"Breach: {b['metric']} = {b['value']} ({b['status']}, threshold {b['threshold']})", 9, "normal"))
+        for comment in (seg["ks_trigger_insight"], seg["decile_commentary"]):
+            lines += [(text, 9, "normal") for text in textwrap.wrap(comment, 100)]
+        lines.append(("", 9, "normal"))
+    commentary = pack["trend"].get("commentary") or {}
+    if commentary:
+        lines.append(("Trend commentary", 11, "bold"))
+        for comment in commentary.values():
+            lines += [(text, 9, "normal") for text in textwrap.wrap(comment, 100)]
+    fig = Figure(figsize=(8.27, 11.69))
+    y = 0.95
+    for text, size, weight in lines:
+        if y < 0.04:
+            break
+        fig.text(0.07, y, text, fontsize=size, fontweight=weight, va="top")
+        y -= 0.012 + size * 0.0013
+    return fig
+
+
+def _tables(packs: dict[str, dict]) -> dict:
+    """summary / trends / deciles / stability data frames over every model."""
+    import pandas as pd
+    summary, trends, deciles, stability = [], [], [], []
+    for pack in packs.values():
+        base = {k: pack[k] for k in ("model_id", "portfolio", "model_type", "vintage")}
+        commentary = pack["trend"].get("commentary") or {}
+        for seg in pack["segments"]:
+            summary.append({
+                **base,
+                "segment": seg["segment"],
+                "status": seg["status"],
+                "volume": seg["volume"],
+                "computed_at": seg["computed_at"],
+                "record_id": seg["record_id"],
+                **seg["metrics"],
+                "breaches": "; ".join(f"{b['metric']} {b['status']}" for b in seg["breaches"]),
+                "ks_trigger_insight": seg["ks_trigger_insight"],
+                "decile_commentary": seg["decile_commentary"],
+                **commentary,
+            })
+            deciles += [{**base, "segment": seg["segment"], **d} for d in seg["deciles"]]
+        trend = pack["trend"]
+        for i, vintage in enumerate(trend.get("vintages") or []):
+            trends.append({
+                "model_id": pack["model_id"],
+                "vintage": vintage,
+                **{k: trend[k][i] for k in ("ks", "psi", "volume", "bad_rate", "maturity_adjusted_bad_rate") if k in trend},
+                **{f"drift_{k}": series[i] for k, series in (trend.get("drift") or {}).items()},
+            })
+        stability += [{**base, **s} for s in pack["stability"]]
+    return {
+        "summary": pd.DataFrame(summary),
+        "trends": pd.DataFrame(trends),
+        "deciles": pd.DataFrame(deciles),
+        "stability": pd.DataFrame(stability),
+    }
+
+
+def _write_zip(job: dict, packs: dict[str, dict], rendered: dict[str, Path]) -> Path:
+    import pandas as pd
+    path = report_path(job["report_id"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".tmp-{os.getpid()}")
+    root = f"report_{job['report_id']}"
+    formats = job["formats"]
+    manifest = {
+        **{k: job[k] for k in ("report_id", "created_at", "filters", "formats", "skipped")},
+        "models": [
+            {k: pack[k] for k in ("model_id", "portfolio", "model_type", "vintage")}
+            | {"statuses": {s["segment"] or "": s["status"] for s in pack["segments"]}}
+            for pack in packs.values()
+        ],
+    }
+    with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"{root}/manifest.json", json.dumps(manifest, indent=2, default=str))
+        tables = _tables(packs)
+        for name, frame in tables.items():
+            if "csv" in formats:
+                zf.writestr(f"{root}/{name}.csv", frame.to_csv(index=False))
+            if "parquet" in formats:
+                buf = io.BytesIO()
+                frame.to_parquet(buf, index=False)
+                zf.writestr(f"{root}/{name}.parquet", buf.getvalue())
+        if "xlsx" in formats:
+            buf = io.BytesIO()
+            with pd.ExcelWriter(buf) as writer:
+                for name, frame in tables.items():
+                    frame.to_excel(writer, sheet_name=name, index=False)
+            zf.writestr(f"{root}/monitoring_pack.xlsx", buf.getvalue())
+        for model_id, model_dir in rendered.items():
+            for f in sorted(model_dir.iterdir()):
+                # PNG and PDF are compressed already
+                zf.write(f, f"{root}/{_safe_name(model_id)}/{f.name}", compress_type=zipfile.ZIP_STORED)
+    os.replace(tmp, path)
+    return path
+
+
+def _prune() -> None:
+    """Drop zips of jobs the store no longer keeps and rendered models unused for REPORT_CACHE_SECONDS."""
+    from store import get_report_jobs
+    keep = {job["report_id"] for job in get_report_jobs()}
+    for path in REPORT_DIR.glob("*.zip"):
+        if path.stem not in keep:
+            path.unlink(missing_ok=True)
+    cutoff = time.time() - REPORT_CACHE_SECONDS
+    for model_dir in (REPORT_DIR / "models").glob("*"):
+        try:
+            if model_dir.stat().st_mtime < cutoff:
+                shutil.rmtree(model_dir, ignore_errors=True)
+        except FileNotFoundError:
+            pass
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]", "_", str(name))
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
@@ -0,0 +1,193 @@
+"""
+Response encoding for bulk endpoints: content negotiation (row JSON, columnar JSON,
+Arrow IPC), cursor pagination, ETag revalidation, and gzip/brotli compression.
+Row-oriented JSON stays the default so existing clients are unaffected.
+"""
+
+import base64
+import gzip
+from typing import Any, Optional
+
+from flask import Response, jsonify
+
+COLUMNAR_JSON = "application/vnd.mm.columnar+json"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+MAX_PAGE_SIZE = 10000
+
+
+def negotiate_format(accept_header: Optional[str]) -> str:
+    """Pick 'arrow', 'columnar' or 'json' from an Accept header (first supported match wins)."""
+    for part in (accept_header or "").split(","):
+        mime = part.split(";")[0].strip().lower()
+        if mime == ARROW_STREAM and _pyarrow() is not None:
+            return "arrow"
+        if mime == COLUMNAR_JSON:
+            return "columnar"
+    return "json"
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """Offset encoded in an opaque cursor; raises ValueError on a malformed cursor."""
+    if not cursor:
+        return 0
+    padded = cursor + "=" * (-len(cursor) % 4)
+    offset = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    if offset < 0:
+        raise ValueError("negative cursor")
+    return offset
+
+
+def paginate(rows: list, limit: Optional[str], cursor: Optional[str]) -> tuple[list, Optional[str]]:
+    """
+    Slice rows by (limit, cursor). Without a limit all rows are returned (legacy behaviour).
+    Returns (page, next_cursor); next_cursor is None on the last page.
+    """
+    if limit is None and cursor is None:
+        return rows, None
+    offset = decode_cursor(cursor)
+    size = min(int(limit), MAX_PAGE_SIZE) if limit is not None else MAX_PAGE_SIZE
+    if size <= 0:
+        raise ValueError("limit must be positive")
+    page = rows[offset:offset + size]
+    next_offset = offset + len(page)
+    return page, (encode_cursor(next_offset) if next_offset < len(rows) else None)
+
+
+def _flatten(row: dict, prefix: str = "") -> dict:
+    out = {}
+    for key, value in row.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            out.update(_flatten(value, name + "."))
+        else:
+            out[name] = value
+    return out
+
+
+def to_columns(rows: list[dict]) -> dict[str, list]:
+    """Flatten nested dicts (e.g. metrics.KS) and pivot rows into equal-length columns."""
+    flat = [_flatten(r) for r in rows]
+    names: dict[str, None] = {}
+    for r in flat:
+        names.update(dict.fromkeys(r))
+    return {name: [r.get(name) for r in flat] for name in names}
+
+
+def to_columnar_json(rows: list[dict]) -> dict[str, Any]:
+    """
+    Column-oriented payload. String columns are dictionary-encoded:
+    { "dictionary": [...distinct values], "codes": [...indices, null for missing] }.
+    """
+    columns = {}
+    for name, values in to_columns(rows).items():
+        if all(v is None or isinstance(v, str) for v in values):
+            lookup: dict[str, int] = {}
+            codes = [None if v is None else lookup.setdefault(v, len(lookup)) for v in values]
+            columns[name] = {"dictionary": list(lookup), "codes": codes}
+        else:
+            columns[name] = {"values": values}
+    return {"row_count": len(rows), "columns": columns}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def to_arrow_ipc(rows: list[dict]) -> bytes:
+    """Arrow IPC stream with string columns dictionary-encoded (requires pyarrow)."""
+    pa = _pyarrow()
+    arrays, names = [], []
+    for name, values in to_columns(rows).items():
+        arr = pa.array(values)
+        if pa.types.is_string(arr.type):
+            arr = arr.dictionary_encode()
+        arrays.append(arr)
+        names.append(name)
+    table = pa.Table.from_arrays(arrays, names=names)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def bulk_response(key: str, rows: list[dict], fmt: str, next_cursor: Optional[str] = None) -> Response:
+    """Encode a list endpoint's rows in the negotiated format; paging info goes in body and headers."""
+    if fmt == "arrow":
+        resp = Response(to_arrow_ipc(rows), mimetype=ARROW_STREAM)
+    elif fmt == "columnar":
+        body = {key: to_columnar_json(rows)}
+        if next_cursor is not None:
+            body["next_cursor"] = next_cursor
+        resp = jsonify(body)
+        resp.mimetype = COLUMNAR_JSON
+    else:
+        body = {key: rows}
+        if next_cursor is not None:
+            body["next_cursor"] = next_cursor
+        resp = jsonify(body)
+    if next_cursor is not None:
+        resp.headers["X-Next-Cursor"] = next_cursor
+    resp.headers.add("Vary", "Accept")
+    return resp
+
+
+def conditional_response(response: Response, request) -> Response:
+    """
+    Weak ETag (hash of the uncompressed body) on successful GET JSON responses, and 304 Not
+    Modified without a body when the request's If-None-Match already has it.
+    """
+    if (
+        request.method != "GET"
+        or response.status_code != 200
+        or response.direct_passthrough
+        or not response.is_json
+        or "ETag" in response.headers
+    ):
+        return response
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
+
+
+def compress_response(response: Response, accept_encoding: Optional[str]) -> Response:
+    """Brotli (if installed) or gzip encode a buffered response when the client accepts it."""
+    if (
+        response.direct_passthrough
+        or response.status_code < 200
+        or response.status_code >= 300
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    data, encoding = encode_body(response.get_data(), accept_encoding)
+    if encoding is None:
+        return response
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    response.headers.add("Vary", "Accept-Encoding")
+    return response
+
+
+def encode_body(data: bytes, accept_encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+    """(encoded body, Content-Encoding) for a response body, or (data, None) if not worth it / not accepted."""
+    accepted = {p.split(";")[0].strip().lower() for p in (accept_encoding or "").split(",")}
+    if len(data) < MIN_COMPRESS_BYTES:
+        return data, None
+    if "br" in accepted:
+        try:
+            import brotli
+            return brotli.compress(data, quality=5), "br"
+        except ImportError:
+            pass
+    if "gzip" in accepted:
+        return gzip.compress(data, compresslevel=5), "gzip"
+    return data, None
@@ -0,0 +1,450 @@
+"""
+Scheduled monitoring pipelines: per-model DAGs of the monitoring steps (ingest, qc, score,
+compute, insights) run on cron-like schedules, when a dataset lands for the model, or on demand.
+
+Run requests are queued in the store (so any worker can trigger one) and executed by the
+scheduler thread in the process that owns the store: runs for different models execute
+concurrently on a bounded pool, failed steps are retried with backoff, and a step whose
+input content hash matches its last successful run is skipped and its output reused.
+Run history with per-step durations is kept in the store.
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from services.monitoring import StepError, content_hash
+
+STEPS = ("ingest", "qc", "score", "compute", "insights")
+DEFAULT_DAG = {"ingest": [], "qc": ["ingest"], "score": ["qc"], "compute": ["score"], "insights": ["compute"]}
+MAX_PARALLEL_RUNS = int(os.environ.get("MM_SCHEDULER_WORKERS", "4"))
+TICK_SECONDS = float(os.environ.get("MM_SCHEDULER_TICK", "5"))
+DEFAULT_RETRIES = 2
+FINISHED_STATUSES = ("succeeded", "failed")
+MAX_RUN_WAIT_S = 60.0  # longest long poll on a run's status
+RUN_POLL_INTERVAL_S = 0.25
+
+_CRON_ALIASES = {"@hourly": "0 * * * *", "@daily": "0 0 * * *", "@weekly": "0 0 * * 0", "@monthly": "0 0 1 * *"}
+_CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]  # minute, hour, day of month, month, day of week (0 = Sunday)
+
+
+def parse_cron(expr: str) -> list[set[int]]:
+    """Allowed values per field of a 5-field cron expression (*, */n, a-b, a-b/n, lists, @daily etc.)."""
+    fields = _CRON_ALIASES.get(expr.strip(), expr).split()
+    if len(fields) != 5:
+        raise ValueError(f"cron expression needs 5 fields: {expr!r}")
+    out = []
+    for field, (lo, hi) in zip(fields, _CRON_RANGES):
+        allowed = set()
+        for part in field.split(","):
+            span, _, step = part.partition("/")
+            if span == "*":
+                start, end = lo, hi
+            elif "-" in span:
+                start, end = (int(v) for v in span.split("-", 1))
+            else:
+                start = end = int(span)
+            if start < lo or end > hi or start > end:
+                raise ValueError(f"cron field {field!r} out of range {lo}-{hi}")
+            allowed.update(range(start, end + 1, int(step) if step else 1))
+        out.append(allowed)
+    return out
+
+
+def cron_matches(expr: str, when: datetime) -> bool:
+    """True if `when` (to the minute) matches the cron expression."""
+    minute, hour, dom, month, dow = parse_cron(expr)
+    if when.minute not in minute or when.hour not in hour or when.month not in month:
+        return False
+    day_ok, weekday_ok = when.day in dom, (when.weekday() + 1) % 7 in dow
+    # Standard cron: when both day fields are restricted, either may match
+    if len(dom) < 31 and len(dow) < 7:
+        return day_ok or weekday_ok
+    return day_ok and weekday_ok
+
+
+def dataset_input(dataset_id: str) -> str:
+    """
+    Step input hash for a dataset: its content version plus which dataset it is (id, model,
+    vintage). Datasets share content across vintages, so the same records landing for a new
+    vintage must not look like the input of the last run.
+    """
+    from store import get_dataset
+    ds = get_dataset(dataset_id)
+    if ds is None:
+        raise StepError("dataset not found", 404)
+    meta = ds["metadata"]
+    return content_hash(dataset_id, meta.get("portfolio"), meta.get("model_type"), meta.get("model_id"), meta.get("vintage"), ds["version"])
+
+
+def _topological_waves(dag: dict[str, list[str]]) -> list[list[str]]:
+    """Steps grouped into waves whose dependencies are all in earlier waves."""
+    remaining, done, waves = dict(dag), set(), []
+    while remaining:
+        wave = [s for s, deps in remaining.items() if set(deps) <= done]
+        if not wave:
+            raise StepError(f"pipeline steps have a cycle: {sorted(remaining)}")
+        waves.append(wave)
+        done.update(wave)
+        for s in wave:
+            del remaining[s]
+    return waves
+
+
+def make_pipeline(spec: dict) -> dict:
+    """
+    Validate a pipeline spec into a stored definition. spec: model_id (required), pipeline_id,
+    schedule (cron), on_dataset (default true), source (CSV/JSON file to ingest on schedule),
+    vintage, steps (subset of STEPS) or dag ({ step: [deps] }), retries, required_columns,
+    options (compute-metrics options).
+    """
+    from store import get_models
+    model_id = spec.get("model_id")
+    if not model_id:
+        raise StepError("model_id required")
+    model = next((m for m in get_models() if m["model_id"] == model_id), {})
+    if spec.get("dag"):
+        dag = {s: list(deps) for s, deps in spec["dag"].items()}
+    else:
+        steps = spec.get("steps") or list(STEPS)
+        dag = {}
+        for s in steps:
+            # Depend on the nearest selected ancestor in the default chain
+            deps = list(DEFAULT_DAG.get(s, []))
+            while deps and deps[0] not in steps:
+                deps = DEFAULT_DAG[deps[0]]
+            dag[s] = deps
+    depended_on = {d for deps in dag.values() for d in deps}
+    unknown = sorted((set(dag) | depended_on) - set(STEPS))
+    if not dag or unknown:
+        raise StepError(f"unknown pipeline steps: {unknown}" if unknown else "pipeline has no steps")
+    missing = sorted(depended_on - set(dag))
+    if missing:
+        raise StepError(f"dependencies not in pipeline: {missing}")
+    _topological_waves(dag)
+    schedule = spec.get("schedule")
+    if schedule:
+        try:
+            parse_cron(schedule)
+        except ValueError as e:
+            raise StepError(str(e))
+    if spec.get("source") and not Path(spec["source"]).is_file():
+        raise StepError(f"source file not found: {spec['source']}")
+    return {
+        "pipeline_id": spec.get("pipeline_id") or f"{model_id}-monitoring",
+        "model_id": model_id,
+        "portfolio": spec.get("portfolio") or model.get("portfolio", ""),
+        "model_type": spec.get("model_type") or model.get("model_type", "Acquisition Scorecard"),
+        "vintage": spec.get("vintage"),
+        "schedule": schedule,
+        "on_dataset": bool(spec.get("on_dataset", True)),
+        "source": spec.get("source"),
+        "dag": dag,
+        "retries": int(spec.get("retries", DEFAULT_RETRIES)),
+        "retry_delay": float(spec.get("retry_delay", 1.0)),
+        "required_columns": spec.get("required_columns") or [],
+        "options": spec.get("options") or {},
+        "created_at": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def notify_dataset_landed(dataset_id: str, metadata: dict) -> list[dict]:
+    """Queue runs of every dataset-triggered pipeline for the dataset's model."""
+    from store import get_pipelines, queue_pipeline_run
+    return [
+        queue_pipeline_run(p["pipeline_id"], "dataset", dataset_id=dataset_id)
+        for p in get_pipelines(metadata.get("model_id"))
+        if p["on_dataset"] and "ingest" in p["dag"]
+    ]
+
+
+def _parse_value(value: str):
+    if value == "":
+        return None
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _read_source(path: Path) -> list[dict]:
+    """Records from a CSV (values parsed as int/float where possible) or JSON list file."""
+    if path.suffix.lower() == ".json":
+        return json.loads(path.read_text())
+    with path.open(newline="") as f:
+        return [{k: _parse_value(v) for k, v in row.items()} for row in csv.DictReader(f)]
+
+
+# Step implementations: (pipeline, run context, upstream outputs) -> (input_hash, runner)
+# The runner is only called when input_hash differs from the last successful run.
+
+def _step_ingest(pipeline: dict, ctx: dict, upstream: dict):
+    if ctx.get("dataset_id"):
+        dataset_id = ctx["dataset_id"]
+        return dataset_input(dataset_id), lambda: {"dataset_id": dataset_id}
+    if pipeline.get("source"):
+        path = Path(pipeline["source"])
+        if not path.is_file():
+            raise StepError(f"source file not found: {path}", 404)
+
+        vintage = pipeline.get("vintage") or datetime.utcnow().strftime("%Y-%m")
+
+        def run():
+            from services.ingestion import ingest
+            result = ingest(_read_source(path), pipeline["portfolio"], pipeline["model_type"], pipeline["model_id"], vintage, notify=False)
+            return {"dataset_id": result["dataset_id"]}
+        return content_hash(path.read_bytes(), vintage), run
+    # No trigger dataset and no source: the model's most recently ingested dataset
+    from store import list_datasets
+    latest = [did for did, ds in list_datasets() if ds["metadata"].get("model_id") == pipeline["model_id"]]
+    if not latest:
+        raise StepError(f"no dataset ingested for {pipeline['model_id']}", 404)
+    return dataset_input(latest[-1]), lambda: {"dataset_id": latest[-1]}
+
+
+def _dataset_from(upstream: dict) -> str:
+    for output in upstream.values():
+        if output and output.get("dataset_id"):
+            return output["dataset_id"]
+    raise StepError("no upstream dataset")
+
+
+def _step_qc(pipeline: dict, ctx: dict, upstream: dict):
+    dataset_id = _dataset_from(upstream)
+
+    def run():
+        from services.monitoring import run_dataset_qc
+        report = run_dataset_qc(dataset_id, pipeline["required_columns"])
+        if not report["pass"]:
+            raise StepError(f"QC failed: {report.get('details')}")
+        return {"dataset_id": dataset_id, "qc": report}
+    return content_hash(dataset_input(dataset_id), pipeline["required_columns"]), run
+
+
+def _step_score(pipeline: dict, ctx: dict, upstream: dict):
+    dataset_id = _dataset_from(upstream)
+
+    def run():
+        from services.monitoring import score_dataset
+        score_dataset(dataset_id)
+        return {"dataset_id": dataset_id}
+    return content_hash(dataset_input(dataset_id)), run
+
+
+def _step_compute(pipeline: dict, ctx: dict, upstream: dict):
+    dataset_id = _dataset_from(upstream)
+
+    def run():
+        from services.monitoring import compute_dataset_metrics
+        record = compute_dataset_metrics(dataset_id, pipeline["options"])
+        return {"dataset_id": dataset_id, "record_id": record["record_id"], "metrics": record["metrics"]}
+    # Scoring rewrites the dataset, so hash the scored content rather than the upstream output
+    return content_hash(dataset_input(dataset_id), pipeline["options"]), run
+
+
+def _step_insights(pipeline: dict, ctx: dict, upstream: dict):
+    def run():
+        from store import get_metrics_trends
+        from services.insights import generate_trend_commentary
+        trends = get_metrics_trends(pipeline["model_id"])
+        return {"commentary": generate_trend_commentary(trends) if trends else {}}
+    return content_hash(upstream), run
+
+
+_STEP_FUNCS = {
+    "ingest": _step_ingest,
+    "qc": _step_qc,
+    "score": _step_score,
+    "compute": _step_compute,
+    "insights": _step_insights,
+}
+
+
+def execute_run(request: dict, pipeline: dict | None = None) -> dict:
+    """Run one queued pipeline request to completion and record it in the store."""
+    from store import get_pipelines, get_step_cache, record_pipeline_run, set_step_cache
+    if pipeline is None:
+        pipeline = next((p for p in get_pipelines() if p["pipeline_id"] == request["pipeline_id"]), None)
+    started = time.monotonic()
+    run = {
+        "run_id": request["run_id"],
+        "pipeline_id": request["pipeline_id"],
+        "model_id": pipeline["model_id"] if pipeline else None,
+        "trigger": request["trigger"],
+        "dataset_id": request.get("dataset_id"),
+        "status": "running",
+        "queued_at": request["queued_at"],
+        "started_at": datetime.utcnow().isoformat() + "Z",
+        "steps": [],
+    }
+    if pipeline is None:
+        run.update(status="failed", error="pipeline not found", finished_at=run["started_at"], duration_s=0.0)
+        record_pipeline_run(run)
+        return run
+    waves = _topological_waves(pipeline["dag"])
+    run["steps"] = [{"step": s, "status": "pending", "attempts": 0} for wave in waves for s in wave]
+    by_step = {s["step"]: s for s in run["steps"]}
+    outputs: dict[str, dict] = {}
+    record_pipeline_run(run)
+
+    def run_step(name: str) -> None:
+        entry = by_step[name]
+        entry["status"] = "running"
+        t0 = time.monotonic()
+        upstream = {d: outputs.get(d) for d in pipeline["dag"][name]}
+        attempt = 0
+        while True:
+            attempt += 1
+            entry["attempts"] = attempt
+            try:
+                input_hash, runner = _STEP_FUNCS[name](pipeline, request, upstream)
+                entry["input_hash"] = input_hash
+                cached = get_step_cache(pipeline["pipeline_id"], name)
+                if cached and cached["input_hash"] == input_hash and not request.get("force"):
+                    outputs[name] = cached["output"]
+                    entry["status"] = "skipped"
+                else:
+                    outputs[name] = runner()
+                    set_step_cache(pipeline["pipeline_id"], name, {"input_hash": input_hash, "output": outputs[name]})
+                    entry["status"] = "succeeded"
+                break
+            except Exception as e:  # noqa: BLE001 - step failures are recorded on the run
+                # Input errors are deterministic: only retry unexpected (possibly transient) failures
+                if isinstance(e, StepError) or attempt > pipeline["retries"]:
+                    entry.update(status="failed", error=str(e))
+                    break
+                time.sleep(pipeline["retry_delay"] * 2 ** (attempt - 1))
+        entry["duration_s"] = round(time.monotonic() - t0, 4)
+
+    for wave in waves:
+        ready = [s for s in wave if all(by_step[d]["status"] in ("succeeded", "skipped") for d in pipeline["dag"][s])]
+        for s in set(wave) - set(ready):
+            by_step[s]["status"] = "cancelled"
+        if len(ready) > 1:
+            with ThreadPoolExecutor(max_workers=len(ready)) as pool:
+                list(pool.map(run_step, ready))
+        else:
+            for s in ready:
+                run_step(s)
+        record_pipeline_run(run)
+    failed = [s["step"] for s in run["steps"] if s["status"] in ("failed", "cancelled")]
+    run["status"] = "failed" if failed else "succeeded"
+    run["dataset_id"] = run["dataset_id"] or (outputs.get("ingest") or {}).get("dataset_id")
+    run["record_id"] = (outputs.get("compute") or {}).get("record_id")
+    run["finished_at"] = datetime.utcnow().isoformat() + "Z"
+    run["duration_s"] = round(time.monotonic() - started, 4)
+    record_pipeline_run(run)
+    return run
+
+
+def step_duration_stats(runs: list[dict]) -> list[dict]:
+    """Per-step count, mean, p50, p95 and max duration (seconds) over executed (not skipped) steps."""
+    import numpy as np
+    durations: dict[str, list[float]] = {}
+    for run in runs:
+        for s in run.get("steps", []):
+            if s["status"] in ("succeeded", "failed") and "duration_s" in s:
+                durations.setdefault(s["step"], []).append(s["duration_s"])
+    out = []
+    for step in STEPS:
+        values = np.array(durations.get(step, []))
+        if not len(values):
+            continue
+        out.append({
+            "step": step,
+            "count": int(len(values)),
+            "mean_s": round(float(values.mean()), 4),
+            "p50_s": round(float(np.percentile(values, 50)), 4),
+            "p95_s": round(float(np.percentile(values, 95)), 4),
+            "max_s": round(float(values.max()), 4),
+            "total_s": round(float(values.sum()), 4),
+        })
+    return sorted(out, key=lambda r: -r["total_s"])
+
+
+class Scheduler:
+    """Fires cron schedules and executes queued runs on a bounded pool, one run per pipeline at a time."""
+
+    def __init__(self, max_parallel: int = MAX_PARALLEL_RUNS, tick_seconds: float = TICK_SECONDS):
+        self.tick_seconds = tick_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="mm-pipeline")
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_fired: dict[str, str] = {}
+        self._last_compaction: str | None = None
+        self._active: set[str] = set()
+        self._deferred: list[dict] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="mm-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception:  # noqa: BLE001 - keep the scheduler alive
+                pass
+            self._stop.wait(self.tick_seconds)
+
+    def tick(self, now: datetime | None = None) -> list:
+        """
+        Queue due cron runs, then start queued runs whose pipeline is idle; returns the futures started.
+        Also compacts old metrics history once a day.
+        """
+        from store import compact_metrics, get_pipelines, queue_pipeline_run, take_pipeline_runs
+        from metrics_history import RETENTION_DAYS, retention_cutoff
+        now = now or datetime.now()
+        minute = now.strftime("%Y%m%d%H%M")
+        if RETENTION_DAYS > 0 and self._last_compaction != minute[:8]:
+            # Daily: summarize superseded metrics runs past the retention window
+            self._last_compaction = minute[:8]
+            compact_metrics(retention_cutoff())
+        for p in get_pipelines():
+            if p.get("schedule") and self._last_fired.get(p["pipeline_id"]) != minute and cron_matches(p["schedule"], now):
+                self._last_fired[p["pipeline_id"]] = minute
+                queue_pipeline_run(p["pipeline_id"], "schedule")
+        started = []
+        with self._lock:
+            pending, self._deferred = self._deferred + take_pipeline_runs(), []
+            for request in pending:
+                if request["pipeline_id"] in self._active:
+                    self._deferred.append(request)
+                    continue
+                self._active.add(request["pipeline_id"])
+                started.append(self._pool.submit(self._execute, request))
+        return started
+
+    def _execute(self, request: dict) -> dict:
+        try:
+            return execute_run(request)
+        finally:
+            with self._lock:
+                self._active.discard(request["pipeline_id"])
+
+
+_scheduler: Scheduler | None = None
+
+
+def start_scheduler() -> Scheduler | None:
+    """Start the scheduler in the store-owning process (disable with MM_SCHEDULER=0)."""
+    global _scheduler
+    if os.environ.get("MM_SCHEDULER", "1") == "0":
+        return None
+    if _scheduler is None:
+        _scheduler = Scheduler()
+        _scheduler.start()
+    return _scheduler
@@ -0,0 +1,214 @@
+"""
+Deterministic synthetic demo data: model registry, monitoring metrics per model / vintage /
+segment, decile and variable-stability breakdowns, and raw scored datasets.
+
+Every draw comes from a NumPy generator seeded by a stable hash of the names it describes (and
+MM_DEMO_SEED), so all processes, workers and restarts produce the same data, and a model's
+numbers do not change when the demo is scaled up. Scale: MM_DEMO_MODELS (default 6, the named
+sample models; more are generated across portfolios and model types), MM_DEMO_VINTAGES (monthly
+from 2024-01, default 5). Raw datasets (MM_DEMO_DATASET_ROWS rows for the latest vintage of the
+first MM_DEMO_DATASET_MODELS models) are only seeded when MM_DEMO_DATASET_ROWS is set.
+"""
+
+import os
+import zlib
+from typing import Optional
+
+import numpy as np
+
+DEMO_SEED = int(os.environ.get("MM_DEMO_SEED", "42"))
+DEMO_MODELS = int(os.environ.get("MM_DEMO_MODELS", "6"))
+DEMO_VINTAGES = int(os.environ.get("MM_DEMO_VINTAGES", "5"))
+DEMO_DATASET_ROWS = int(os.environ.get("MM_DEMO_DATASET_ROWS", "0"))
+DEMO_DATASET_MODELS = int(os.environ.get("MM_DEMO_DATASET_MODELS", "6"))
+FIRST_VINTAGE = "2024-01"
+
+SAMPLE_MODELS = [
+    ("ACQ-RET-001", "Retail", "Acquisition Scorecard"),
+    ("ECM-RET-001", "Retail", "ECM Scorecard"),
+    ("BUR-SME-001", "SME", "Bureau"),
+    ("COL-RET-001", "Retail", "Collections"),
+    ("FRD-001", "Retail", "Fraud"),
+    ("ML-RET-001", "Retail", "ML"),
+]
+TYPE_CODES = {
+    "Acquisition Scorecard": "ACQ",
+    "ECM Scorecard": "ECM",
+    "Bureau": "BUR",
+    "Collections": "COL",
+    "Fraud": "FRD",
+    "ML": "ML",
+}
+
+# Metric ranges (low, high) per model type; each model drifts within them across vintages
+_SCORECARD_RANGES = {
+    "KS": (0.2, 0.45),
+    "PSI": (0.05, 0.2),
+    "AUC": (0.65, 0.9),
+    "Gini": (0.3, 0.8),
+    "bad_rate": (0.05, 0.2),
+}
+METRIC_RANGES = {
+    "Acquisition Scorecard": _SCORECARD_RANGES,
+    "ECM Scorecard": _SCORECARD_RANGES,
+    "Bureau": _SCORECARD_RANGES,
+    "ML": _SCORECARD_RANGES,
+    "Collections": {
+        "roll_rate_30": (0.02, 0.1),
+        "flow_rate": (0.1, 0.3),
+        "recovery_rate": (0.15, 0.4),
+        "cure_rate": (0.2, 0.5),
+    },
+    "Fraud": {
+        "KS": (0.3, 0.5),
+        "PSI": (0.05, 0.15),
+        "AUC": (0.75, 0.95),
+        "AUC_PR": (0.1, 0.4),
+        "precision_at_5": (0.1, 0.3),
+        "alert_rate": (0.02, 0.07),
+        "fpr_at_threshold": (0.01, 0.04),
+        "bad_rate": (0.01, 0.06),
+    },
+}
+VOLUME_RANGE = (5000, 50000)
+SEGMENTS = {"Acquisition Scorecard": ["thin_file", "thick_file"]}
+
+# Variable-level stability: variable -> (lowest PSI, PSI spread)
+STABILITY_VARIABLES = [
+    ("Age", 0.03, 0.12),
+    ("Income", 0.02, 0.15),
+    ("Tenure", 0.04, 0.18),
+    ("Utilization", 0.05, 0.2),
+    ("DPD_30", 0.02, 0.1),
+]
+
+
+def rng(*parts) -> np.random.Generator:
+    """Generator seeded by a stable hash of parts: the same stream in every process and run."""
+    return np.random.default_rng([DEMO_SEED, zlib.crc32("\x1f".join(map(str, parts)).encode())])
+
+
+def vintages(n: int = DEMO_VINTAGES, first: str = FIRST_VINTAGE) -> list[str]:
+    """n consecutive monthly vintages (YYYY-MM) starting at first."""
+    start = _month_index(first)
+    return [f"{m // 12}-{m % 12 + 1:02d}" for m in range(start, start + max(n, 0))]
+
+
+def models(n: int, model_types: list[str], portfolios: list[str]) -> list[dict]:
+    """The sample models, then generated ones cycling through model types and portfolios."""
+    specs = SAMPLE_MODELS[:n]
+    for i in range(max(n - len(SAMPLE_MODELS), 0)):
+        model_type, portfolio = model_types[i % len(model_types)], portfolios[i // len(model_types) % len(portfolios)]
+        specs.append((f"{TYPE_CODES.get(model_type, 'MOD')}-{portfolio[:3].upper()}-{i + 2:04d}", portfolio, model_type))
+    return [
+        {"model_id": mid, "portfolio": port, "model_type": mtype, "name": f"{mtype} - {port}"}
+        for mid, port, mtype in specs
+    ]
+
+
+def metrics_records(model: dict, vintage_list: list[str]) -> list[dict]:
+    """
+    One metrics record per vintage (and segment) for a model, without record_id / computed_at.
+    Each metric starts at a model-specific level and drifts linearly across vintages with noise,
+    all drawn in one vectorized pass per model.
+    """
+    ranges = METRIC_RANGES.get(model["model_type"], {})
+    segments = SEGMENTS.get(model["model_type"], [None])
+    names = [*ranges, "volume"]
+    low, high = np.array([*ranges.values(), VOLUME_RANGE], dtype=float).T
+    g = rng("metrics", model["model_id"])
+    level = g.uniform(0.2, 0.8, (len(segments), 1, len(names)))
+    trend = g.normal(0.0, 0.15, (len(segments), 1, len(names)))
+    t = np.linspace(0.0, 1.0, len(vintage_list))[None, :, None] if len(vintage_list) > 1 else np.zeros((1, 1, 1))
+    u = np.clip(level + trend * t + g.normal(0.0, 0.08, (len(segments), len(vintage_list), len(names))), 0.0, 1.0)
+    values = np.round(low + (high - low) * u, 4).tolist()
+    out = []
+    for s, segment in enumerate(segments):
+        for v, vintage in enumerate(vintage_list):
+            *metrics, volume = values[s][v]
+            out.append({
+                "model_id": model["model_id"],
+                "portfolio": model["portfolio"],
+                "model_type": model["model_type"],
+                "vintage": vintage,
+                "segment": segment,
+                "volume": int(volume),
+                "metrics": dict(zip(names, metrics)),
+            })
+    return out
+
+
+def decile_metrics(model_id: str, vintage: str, segment: Optional[str] = None) -> list[dict]:
+    """Score deciles (1 = highest risk) with bad rates falling monotonically in expectation."""
+    g = rng("deciles", model_id, vintage, segment or "")
+    total = 5000 + int(g.random() * 15000)
+    base_bad_rate = 0.05 + g.random() * 0.15
+    deciles = np.arange(1, 11)
+    counts = np.maximum(100, total // 10 + (g.random(10) * 200).astype(int) - 100)
+    bad_rates = np.clip(base_bad_rate * (1.8 - 0.08 * deciles) + g.random(10) * 0.03, 0.01, 0.5)
+    bad_counts = (counts * bad_rates).astype(int)
+    return [
+        {"decile": int(d), "count": int(c), "bad_count": int(b), "bad_rate": round(float(r), 4)}
+        for d, c, b, r in zip(deciles, counts, bad_counts, bad_rates)
+    ]
+
+
+def variable_stability(model_id: str, vintage: str) -> list[dict]:
+    """PSI per model variable, with status green (< 0.1) | amber (< 0.2) | red."""
+    g = rng("stability", model_id, vintage)
+    lows, spreads = np.array([(low, spread) for _, low, spread in STABILITY_VARIABLES]).T
+    psi = lows + g.random(len(STABILITY_VARIABLES)) * spreads
+    return [
+        {"variable": name, "psi": round(float(p), 4), "status": "green" if p < 0.1 else "amber" if p < 0.2 else "red"}
+        for (name, _, _), p in zip(STABILITY_VARIABLES, psi)
+    ]
+
+
+def scored_dataset(
+    model_id: str,
+    vintage: str,
+    rows: int,
+    model_type: Optional[str] = None,
+    bad_rate: Optional[float] = None,
+) -> dict[str, np.ndarray]:
+    """
+    Raw scored dataset as column arrays: id, the STABILITY_VARIABLES features, target, score and
+    probability (Collections: also the prev_dpd / current_dpd / balance / recovered panel). Bads
+    have worse feature values and higher scores (separation set per model), and feature
+    distributions shift a little with every month after FIRST_VINTAGE.
+    """
+    model = rng("dataset", model_id)
+    default_bad_rate, separation = 0.05 + model.random() * 0.15, 0.8 + model.random() * 0.8
+    bad_rate = default_bad_rate if bad_rate is None else bad_rate
+    g = rng("dataset", model_id, vintage, rows)
+    drift = 0.01 * max(_month_index(vintage) - _month_index(FIRST_VINTAGE), 0)
+    target = (g.random(rows) < bad_rate).astype(np.int64)
+    utilization = np.clip(g.beta(2.0, 5.0, rows) + 0.15 * target + drift, 0.0, 1.0)
+    columns = {
+        "id": np.arange(rows, dtype=np.int64),
+        "Age": np.clip(np.round(g.normal(42.0 - 4.0 * target, 12.0)), 18, 90),
+        "Income": np.round(g.lognormal(10.5 - 0.2 * target - drift, 0.5), -2),
+        "Tenure": np.round(g.exponential(6.0 - 2.0 * target), 1),
+        "Utilization": np.round(utilization, 4),
+        "DPD_30": g.poisson(0.2 + 0.8 * target).astype(np.int64),
+        "target": target,
+    }
+    latent = separation * target + g.normal(0.0, 1.0, rows) + drift
+    probability = np.round(1.0 / (1.0 + np.exp(-(latent - 2.0))), 4)
+    columns["score"] = probability
+    columns["probability"] = probability
+    if model_type == "Collections":
+        # Bads roll one bucket forward; half of the goods cure
+        prev_dpd = g.choice(np.array([0, 30, 60, 90, 120]), rows, p=[0.6, 0.2, 0.1, 0.06, 0.04])
+        cured = (target == 0) & (g.random(rows) < 0.5)
+        balance = np.round(g.lognormal(8.0, 1.0, rows), 2)
+        columns["prev_dpd"] = prev_dpd
+        columns["current_dpd"] = np.where(target == 1, np.minimum(prev_dpd + 30, 180), np.where(cured, 0, prev_dpd))
+        columns["balance"] = balance
+        columns["recovered"] = np.where(prev_dpd >= 90, np.round(balance * g.beta(2.0, 5.0, rows), 2), 0.0)
+    return columns
+
+
+def _month_index(vintage: str) -> int:
+    year, month = vintage[:7].split("-")
+    return int(year) * 12 + int(month) - 1
@@ -0,0 +1,78 @@
+"""
+CPU-bound request handlers: ingestion, QC, scoring, compute-metrics and delta refreshes.
+
+The Flask routes call them directly; the ASGI serving mode (asgi.py) runs them on its process
+pool through run_handler, so parsing large uploads or computing metrics never blocks the event
+loop. Each takes and returns picklable values only: (payload, HTTP status).
+"""
+
+import json
+from typing import Optional
+
+from services.monitoring import StepError
+
+
+def ingest(args: dict, body: dict) -> tuple[dict, int]:
+    """Ingest body["data"]; portfolio / model_type / model_id / vintage from the body or the query."""
+    fields = {k: body.get(k) or args.get(k) for k in ("portfolio", "model_type", "model_id", "vintage")}
+    if not all(fields.values()):
+        return {"error": "portfolio, model_type, model_id, vintage required"}, 400
+    from services.ingestion import ingest as ingest_records
+    return ingest_records(body.get("data", []), **fields), 200
+
+
+def run_qc(dataset_id: str, body: dict) -> tuple[dict, int]:
+    from services.monitoring import run_dataset_qc
+    return _step(run_dataset_qc, dataset_id, required_columns=body.get("required_columns", []))
+
+
+def compute_metrics(body: dict) -> tuple[dict, int]:
+    from services.monitoring import compute_dataset_metrics
+    return _step(compute_dataset_metrics, body.get("dataset_id"), body)
+
+
+def score_dataset(dataset_id: str, body: Optional[dict] = None) -> tuple[dict, int]:
+    from services.monitoring import score_dataset as run_scoring
+    return _step(run_scoring, dataset_id)
+
+
+def append_rows(dataset_id: str, body: dict) -> tuple[dict, int]:
+    from services.monitoring import append_dataset_rows
+    return _step(append_dataset_rows, dataset_id, body.get("data"), refresh=body.get("refresh", True))
+
+
+def update_target(dataset_id: str, body: dict) -> tuple[dict, int]:
+    from services.monitoring import update_dataset_target
+    return _step(
+        update_dataset_target,
+        dataset_id,
+        body.get("updates"),
+        key_column=body.get("key_column") or "id",
+        refresh=body.get("refresh", True),
+    )
+
+
+HANDLERS = {
+    "ingest": ingest,
+    "qc": run_qc,
+    "compute_metrics": compute_metrics,
+    "score": score_dataset,
+    "append_rows": append_rows,
+    "update_target": update_target,
+}
+
+
+def run_handler(name: str, raw_body: bytes, *args) -> tuple[dict, int]:
+    """Pool entry point: parse a raw JSON request body here (not on the event loop) and run a handler."""
+    try:
+        body = json.loads(raw_body) if raw_body.strip() else {}
+    except ValueError:
+        return {"error": "invalid JSON body"}, 400
+    return HANDLERS[name](*args, body if isinstance(body, dict) else {})
+
+
+def _step(fn, *args, **kwargs) -> tuple[dict, int]:
+    try:
+        return fn(*args, **kwargs), 200
+    except StepError as e:
+        return {"error": str(e)}, e.status
@@ -1,9 +1,42 @@
 """
 In-memory store for prototype: model registry, datasets, and computed metrics.
+
+Stateful operations are marked @_shared. In a single process they run locally; when
+MM_STORE_ADDRESS is set (multi-worker deployments, see store_server.py) they are forwarded
+to the one store server process, so every worker sees the same data. Dataset arrays never
+travel over that socket: they live in dataset_cache's on-disk arena.
+
+Concurrency (threaded servers, and the store server's thread per client connection):
+- Writers lock one of MM_STORE_STRIPES stripes chosen by their dataset_id / model_id, so
+  writers on different keys proceed in parallel; per-key read-modify-write stays atomic.
+- Published entries (dataset entries, metrics records, alert states, vintage curves, the
+  overview view) are never mutated in place: writers build a new object and publish it
+  with one assignment (copy-on-write).
+- Readers take no lock. They look entries up by key, or copy a container in one call
+  (dict(...) / list(...)) before iterating it, so they see a key's state before or after a
+  write, never half of it.
+- Indexes shared by every key (content_index / blob_refs, the result memo, the overview
+  counters, alert state) have their own short lock, always taken after a stripe.
+- Cross-key maintenance (compaction, alert rules, pipeline queue) takes every stripe.
 """
 
+import atexit
+import contextlib
+import copy
+import functools
+import gc
+import inspect
+import itertools
+import os
+import threading
+import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Callable, Optional
+
+import dataset_cache
+from metrics_history import MetricsHistory
+from services import synthetic
 
 # Model types supported
 MODEL_TYPES = [
@@ -17,81 +50,140 @@ MODEL_TYPES = [
 
 # Seed portfolios and vintages
 PORTFOLIOS = ["Retail", "Corporate", "SME"]
-VINTAGES = ["2024-01", "2024-02", "2024-03", "2024-04", "2024-05"]
+VINTAGES = synthetic.vintages()
 
 # In-memory stores
 models_registry: list[dict] = []
-datasets_store: dict[str, dict] = {}  # dataset_id -> { metadata, qc_status, scored_data }
-metrics_store: list[dict] = []  # list of { model_id, portfolio, model_type, vintage, metrics, computed_at }
+datasets_store: dict[str, dict] = {}  # dataset_id -> { metadata, qc_status, columns, row_count, version, source_hash, metrics_options }
+blob_refs: dict[str, int] = {}  # dataset_cache blob key -> number of datasets whose current version it is
+content_index: dict[str, list[str]] = {}  # source_hash (content as ingested) -> dataset_ids, in ingestion order
+result_memo: "OrderedDict[str, Any]" = OrderedDict()  # content-derived key -> QC / scoring / metrics result, LRU
+MAX_MEMO_ENTRIES = 512
+metrics_store = MetricsHistory()  # every { record_id, model_id, portfolio, model_type, vintage, segment, metrics, computed_at, run } by key
+curve_store: dict[str, dict] = {}  # record_id -> { basis, curves: {(kind, n_points): curve} }
+vintage_store: dict[str, Any] = {}  # model_id -> metrics.vintage.VintageCurves (bad rate by MOB per origination vintage)
+explain_baselines: dict[str, list[dict]] = {}  # model_id -> baseline feature importance (ML explainability drift reference)
+pipelines_store: dict[str, dict] = {}  # pipeline_id -> monitoring pipeline definition (services.scheduler)
+pipeline_runs: dict[str, dict] = {}  # run_id -> run record with per-step status and durations, in start order
+pipeline_queue: list[dict] = []  # run requests waiting for the scheduler
+pipeline_taken: dict[str, dict] = {}  # run_id -> request handed to the scheduler, until its run is recorded
+step_cache: dict[tuple[str, str], dict] = {}  # (pipeline_id, step) -> { input_hash, output_hash, output } of the last success
+MAX_PIPELINE_RUNS = 10000
+report_jobs: dict[str, dict] = {}  # report_id -> report export job (services.reports), in creation order
+MAX_REPORT_JOBS = 200
+
+STORE_ADDRESS = os.environ.get("MM_STORE_ADDRESS")
+STORE_STRIPES = max(int(os.environ.get("MM_STORE_STRIPES", "64")), 1)
+_stripes = [threading.RLock() for _ in range(STORE_STRIPES)]
+_blob_lock = threading.Lock()  # content_index and blob_refs (shared by every dataset)
+_memo_lock = threading.Lock()  # result_memo (reads move entries in LRU order)
+_shared_ops: dict[str, Callable] = {}
+_remote = None  # proxy to the store server, connected on first use
+
+
+def _is_client() -> bool:
+    """True in worker processes that forward store operations to a store server."""
+    return bool(STORE_ADDRESS) and os.environ.get("MM_STORE_ROLE") != "server"
+
+
+def _remote_store():
+    global _remote
+    if _remote is None and _is_client():
+        from store_server import connect
+        _remote = connect(STORE_ADDRESS)
+    return _remote
+
+
+@contextlib.contextmanager
+def _all_stripes():
+    """Every stripe, acquired in index order (writers hold one stripe at a time, so no deadlock)."""
+    with contextlib.ExitStack() as stack:
+        for lock in _stripes:
+            stack.enter_context(lock)
+        yield
+
+
+def _locked(fn: Callable, by: Optional[str], lock: bool) -> Callable:
+    """fn wrapped in its locking policy (see _shared)."""
+    if not lock:
+        return fn
+    if by is None:
+        def run_exclusive(*args, **kwargs):
+            with _all_stripes():
+                return fn(*args, **kwargs)
+        return run_exclusive
+    position = list(inspect.signature(fn).parameters).index(by)
+
+    def run_striped(*args, **kwargs):
+        key = args[position] if position < len(args) else kwargs[by]
+        with _stripes[hash(key) % STORE_STRIPES]:
+            return fn(*args, **kwargs)
+    return run_striped
+
+
+def _shared(fn: Optional[Callable] = None, *, by: Optional[str] = None, lock: bool = True) -> Callable:
+    """
+    Mark a stateful store operation, run locally or on the store server. by="dataset_id" (or
+    another argument) runs it under that key's stripe; lock=False marks readers of published
+    entries and ops with their own lock, which never block; the default takes every stripe.
+    """
+    if fn is None:
+        return lambda f: _shared(f, by=by, lock=lock)
+    run = _shared_ops[fn.__name__] = _locked(fn, by, lock)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        remote = _remote_store()
+        if remote is not None:
+            return remote.call(fn.__name__, args, kwargs)
+        return run(*args, **kwargs)
+    return wrapper
+
+
+def run_shared_op(name: str, args: tuple, kwargs: dict) -> Any:
+    """Entry point used by the store server to execute a forwarded operation."""
+    return _shared_ops[name](*args, **kwargs)
+
+
+def _new_record_id() -> str:
+    return str(uuid.uuid4())[:8]
 
 
 def _seed_models():
-    """Seed model registry with sample models."""
-    names = [
-        ("ACQ-RET-001", "Retail", "Acquisition Scorecard"),
-        ("ECM-RET-001", "Retail", "ECM Scorecard"),
-        ("BUR-SME-001", "SME", "Bureau"),
-        ("COL-RET-001", "Retail", "Collections"),
-        ("FRD-001", "Retail", "Fraud"),
-        ("ML-RET-001", "Retail", "ML"),
-    ]
-    for i, (mid, port, mtype) in enumerate(names):
-        models_registry.append({
-            "model_id": mid,
-            "portfolio": port,
-            "model_type": mtype,
-            "name": f"{mtype} - {port}",
-        })
+    """Seed model registry with sample models (MM_DEMO_MODELS, see services.synthetic)."""
+    models_registry.extend(synthetic.models(synthetic.DEMO_MODELS, MODEL_TYPES, PORTFOLIOS))
 
 
 def _seed_metrics():
     """Seed metrics store with sample computed metrics for demo."""
-    import random
-    random.seed(42)
-    for m in models_registry:
-        # Acquisition Scorecard: two rows per vintage (thin_file, thick_file)
-        vintages = VINTAGES[:5]
-        segments_for_model = [("thin_file", "Thin file"), ("thick_file", "Thick file")] if m["model_type"] == "Acquisition Scorecard" else [(None, None)]
-        for v in vintages:
-            for seg_key, _ in segments_for_model:
-                base = {
-                    "model_id": m["model_id"],
-                    "portfolio": m["portfolio"],
-                    "model_type": m["model_type"],
-                    "vintage": v,
-                    "segment": seg_key,
-                    "computed_at": datetime.utcnow().isoformat() + "Z",
-                }
-                base["volume"] = int(5000 + random.random() * 45000)
-                if m["model_type"] in ("Acquisition Scorecard", "ECM Scorecard", "Bureau", "ML"):
-                    base["metrics"] = {
-                        "KS": round(0.2 + random.random() * 0.25, 4),
-                        "PSI": round(0.05 + random.random() * 0.15, 4),
-                        "AUC": round(0.65 + random.random() * 0.25, 4),
-                        "Gini": round(0.3 + random.random() * 0.5, 4),
-                        "bad_rate": round(0.05 + random.random() * 0.15, 4),
-                    }
-                elif m["model_type"] == "Collections":
-                    base["metrics"] = {
-                        "roll_rate_30": round(0.02 + random.random() * 0.08, 4),
-                        "flow_rate": round(0.1 + random.random() * 0.2, 4),
-                        "recovery_rate": round(0.15 + random.random() * 0.25, 4),
-                        "cure_rate": round(0.2 + random.random() * 0.3, 4),
-                    }
-                elif m["model_type"] == "Fraud":
-                    base["metrics"] = {
-                        "KS": round(0.3 + random.random() * 0.2, 4),
-                        "PSI": round(0.05 + random.random() * 0.1, 4),
-                        "AUC": round(0.75 + random.random() * 0.2, 4),
-                        "AUC_PR": round(0.1 + random.random() * 0.3, 4),
-                        "precision_at_5": round(0.1 + random.random() * 0.2, 4),
-                        "alert_rate": round(0.02 + random.random() * 0.05, 4),
-                        "fpr_at_threshold": round(0.01 + random.random() * 0.03, 4),
-                        "bad_rate": round(0.01 + random.random() * 0.05, 4),
-                    }
-                metrics_store.append(base)
+    computed_at = datetime.utcnow().isoformat() + "Z"
+    # Sequential record ids: random 8-character ids would collide among thousands of seeded records
+    seq = itertools.count(1)
+    records = [record for m in models_registry for record in synthetic.metrics_records(m, VINTAGES)]
+    for record in records:
+        record["record_id"] = f"{next(seq):08x}"
+        record["computed_at"] = computed_at
+    metrics_store.load(records)
+
+
+def _seed_datasets():
+    """Seed raw scored datasets for the latest vintage (only with MM_DEMO_DATASET_ROWS set)."""
+    if not synthetic.DEMO_DATASET_ROWS or not VINTAGES:
+        return
+    for m in models_registry[:synthetic.DEMO_DATASET_MODELS]:
+        columns = synthetic.scored_dataset(m["model_id"], VINTAGES[-1], synthetic.DEMO_DATASET_ROWS, m["model_type"])
+        metadata = {
+            "portfolio": m["portfolio"],
+            "model_type": m["model_type"],
+            "model_id": m["model_id"],
+            "vintage": VINTAGES[-1],
+            "ingestion_time": datetime.utcnow().isoformat() + "Z",
+            "row_count": synthetic.DEMO_DATASET_ROWS,
+        }
+        add_dataset(_new_record_id(), metadata, "passed", columns)
 
 
+@_shared(lock=False)
 def get_models(
     portfolio: Optional[str] = None,
     model_type: Optional[str] = None,
@@ -105,48 +197,402 @@ def get_models(
     return out
 
 
+@_shared(lock=False)
 def get_metrics(
     portfolio: Optional[str] = None,
     model_type: Optional[str] = None,
     vintage: Optional[str] = None,
     segment: Optional[str] = None,
 ) -> list[dict]:
-    """Get computed metrics with optional filters (segment: thin_file, thick_file, or None for all)."""
-    out = list(metrics_store)
+    """
+    Latest computed metrics per model / vintage / segment with optional filters (segment: thin_file,
+    thick_file, or None for all). Superseded runs are served by get_metrics_history.
+    """
+    out = list(metrics_store.latest_records(vintage))
     if portfolio:
         out = [m for m in out if m["portfolio"] == portfolio]
     if model_type:
         out = [m for m in out if m["model_type"] == model_type]
-    if vintage:
-        out = [m for m in out if m["vintage"] == vintage]
     if segment:
         out = [m for m in out if m.get("segment") == segment]
     return out
 
 
+@_shared(lock=False)
 def get_metric_detail(model_id: str, vintage: str, segment: Optional[str] = None) -> Optional[dict]:
-    """Get full metrics for a single model, vintage, and optional segment (for detail view)."""
-    for m in metrics_store:
-        if m["model_id"] != model_id or m["vintage"] != vintage:
-            continue
-        if segment is None or m.get("segment") == segment:
-            return m
+    """
+    Latest full metrics for a single model, vintage, and optional segment (for detail view); without
+    a segment, the unsegmented compute-metrics record if there is one. O(1) via the latest pointers.
+    """
+    return metrics_store.get(model_id, vintage, segment)
+
+
+@_shared(lock=False)
+def get_metrics_history(
+    model_id: Optional[str] = None,
+    vintage: Optional[str] = None,
+    vintage_from: Optional[str] = None,
+    vintage_to: Optional[str] = None,
+    segment: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    include_compacted: bool = False,
+) -> dict:
+    """
+    Audit history: every stored run (including superseded re-runs) with computed_at in
+    [since, until] for the matching model / vintage range / segment keys, newest first, paginated
+    by offset + limit. include_compacted adds the monthly summaries of compacted runs.
+    Returns { runs, more, compacted? }.
+    """
+    keys = [
+        k for k in metrics_store.keys(model_id, vintage)
+        if (not vintage_from or k[1] >= vintage_from) and (not vintage_to or k[1] <= vintage_to)
+        and (segment is None or k[2] == segment)
+    ]
+    runs, more = metrics_store.query(keys, since, until, offset, limit)
+    out = {"runs": runs, "more": more}
+    if include_compacted:
+        out["compacted"] = metrics_store.summaries(keys, since, until)
+    return out
+
+
+@_shared
+def compact_metrics(before: str, keep_runs: int = 1) -> dict:
+    """Summarize superseded runs computed before `before` (keeping keep_runs full runs per key) and drop their curves."""
+    removed = metrics_store.compact(before, keep_runs)
+    for record_id in removed:
+        curve_store.pop(record_id, None)
+    return {"compacted_runs": len(removed), "full_runs": len(metrics_store)}
+
+
+def add_dataset(dataset_id: str, metadata: dict, qc_status: str, scored_data: list[dict] | dict | None = None) -> dict:
+    """
+    Store a dataset after ingestion and optional QC/scoring.
+    scored_data: list of records or a dict of column arrays; kept as a content-addressed blob in dataset_cache.
+    Returns { dataset_id, deduplicated, shared_with, content_hash } (see _register_dataset).
+    """
+    if isinstance(scored_data, dict):
+        columns = scored_data
+    else:
+        columns = dataset_cache.records_to_columns(scored_data or [])
+    key = dataset_cache.content_hash(columns)
+    dataset_cache.put(key, columns)
+    row_count = len(next(iter(columns.values()))) if columns else 0
+    result = _register_dataset(dataset_id, metadata, qc_status, list(columns), row_count, key)
+    if result["version"] == key and not dataset_cache.exists(key):
+        # The blob was released by a concurrent update between put and register; publish it again
+        dataset_cache.put(key, columns)
+    elif result["version"] != key and _unreferenced(key):
+        # Deduplicated onto an already scored version: the ingested content itself is not needed
+        dataset_cache.drop(key)
+    return result
+
+
+@_shared(by="dataset_id")
+def _register_dataset(dataset_id: str, metadata: dict, qc_status: str, columns: list[str], row_count: int, key: str) -> dict:
+    """
+    Register ingested content. The same content re-submitted for the same model, vintage, model type
+    and portfolio returns the existing dataset (deduplicated). Content already ingested under other
+    metadata gets a new dataset that starts from the earlier one's QC status and (scored) version.
+    """
+    identity = tuple(metadata.get(k) for k in ("portfolio", "model_type", "model_id", "vintage"))
+    # Datasets sharing content are registered one at a time, across stripes
+    with _blob_lock:
+        siblings = [did for did in content_index.get(key, []) if did in datasets_store]
+        for did in siblings:
+            ds = datasets_store[did]
+            if tuple(ds["metadata"].get(k) for k in ("portfolio", "model_type", "model_id", "vintage")) == identity:
+                return {"dataset_id": did, "deduplicated": True, "shared_with": None, "content_hash": key, "version": ds["version"]}
+        entry = {
+            "metadata": metadata,
+            "qc_status": qc_status,
+            "columns": columns,
+            "row_count": row_count,
+            "version": key,
+            "source_hash": key,
+            "created_at": datetime.utcnow().isoformat() + "Z",
+        }
+        shared_with = siblings[-1] if siblings else None
+        if shared_with:
+            sibling = datasets_store[shared_with]
+            entry.update(qc_status=sibling["qc_status"], columns=sibling["columns"], row_count=sibling["row_count"], version=sibling["version"])
+        datasets_store[dataset_id] = entry
+        content_index.setdefault(key, []).append(dataset_id)
+        blob_refs[entry["version"]] = blob_refs.get(entry["version"], 0) + 1
+        return {"dataset_id": dataset_id, "deduplicated": False, "shared_with": shared_with, "content_hash": key, "version": entry["version"]}
+
+
+@_shared(lock=False)
+def get_dataset(dataset_id: str) -> Optional[dict]:
+    """Dataset entry (metadata, qc_status, columns, row_count, version) without its arrays."""
+    ds = datasets_store.get(dataset_id)
+    return dict(ds) if ds is not None else None
+
+
+@_shared(lock=False)
+def list_datasets() -> list[tuple[str, dict]]:
+    """All dataset entries as (dataset_id, entry) pairs, in ingestion order."""
+    return [(did, dict(ds)) for did, ds in dict(datasets_store).items()]
+
+
+@_shared(by="dataset_id")
+def set_qc_status(dataset_id: str, qc_status: str) -> bool:
+    ds = datasets_store.get(dataset_id)
+    if ds is None:
+        return False
+    datasets_store[dataset_id] = {**ds, "qc_status": qc_status}
+    return True
+
+
+@_shared(by="dataset_id")
+def _commit_dataset_version(
+    dataset_id: str,
+    columns: list[str],
+    row_count: int,
+    version: str,
+    expected: Optional[str] = None,
+    source: bool = False,
+) -> Optional[dict]:
+    """
+    Point a dataset at a new blob version; returns { previous, release, conflict } where release says
+    the superseded blob is no longer referenced by any dataset (None if the dataset does not exist).
+    With expected, nothing changes (conflict) unless the dataset is still at that version.
+    source=True marks the new version as the dataset's content as ingested (delta ingestion), so
+    re-uploads are deduplicated against it rather than against the superseded content.
+    """
+    ds = datasets_store.get(dataset_id)
+    if ds is None:
+        return None
+    previous = ds["version"]
+    if expected is not None and previous != expected:
+        return {"previous": previous, "release": False, "conflict": True}
+    updated = dict(ds)
+    with _blob_lock:
+        if source and ds["source_hash"] != version:
+            siblings = content_index.get(ds["source_hash"], [])
+            if dataset_id in siblings:
+                siblings.remove(dataset_id)
+            content_index.setdefault(version, []).append(dataset_id)
+            updated["source_hash"] = version
+        release = False
+        if previous != version:
+            updated.update(columns=columns, row_count=row_count, version=version)
+            blob_refs[version] = blob_refs.get(version, 0) + 1
+            blob_refs[previous] = blob_refs.get(previous, 1) - 1
+            release = blob_refs[previous] <= 0
+            if release:
+                del blob_refs[previous]
+        datasets_store[dataset_id] = updated
+    return {"previous": previous, "release": release, "conflict": False}
+
+
+@_shared(lock=False)
+def _unreferenced(key: str) -> bool:
+    return blob_refs.get(key, 0) <= 0
+
+
+def get_dataset_columns(dataset_id: str) -> Optional[dict]:
+    """Column arrays for a dataset (memory-mapped when shared across workers), or None."""
+    for _ in range(3):
+        ds = get_dataset(dataset_id)
+        if ds is None:
+            return None
+        columns = dataset_cache.get(ds["version"], ds["columns"])
+        if columns is not None:
+            return columns
+        # Version was superseded between the two reads; look it up again
     return None
 
 
-def add_dataset(dataset_id: str, metadata: dict, qc_status: str, scored_data: Optional[dict] = None):
-    """Store a dataset after ingestion and optional QC/scoring."""
-    datasets_store[dataset_id] = {
-        "metadata": metadata,
-        "qc_status": qc_status,
-        "scored_data": scored_data,
-        "created_at": datetime.utcnow().isoformat() + "Z",
-    }
+def update_dataset_columns(
+    dataset_id: str, columns: dict, expected: Optional[str] = None, source: bool = False
+) -> Optional[str]:
+    """
+    Replace a dataset's columns (e.g. after scoring) as a new content-addressed version visible to
+    all workers; returns the version (blob key), or None if the dataset does not exist or (with
+    expected, see _commit_dataset_version) was changed concurrently.
+    """
+    key = dataset_cache.content_hash(columns)
+    dataset_cache.put(key, columns)
+    row_count = len(next(iter(columns.values()))) if columns else 0
+    committed = _commit_dataset_version(dataset_id, list(columns), row_count, key, expected, source)
+    if committed is None or committed["conflict"]:
+        if _unreferenced(key):
+            dataset_cache.drop(key)
+        return None
+    if committed["release"]:
+        dataset_cache.drop(committed["previous"])
+    return key
+
+
+def set_dataset_version(dataset_id: str, version: str, columns: list[str], row_count: int) -> bool:
+    """Point a dataset at an already stored blob (e.g. a memoized scoring result)."""
+    if not dataset_cache.exists(version):
+        return False
+    committed = _commit_dataset_version(dataset_id, columns, row_count, version)
+    if committed and committed["release"]:
+        dataset_cache.drop(committed["previous"])
+    return committed is not None
+
+
+@_shared(by="dataset_id")
+def set_metrics_options(dataset_id: str, model_type: str, options: dict) -> bool:
+    """Remember the model type and options of a dataset's last compute-metrics (for delta refreshes)."""
+    ds = datasets_store.get(dataset_id)
+    if ds is None:
+        return False
+    datasets_store[dataset_id] = {**ds, "metrics_options": {"model_type": model_type, "options": options}}
+    return True
+
+
+@_shared(lock=False)
+def get_memo(key: str) -> Any:
+    """Memoized result for a content-derived key (see services.monitoring), or None."""
+    with _memo_lock:
+        if key in result_memo:
+            result_memo.move_to_end(key)
+            return result_memo[key]
+    return None
+
+
+@_shared(lock=False)
+def set_memo(key: str, value: Any) -> None:
+    with _memo_lock:
+        result_memo[key] = value
+        result_memo.move_to_end(key)
+        while len(result_memo) > MAX_MEMO_ENTRIES:
+            result_memo.popitem(last=False)
+
+
+def save_metrics(record: dict, curve_basis: Optional[dict] = None):
+    """
+    Add a computed metrics record as the latest run of its model / vintage / segment (the record
+    gets its run number and the record_id it supersedes); optionally keep its curve basis for the
+    curves API.
+    """
+    record.setdefault("record_id", _new_record_id())
+    record.update(_append_metrics(record["model_id"], record, curve_basis))
+
+
+@_shared(by="model_id")
+def _append_metrics(model_id: str, record: dict, curve_basis: Optional[dict]) -> dict:
+    from services.alerts import engine
+    from services.overview import overview
+    from metrics_history import record_key
+    info, compacted = metrics_store.add(record)
+    for record_id in compacted:
+        curve_store.pop(record_id, None)
+    overview.observe(metrics_store.latest[record_key(record)], engine.rules)
+    if curve_basis is not None:
+        curve_store[record["record_id"]] = {"basis": curve_basis, "curves": {}}
+    # Incremental RAG check; delivery happens on the alert dispatcher thread
+    engine.observe(record)
+    return info
+
+
+@_shared(lock=False)
+def get_alerts(model_id: Optional[str] = None, status: Optional[str] = None) -> list[dict]:
+    """Raised alerts (status changes), newest first."""
+    from services.alerts import engine
+    return [
+        a for a in reversed(list(engine.history))
+        if (model_id is None or a["model_id"] == model_id) and (status is None or a["status"] == status)
+    ]
+
+
+@_shared(lock=False)
+def get_alert_state() -> dict:
+    """Current RAG status per model/segment, counts by status and engine counters."""
+    from services.alerts import engine
+    models = [
+        {"model_id": model_id, "segment": segment or None, **state}
+        for (model_id, segment), state in dict(engine.state).items()
+    ]
+    counts = {s: sum(1 for m in models if m["status"] == s) for s in ("green", "amber", "red")}
+    return {"counts": counts, "models": models, "stats": dict(engine.stats), "sinks": [s.name for s in engine.sinks]}
+
+
+@_shared(lock=False)
+def get_alert_rules() -> dict:
+    from services.alerts import engine
+    return engine.rules
+
+
+@_shared
+def set_alert_rules(rules: dict) -> dict:
+    """
+    Replace the rules of the given model types (validated). Stored records are re-evaluated under
+    the new rules, without raising alerts, so RAG state and the overview agree with them; records
+    saved from now on alert against the new state.
+    """
+    from services.alerts import engine, validate_rules
+    from services.overview import overview
+    engine.rules = {**engine.rules, **validate_rules(rules)}
+    latest = metrics_store.latest_records()
+    engine.prime(latest)
+    overview.rebuild(latest, engine.rules)
+    return engine.rules
+
+
+@_shared(lock=False)
+def get_portfolio_overview(
+    portfolio: Optional[str] = None,
+    model_type: Optional[str] = None,
+    vintage: Optional[str] = None,
+    segment: Optional[str] = None,
+    worst_n: int = 5,
+) -> dict:
+    """RAG counts, status matrices, worst models and volumes from the counters kept on write (services.overview)."""
+    from services.overview import overview
+    return overview.summary(portfolio, model_type, vintage, segment, worst_n)
 
 
-def save_metrics(record: dict):
-    """Append a computed metrics record."""
-    metrics_store.append(record)
+@_shared(lock=False)
+def get_overview_models(
+    portfolio: Optional[str] = None,
+    model_type: Optional[str] = None,
+    vintage: Optional[str] = None,
+    segment: Optional[str] = None,
+    status: Optional[str] = None,
+    offset: int = 0,
+    limit: int = 100,
+) -> dict:
+    """A page of per-model rows (model cards) for the overview filter. Returns { models, next_offset }."""
+    from services.overview import overview
+    rows, next_offset = overview.models(portfolio, model_type, vintage, segment, status, offset, limit)
+    return {"models": rows, "next_offset": next_offset}
+
+
+@_shared(by="model_id")
+def explain_baseline(model_id: str, importance: list[dict], replace: bool = False) -> list[dict]:
+    """
+    Baseline feature importance for a model's importance drift. The first importance seen for
+    a model becomes its baseline; replace=True re-baselines it.
+    """
+    if replace or model_id not in explain_baselines:
+        explain_baselines[model_id] = importance
+    return explain_baselines[model_id]
+
+
+@_shared(lock=False)
+def get_curve(record_id: str, kind: str, n_points: int) -> Optional[dict]:
+    """
+    KS/ROC/PR/lift/gain curve for a metrics record, downsampled to n_points.
+    Computed from the stored curve basis on first request and cached per record.
+    Returns None when the record has no curve basis (e.g. seeded demo metrics).
+    """
+    entry = curve_store.get(record_id)
+    if entry is None:
+        return None
+    key = (kind, n_points)
+    curve = entry["curves"].get(key)
+    if curve is None:
+        # Computed without a lock: concurrent requests for the same curve store equal results
+        from metrics.curves import compute_curve
+        curve = entry["curves"][key] = compute_curve(entry["basis"], kind, n_points)
+    return curve
 
 
 def get_filter_options() -> dict:
@@ -159,12 +605,13 @@ def get_filter_options() -> dict:
     }
 
 
+@_shared(lock=False)
 def get_metrics_trends(model_id: str, segment: Optional[str] = None) -> dict | None:
     """
-    Get KS, PSI, volume, and bad_rate trend data for a model across vintages.
+    Get KS, PSI, volume, bad_rate and score drift trend data for a model across vintages.
     For ACQ with segment, filter to that segment; else one row per vintage (first segment).
     """
-    rows = [r for r in metrics_store if r["model_id"] == model_id]
+    rows = [metrics_store.latest[k] for k in metrics_store.keys(model_id)]
     if segment:
         rows = [r for r in rows if r.get("segment") == segment]
     if not rows:
@@ -180,6 +627,13 @@ def get_metrics_trends(model_id: str, segment: Optional[str] = None) -> dict | N
     psi = [r.get("metrics", {}).get("PSI") for r in rows]
     volume = [r.get("volume", 0) for r in rows]
     bad_rate = [r.get("metrics", {}).get("bad_rate") for r in rows]
+    # Score drift against the baseline (None for vintages computed without baseline scores)
+    drift = [r.get("drift") or {} for r in rows]
+    # Maturity-adjusted bad rate per vintage, when cohort performance has been loaded
+    adjusted = {}
+    curves = vintage_store.get(model_id)
+    if curves is not None:
+        adjusted = {a["vintage"]: a["maturity_adjusted_bad_rate"] for a in curves.maturity_adjusted()}
     return {
         "model_id": model_id,
         "model_type": m.get("model_type", ""),
@@ -189,44 +643,184 @@ def get_metrics_trends(model_id: str, segment: Optional[str] = None) -> dict | N
         "psi": [float(x) if x is not None else None for x in psi],
         "volume": [int(x) for x in volume],
         "bad_rate": [float(x) if x is not None else None for x in bad_rate],
+        "maturity_adjusted_bad_rate": [adjusted.get(v) for v in vintages],
+        "drift": {name: [d.get(name) for d in drift] for name in ("psi", "ks_statistic", "wasserstein", "js_divergence")},
     }
 
 
+@_shared(by="model_id")
+def apply_vintage_increment(model_id: str, increment: dict, replace: bool = False) -> dict:
+    """Fold a metrics.vintage.aggregate_increment result into the model's cohort accumulators."""
+    from metrics.vintage import VintageCurves
+    # Applied to a copy and published, so readers never see a half-applied increment
+    curves = copy.deepcopy(vintage_store[model_id]) if model_id in vintage_store else VintageCurves()
+    touched = curves.apply(increment, replace=replace)
+    vintage_store[model_id] = curves
+    return {"model_id": model_id, "cells_updated": touched, "vintages": list(curves.vintages)}
+
+
+@_shared(lock=False)
+def get_vintage_curves(model_id: str, target_mob: int = 12, balance_weighted: bool = False) -> dict | None:
+    """Bad-rate-by-MOB curves and maturity-adjusted bad rates for a model, or None without cohort data."""
+    curves = vintage_store.get(model_id)
+    if curves is None:
+        return None
+    return {
+        "model_id": model_id,
+        "balance_weighted": balance_weighted,
+        **curves.curves(balance_weighted=balance_weighted),
+        "development_factors": [round(float(f), 4) for f in curves.development_factors(balance_weighted)],
+        "maturity_adjusted": curves.maturity_adjusted(target_mob, balance_weighted=balance_weighted),
+    }
+
+
+@_shared
+def save_pipeline(pipeline: dict) -> dict:
+    """Create or replace a monitoring pipeline definition."""
+    pipelines_store[pipeline["pipeline_id"]] = pipeline
+    return pipeline
+
+
+@_shared(lock=False)
+def get_pipelines(model_id: Optional[str] = None) -> list[dict]:
+    return [p for p in list(pipelines_store.values()) if model_id is None or p["model_id"] == model_id]
+
+
+@_shared
+def delete_pipeline(pipeline_id: str) -> bool:
+    for key in [k for k in step_cache if k[0] == pipeline_id]:
+        del step_cache[key]
+    return pipelines_store.pop(pipeline_id, None) is not None
+
+
+@_shared
+def queue_pipeline_run(pipeline_id: str, trigger: str, dataset_id: Optional[str] = None, force: bool = False) -> Optional[dict]:
+    """Queue a run request for the scheduler; None if the pipeline does not exist."""
+    if pipeline_id not in pipelines_store:
+        return None
+    request = {
+        "run_id": _new_record_id(),
+        "pipeline_id": pipeline_id,
+        "trigger": trigger,
+        "dataset_id": dataset_id,
+        "force": force,
+        "queued_at": datetime.utcnow().isoformat() + "Z",
+    }
+    pipeline_queue.append(request)
+    return request
+
+
+@_shared
+def take_pipeline_runs() -> list[dict]:
+    """Hand every queued run request to the scheduler (each is taken once)."""
+    taken = list(pipeline_queue)
+    pipeline_taken.update((r["run_id"], r) for r in taken)  # before clearing: get_pipeline_run never misses them
+    pipeline_queue.clear()
+    return taken
+
+
+@_shared
+def record_pipeline_run(run: dict) -> None:
+    """Insert or update a run record; the oldest runs are dropped beyond MAX_PIPELINE_RUNS."""
+    # A copy: the scheduler keeps updating its own run dict while readers list the stored one
+    pipeline_runs[run["run_id"]] = copy.deepcopy(run)
+    pipeline_taken.pop(run["run_id"], None)
+    while len(pipeline_runs) > MAX_PIPELINE_RUNS:
+        del pipeline_runs[next(iter(pipeline_runs))]
+
+
+@_shared(lock=False)
+def get_pipeline_runs(
+    pipeline_id: Optional[str] = None,
+    model_id: Optional[str] = None,
+    status: Optional[str] = None,
+) -> list[dict]:
+    """Run history, newest first."""
+    out = []
+    for run in reversed(list(pipeline_runs.values())):
+        if pipeline_id and run["pipeline_id"] != pipeline_id:
+            continue
+        if model_id and run["model_id"] != model_id:
+            continue
+        if status and run["status"] != status:
+            continue
+        out.append(run)
+    return out
+
+
+@_shared(lock=False)
+def get_pipeline_run(run_id: str) -> Optional[dict]:
+    """A run record, or its queued request (status "queued") until the scheduler starts it; None if unknown."""
+    # Checked in the order a run moves through them (queue -> taken -> runs), so none is missed
+    request = next((r for r in list(pipeline_queue) if r["run_id"] == run_id), None) or pipeline_taken.get(run_id)
+    if request is not None:
+        return {**request, "status": "queued"}
+    return pipeline_runs.get(run_id)
+
+
+@_shared
+def record_report_job(job: dict) -> None:
+    """Insert or update a report export job; the oldest jobs are dropped beyond MAX_REPORT_JOBS."""
+    report_jobs[job["report_id"]] = copy.deepcopy(job)
+    while len(report_jobs) > MAX_REPORT_JOBS:
+        del report_jobs[next(iter(report_jobs))]
+
+
+@_shared(lock=False)
+def get_report_jobs() -> list[dict]:
+    """Report export jobs, newest first."""
+    return list(reversed(list(report_jobs.values())))
+
+
+@_shared(lock=False)
+def get_report_job(report_id: str) -> Optional[dict]:
+    return report_jobs.get(report_id)
+
+
+@_shared(lock=False)
+def get_step_cache(pipeline_id: str, step: str) -> Optional[dict]:
+    return step_cache.get((pipeline_id, step))
+
+
+@_shared(by="pipeline_id")
+def set_step_cache(pipeline_id: str, step: str, entry: dict) -> None:
+    step_cache[(pipeline_id, step)] = entry
+
+
 # Segment names for Acquisition Scorecard (thin file = limited credit history, thick file = established)
-ACQ_SEGMENTS = ["thin_file", "thick_file"]
+SEGMENT_LABELS = {"thin_file": "Thin file", "thick_file": "Thick file"}
 
 
+@_shared(lock=False)
 def get_segment_metrics(model_id: str, vintage: str) -> dict | None:
     """
-    Segment-level metrics for Acquisition Scorecard: thin file vs thick file.
-    Returns { model_id, vintage, model_type, segments: [ { segment, label, metrics, volume } ] } or None.
+    Stored segment-level metrics for a model and vintage: the group-by breakdown saved with the
+    latest computed record (compute-metrics segment_columns), else one row per stored
+    per-segment record (e.g. the thin_file / thick_file Acquisition Scorecard rows).
+    Returns { model_id, vintage, model_type, dimensions, segments: [ { segment, label, metrics, volume } ] } or None.
     """
-    detail = get_metric_detail(model_id, vintage)
-    if not detail or detail.get("model_type") != "Acquisition Scorecard":
+    rows = [metrics_store.latest[k] for k in metrics_store.keys(model_id, vintage)]
+    breakdowns = [m for m in rows if m.get("segments")]
+    if breakdowns:
+        dimensions, segments_out = breakdowns[-1]["segment_columns"], breakdowns[-1]["segments"]
+    else:
+        dimensions = ["segment"]
+        segments_out = [
+            {
+                "segment": m["segment"],
+                "label": SEGMENT_LABELS.get(m["segment"], m["segment"]),
+                "metrics": m.get("metrics", {}),
+                "volume": m.get("volume"),
+            }
+            for m in rows if m.get("segment")
+        ]
+    if not segments_out:
         return None
-    import random
-    random.seed(hash((model_id, vintage)) % (2**32))
-    segments_out = []
-    labels = {"thin_file": "Thin file", "thick_file": "Thick file"}
-    for seg in ACQ_SEGMENTS:
-        metrics = {
-            "KS": round(0.2 + random.random() * 0.28, 4),
-            "PSI": round(0.05 + random.random() * 0.12, 4),
-            "AUC": round(0.65 + random.random() * 0.28, 4),
-            "Gini": round(0.3 + random.random() * 0.5, 4),
-            "bad_rate": round(0.05 + random.random() * 0.18, 4),
-        }
-        volume = int(2000 + random.random() * 15000)
-        segments_out.append({
-            "segment": seg,
-            "label": labels.get(seg, seg),
-            "metrics": metrics,
-            "volume": volume,
-        })
     return {
         "model_id": model_id,
         "vintage": vintage,
-        "model_type": "Acquisition Scorecard",
+        "model_type": rows[0]["model_type"],
+        "dimensions": dimensions,
         "segments": segments_out,
     }
 
@@ -235,56 +829,37 @@ def get_decile_metrics(model_id: str, vintage: str, segment: Optional[str] = Non
     """
     Decile-level metrics for a model/vintage (score decile 1 = highest risk, 10 = lowest).
     Returns list of { decile, count, bad_count, bad_rate }.
-    Prototype: deterministic mock from model_id/vintage.
+    Prototype: deterministic mock from model_id/vintage (services.synthetic).
     """
-    import random
-    random.seed(hash((model_id, vintage, segment or "")) % (2**32))
-    out = []
-    total = 5000 + int(random.random() * 15000)
-    # Decile 1 has highest bad rate, decile 10 lowest (monotonic)
-    base_bad_rate = 0.05 + random.random() * 0.15
-    for d in range(1, 11):
-        count = total // 10 + (int(random.random() * 200) - 100)
-        count = max(100, count)
-        # Bad rate decreases from decile 1 to 10
-        bad_rate = base_bad_rate * (1.8 - 0.08 * d) + random.random() * 0.03
-        bad_rate = max(0.01, min(0.5, bad_rate))
-        bad_count = int(count * bad_rate)
-        out.append({
-            "decile": d,
-            "count": count,
-            "bad_count": bad_count,
-            "bad_rate": round(bad_rate, 4),
-        })
-    return out
+    return synthetic.decile_metrics(model_id, vintage, segment)
 
 
 def get_variable_stability(model_id: str, vintage: str) -> list[dict]:
     """
-    Variable-level stability (e.g. PSI per variable). Prototype: mock data.
+    Variable-level stability (e.g. PSI per variable). Prototype: deterministic mock data.
     Returns list of { variable, psi, status } where status is green|amber|red.
     """
-    import random
-    random.seed(hash((model_id, vintage)) % (2**32))
-    vars_and_psi = [
-        ("Age", 0.03 + random.random() * 0.12),
-        ("Income", 0.02 + random.random() * 0.15),
-        ("Tenure", 0.04 + random.random() * 0.18),
-        ("Utilization", 0.05 + random.random() * 0.2),
-        ("DPD_30", 0.02 + random.random() * 0.1),
-    ]
-    out = []
-    for var, psi in vars_and_psi:
-        if psi < 0.1:
-            status = "green"
-        elif psi < 0.2:
-            status = "amber"
-        else:
-            status = "red"
-        out.append({"variable": var, "psi": round(psi, 4), "status": status})
-    return out
-
-
-# Initialize seed data on import
-_seed_models()
-_seed_metrics()
+    return synthetic.variable_stability(model_id, vintage)
+
+
+# Initialize seed data on import (the store server seeds once for all workers).
+# The store owner also owns the dataset arena: start it empty, and remove it on exit
+# unless it is shared with workers that may outlive this process.
+if not _is_client():
+    dataset_cache.clear_arena()
+    if not STORE_ADDRESS:
+        atexit.register(dataset_cache.clear_arena)
+    # The seed is hundreds of thousands of long-lived dicts: collecting while they are built only
+    # re-traverses them, so collect once afterwards and freeze what survives out of later collections
+    gc.disable()
+    try:
+        _seed_models()
+        _seed_metrics()
+        _seed_datasets()
+        from services.alerts import engine as _alert_engine
+        _alert_engine.prime(metrics_store.latest_records())
+        from services.overview import overview as _overview
+        _overview.rebuild(metrics_store.latest_records(), _alert_engine.rules)
+    finally:
+        gc.enable()
+    gc.freeze()
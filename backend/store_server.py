@@ -0,0 +1,106 @@
+"""
+Shared store server for multi-worker deployments (e.g. gunicorn -w 4).
+
+One local process owns the store; workers started with MM_STORE_ADDRESS forward every
+stateful store operation to it (see store._shared), so a dataset ingested through one
+worker can be QC'd, scored and computed through any other. Dataset arrays are not sent
+over the socket: they are written to the memory-mapped arena in dataset_cache.
+
+Run standalone:  python backend/store_server.py   (address from MM_STORE_ADDRESS)
+or let gunicorn.conf.py start it in the gunicorn master.
+"""
+
+import atexit
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing.managers import BaseManager
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+
+def default_address() -> str:
+    return str(Path(tempfile.gettempdir()) / "model_monitoring_store.sock")
+
+
+def _parse_address(address: str):
+    """'host:port' -> (host, port) for TCP; anything else is a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and not address.startswith("/"):
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+def _authkey() -> bytes:
+    return os.environ.get("MM_STORE_AUTHKEY", "model-monitoring").encode()
+
+
+class StoreManager(BaseManager):
+    pass
+
+
+class StoreService:
+    """Executes forwarded store operations; each client connection gets its own server thread."""
+
+    def call(self, name: str, args: tuple, kwargs: dict):
+        import store
+        return store.run_shared_op(name, args, kwargs)
+
+
+def serve(address: str | None = None) -> None:
+    """Own the store in this process and serve it until killed."""
+    address = address or os.environ.get("MM_STORE_ADDRESS") or default_address()
+    os.environ["MM_STORE_ADDRESS"] = address
+    os.environ["MM_STORE_ROLE"] = "server"
+    import store  # noqa: F401  (seeds demo data once, here)
+    import dataset_cache
+
+    # The server owns the shared dataset arena; remove it when the deployment stops
+    atexit.register(dataset_cache.clear_arena)
+    # Pipelines run next to the store they read and write
+    from services.scheduler import start_scheduler
+    start_scheduler()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    target = _parse_address(address)
+    if isinstance(target, str) and os.path.exists(target):
+        os.unlink(target)  # stale socket from a previous run
+    service = StoreService()
+    StoreManager.register("store", callable=lambda: service)
+    manager = StoreManager(address=target, authkey=_authkey())
+    manager.get_server().serve_forever()
+
+
+def start_in_background(address: str | None = None) -> subprocess.Popen:
+    """
+    Start the server as a separate interpreter. A plain subprocess (not multiprocessing)
+    keeps forked gunicorn workers from inheriting it as a child they must join at exit.
+    """
+    env = dict(os.environ, MM_STORE_ADDRESS=address or os.environ.get("MM_STORE_ADDRESS") or default_address())
+    return subprocess.Popen([sys.executable, str(Path(__file__).resolve())], env=env)
+
+
+def connect(address: str | None = None, timeout: float = 10.0):
+    """Connect to a running store server (waiting up to timeout for it to come up); returns a proxy."""
+    StoreManager.register("store")
+    manager = StoreManager(address=_parse_address(address or default_address()), authkey=_authkey())
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            manager.connect()
+            break
+        except (ConnectionRefusedError, FileNotFoundError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+    return manager.store()
+
+
+if __name__ == "__main__":
+    serve()
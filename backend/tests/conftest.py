@@ -0,0 +1,8 @@
+"""Tests import backend modules the way app.py does: with backend/ on sys.path."""
+
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
@@ -0,0 +1,24 @@
+"""
+Changing the alert rules re-evaluates the stored records: the RAG state follows the new
+thresholds straight away, without raising alerts for the re-evaluation.
+"""
+
+import os
+
+os.environ.pop("MM_STORE_ADDRESS", None)  # in-process store
+
+
+def test_rule_change_reprimes_state_without_alerts():
+    import store
+    original = store.get_alert_rules()["Fraud"]
+    fraud = {r["model_id"] for r in store.get_metrics() if r["model_type"] == "Fraud"}
+    assert fraud
+    alerts = len(store.get_alerts())
+    try:
+        # KS can never reach 2: every Fraud model is red under these rules
+        store.set_alert_rules({"Fraud": [{"metric": "KS", "direction": "min", "amber": 2.0, "red": 1.5}]})
+        state = [m for m in store.get_alert_state()["models"] if m["model_id"] in fraud]
+        assert state and all(m["status"] == "red" for m in state)
+        assert len(store.get_alerts()) == alerts
+    finally:
+        store.set_alert_rules({"Fraud": original})
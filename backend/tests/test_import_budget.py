@@ -0,0 +1,38 @@
+"""
+Metric workers import the core metric modules on their first computation: they must not pull in
+plotting / training / dataframe packages, and must load within a fixed time budget.
+"""
+
+import json
+import subprocess
+import sys
+
+from conftest import BACKEND_DIR
+
+# Seconds for a cold import in a fresh interpreter (NumPy dominates; sklearn + pandas +
+# matplotlib would take several times this)
+IMPORT_BUDGET_S = 1.0
+HEAVY_MODULES = ("matplotlib", "sklearn", "pandas")
+
+_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import metrics.scorecard_metrics, metrics.fraud_metrics
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def _probe() -> dict:
+    out = subprocess.run([sys.executable, "-c", _PROBE], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_core_metrics_import_no_heavy_modules():
+    assert _probe()["loaded"] == []
+
+
+def test_core_metrics_import_within_budget():
+    # Best of three, so one slow start (cold disk cache) does not fail the test
+    elapsed = min(_probe()["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_S, f"core metrics import took {elapsed:.2f}s (budget {IMPORT_BUDGET_S}s)"
@@ -0,0 +1,40 @@
+"""
+The row path (_binary_metrics, small datasets) and the histogram path (_histogram_metrics: the
+parallel, out-of-core and refresh paths) must give the same metrics, including on tied scores.
+"""
+
+import numpy as np
+import pytest
+
+from metrics.streaming import ScoreHistogram
+from services.monitoring import _binary_metrics, _histogram_metrics
+
+
+def _tied_scores(n: int = 20_000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n) < 0.2).astype(np.int64)
+    # Scores rounded to 2 decimals: about 100 distinct values, so every cut-off falls inside a tie
+    score = np.round(np.clip(rng.normal(0.4 + 0.15 * y, 0.15), 0, 1), 2)
+    baseline = np.round(np.clip(rng.normal(0.42, 0.15, n // 2), 0, 1), 2)
+    return y, score, baseline, rng.uniform(0.5, 2.0, n)
+
+
+@pytest.mark.parametrize("model_type", ["Acquisition Scorecard", "Fraud"])
+@pytest.mark.parametrize("weighted", [False, True])
+def test_row_and_histogram_paths_agree_on_tied_scores(model_type, weighted):
+    y, score, baseline, w = _tied_scores()
+    weights = w if weighted else None
+    rows = _binary_metrics(model_type, y, score, baseline, weights, None)
+    hist = _histogram_metrics(ScoreHistogram().add(y, score, weights), model_type, baseline, None)
+    assert rows.keys() == hist.keys()
+    for name, value in rows.items():
+        assert hist[name] == pytest.approx(value, abs=1e-9), name
+
+
+def test_top_k_metrics_do_not_depend_on_tie_order():
+    y, score, baseline, _ = _tied_scores()
+    order = np.random.default_rng(1).permutation(len(y))
+    first = _binary_metrics("Fraud", y, score, baseline, None, None)
+    shuffled = _binary_metrics("Fraud", y[order], score[order], baseline, None, None)
+    for name, value in first.items():
+        assert shuffled[name] == pytest.approx(value, abs=1e-9), name
@@ -0,0 +1,164 @@
+"""
+A few threads hammer one set of model_ids and dataset_ids with save_metrics, add_dataset and
+score writes while a reader checks every snapshot it sees; afterwards no write may be missing.
+A small, time-capped take on benchmarks/store_stress.py.
+"""
+
+import itertools
+import os
+import random
+import threading
+import time
+import traceback
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+os.environ.pop("MM_STORE_ADDRESS", None)  # in-process store
+
+WRITERS = 3
+SECONDS = 2.0  # time cap for the hammering
+MAX_OPS = 400  # per writer, so a fast machine does not run the whole time cap
+MODELS = ("PYTEST-CONC-A", "PYTEST-CONC-B")
+VINTAGES = ("2031-01", "2031-02")
+ROWS = 64
+
+
+def _meta(n: int) -> dict:
+    return {"portfolio": "Retail", "model_type": "Bureau", "model_id": MODELS[n % len(MODELS)], "vintage": VINTAGES[0]}
+
+
+def _content(n: int) -> dict:
+    """The ingested content of shared dataset n (identical for every writer)."""
+    return {"target": (np.arange(ROWS) % 9 == n).astype(np.int64), "score": np.linspace(0, 1, ROWS) * (n + 1) / 3}
+
+
+@pytest.fixture(scope="module")
+def store():
+    import store
+    return store
+
+
+def test_concurrent_writes_on_shared_keys(store):
+    # Every writer ingests the same two datasets: all but one registration per dataset deduplicate
+    shared = [store.add_dataset(store._new_record_id(), _meta(n), "passed", _content(n))["dataset_id"] for n in range(2)]
+    stop = threading.Event()
+    lock = threading.Lock()
+    failures: list[str] = []
+    saved: dict[tuple, int] = defaultdict(int)  # (model_id, vintage, segment) -> runs saved
+    registered: dict[int, set] = defaultdict(set)  # shared dataset n -> dataset_ids add_dataset returned
+    added: list[str] = []  # datasets with content of their own
+    scored: dict[tuple, int] = {}  # (dataset_id, writer) -> last value the writer committed
+    clock = itertools.count()  # computed_at sequence shared by the writers
+
+    def fail(message: str) -> None:
+        with lock:
+            failures.append(message)
+        stop.set()
+
+    def score(dataset_id: str, n: int, value: int) -> None:
+        """Read-modify-write of the writer's own column, retried on a concurrent version change."""
+        for _ in range(50):
+            ds = store.get_dataset(dataset_id)
+            columns = store.get_dataset_columns(dataset_id)
+            if columns is None:
+                continue
+            updated = {**{k: np.asarray(v) for k, v in columns.items()}, f"scored_{n}": np.full(ds["row_count"], float(value))}
+            if store.update_dataset_columns(dataset_id, updated, expected=ds["version"]) is not None:
+                with lock:
+                    scored[(dataset_id, n)] = value
+                return
+        fail(f"writer {n} could not score {dataset_id} in 50 attempts")
+
+    def writer(n: int) -> None:
+        rng = random.Random(n)
+        for i in range(MAX_OPS):
+            if stop.is_set():
+                return
+            op = rng.random()
+            if op < 0.5:
+                key = (rng.choice(MODELS), rng.choice(VINTAGES), rng.choice(["", "thin_file"]))
+                store.save_metrics({
+                    "model_id": key[0],
+                    "portfolio": "Retail",
+                    "model_type": "Bureau",
+                    "vintage": key[1],
+                    "segment": key[2] or None,
+                    "volume": ROWS,
+                    "computed_at": f"2031-03-01T00:00:00.{next(clock):09d}Z",
+                    "metrics": {"KS": round(rng.uniform(0.1, 0.5), 4), "PSI": round(rng.uniform(0.0, 0.3), 4)},
+                })
+                with lock:
+                    saved[key] += 1
+            elif op < 0.7:
+                d = rng.randrange(2)
+                if rng.random() < 0.5:
+                    result = store.add_dataset(store._new_record_id(), _meta(d), "passed", _content(d))
+                    with lock:
+                        registered[d].add(result["dataset_id"])
+                else:
+                    columns = {"target": np.zeros(ROWS, dtype=np.int64), "score": np.full(ROWS, n * 1000.0 + i)}
+                    result = store.add_dataset(store._new_record_id(), _meta(n), "passed", columns)
+                    with lock:
+                        added.append(result["dataset_id"])
+            else:
+                score(rng.choice(shared), n, i)
+
+    def reader() -> None:
+        while not stop.is_set():
+            for dataset_id in shared:
+                ds = store.get_dataset(dataset_id)
+                columns = store.get_dataset_columns(dataset_id)
+                if store.get_dataset(dataset_id)["version"] != ds["version"]:
+                    continue  # scored in between: the columns may be of the newer version
+                if list(columns) != ds["columns"] or any(len(v) != ds["row_count"] for v in columns.values()):
+                    fail(f"{dataset_id}: columns do not match the entry's version {ds['version']}")
+            rows = [r for r in store.get_metrics() if r["model_id"] in MODELS]
+            keys = [(r["model_id"], r["vintage"], r.get("segment") or "") for r in rows]
+            if len(keys) != len(set(keys)):
+                fail("get_metrics returned a key twice")
+            if any(r.get("run") is None or r.get("record_id") is None for r in rows):
+                fail("a latest record was published without its run number")
+            view = store.get_portfolio_overview()
+            if sum(view["status_counts"].values()) != view["rows"]:
+                fail(f"overview status counts {view['status_counts']} do not add up to {view['rows']} rows")
+
+    def guarded(fn, *args):
+        try:
+            fn(*args)
+        except Exception:  # noqa: BLE001 - any exception fails the test
+            fail(traceback.format_exc())
+
+    threads = [threading.Thread(target=guarded, args=(writer, n)) for n in range(WRITERS)]
+    threads.append(threading.Thread(target=guarded, args=(reader,)))
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + SECONDS
+    for t in threads[:-1]:
+        t.join(max(0.0, deadline - time.monotonic()))
+    stop.set()
+    for t in threads:
+        t.join()
+    assert not failures, failures[0]
+
+    # No lost metrics runs: every key's run numbers count up to the number of saves
+    for key, count in saved.items():
+        history = store.get_metrics_history(model_id=key[0], vintage=key[1], segment=key[2], include_compacted=True)
+        numbers = sorted(r["run"] for r in history["runs"])
+        assert len(numbers) + sum(s["runs"] for s in history["compacted"]) == count, key
+        assert numbers == list(range(count - len(numbers) + 1, count + 1)), key
+        newest = max(history["runs"], key=lambda r: r["computed_at"])
+        assert store.get_metric_detail(*key)["record_id"] == newest["record_id"], key
+    # Identical uploads deduplicated onto the first dataset; distinct ones all registered
+    for d, dataset_ids in registered.items():
+        assert dataset_ids == {shared[d]}
+    assert all(store.get_dataset(dataset_id) is not None for dataset_id in added)
+    # No lost score writes: each writer's column holds the last value it committed
+    for (dataset_id, n), value in scored.items():
+        columns = store.get_dataset_columns(dataset_id)
+        assert np.all(np.asarray(columns[f"scored_{n}"]) == value), (dataset_id, n)
+    refs: dict[str, int] = defaultdict(int)
+    for _, ds in store.list_datasets():
+        refs[ds["version"]] += 1
+    assert dict(refs) == store.blob_refs
@@ -33,6 +33,11 @@ let analysisChartVolume = null;
 /** Last loaded summary metrics and portfolio summary rows for Excel export */
 let lastSummaryMetrics = [];
 let lastPortfolioSummaryRows = [];
+/** Last portfolio overview from the backend (statuses per its alert rules); null in demo mode */
+let lastOverview = null;
+/** Model cards loaded so far for the overview filters and RAG status: { key, rows, nextCursor } */
+let modelCards = null;
+const MODEL_CARD_PAGE = 100;
 
 /** Active RAG filter from pie chart click: null | 'green' | 'amber' | 'red' */
 let activeRagFilter = null;
@@ -99,37 +104,196 @@ async function tryApiOrMock(apiCall, mockCall) {
   }
 }
 
+// --- Client data layer: GET responses cached by URL in memory and IndexedDB ---
+// A response is served from memory for API_CACHE_FRESH_MS, then revalidated with its ETag
+// (a 304 costs no body). Concurrent requests for the same URL share one fetch.
+const API_CACHE_FRESH_MS = 30000;
+const API_CACHE_MAX_ENTRIES = 200;
+const API_CACHE_MAX_AGE_MS = 7 * 24 * 3600 * 1000;
+const API_CACHE_DB = 'mm-api-cache';
+const API_CACHE_STORE = 'responses';
+
+/** url -> { etag, data, checkedAt } in least-recently-used order */
+const apiCache = new Map();
+/** url -> { promise, controller, waiters } of the fetch shared by concurrent requests */
+const apiInflight = new Map();
+let apiCacheDbPromise = null;
+
+function openApiCacheDb() {
+  if (apiCacheDbPromise) return apiCacheDbPromise;
+  apiCacheDbPromise = new Promise((resolve) => {
+    if (typeof indexedDB === 'undefined') return resolve(null);
+    try {
+      const req = indexedDB.open(API_CACHE_DB, 1);
+      req.onupgradeneeded = () => req.result.createObjectStore(API_CACHE_STORE);
+      req.onsuccess = () => {
+        pruneApiCacheDb(req.result);
+        resolve(req.result);
+      };
+      req.onerror = () => resolve(null);
+      req.onblocked = () => resolve(null);
+    } catch (e) {
+      resolve(null); // e.g. storage disabled: memory cache only
+    }
+  });
+  return apiCacheDbPromise;
+}
+
+function pruneApiCacheDb(db) {
+  try {
+    const cutoff = Date.now() - API_CACHE_MAX_AGE_MS;
+    const req = db.transaction(API_CACHE_STORE, 'readwrite').objectStore(API_CACHE_STORE).openCursor();
+    req.onsuccess = () => {
+      const cursor = req.result;
+      if (!cursor) return;
+      if (!cursor.value || cursor.value.storedAt < cutoff) cursor.delete();
+      cursor.continue();
+    };
+  } catch (e) { /* best effort */ }
+}
+
+async function readPersistedResponse(url) {
+  const db = await openApiCacheDb();
+  if (!db) return null;
+  return new Promise((resolve) => {
+    try {
+      const req = db.transaction(API_CACHE_STORE).objectStore(API_CACHE_STORE).get(url);
+      req.onsuccess = () => resolve(req.result || null);
+      req.onerror = () => resolve(null);
+    } catch (e) {
+      resolve(null);
+    }
+  });
+}
+
+async function persistResponse(url, etag, data) {
+  const db = await openApiCacheDb();
+  if (!db) return;
+  try {
+    db.transaction(API_CACHE_STORE, 'readwrite').objectStore(API_CACHE_STORE).put({ etag, data, storedAt: Date.now() }, url);
+  } catch (e) { /* quota exceeded or not cloneable: memory cache only */ }
+}
+
+function rememberResponse(url, etag, data) {
+  apiCache.delete(url);
+  apiCache.set(url, { etag, data, checkedAt: Date.now() });
+  if (apiCache.size > API_CACHE_MAX_ENTRIES) apiCache.delete(apiCache.keys().next().value);
+}
+
+/** After a successful write (apiWrite): revalidate every cached response on next use. */
+function markApiCacheStale() {
+  apiCache.forEach(entry => { entry.checkedAt = 0; });
+}
+
+/** GET url (revalidating entry's ETag if any) and cache the response. */
+async function fetchIntoCache(url, entry, errorMessage, signal) {
+  const headers = entry && entry.etag ? { 'If-None-Match': entry.etag } : {};
+  const res = await fetch(url, { headers, signal });
+  if (res.status === 304 && entry) {
+    rememberResponse(url, entry.etag, entry.data);
+    return entry.data;
+  }
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.error || errorMessage);
+  }
+  const data = await res.json();
+  const etag = res.headers.get('ETag');
+  rememberResponse(url, etag, data);
+  if (etag) persistResponse(url, etag, data);
+  return data;
+}
+
+/** promise, or an AbortError as soon as signal aborts (the promise itself keeps running). */
+function raceSignal(promise, signal) {
+  if (!signal) return promise;
+  const aborted = () => new DOMException('The operation was aborted.', 'AbortError');
+  if (signal.aborted) return Promise.reject(aborted());
+  return new Promise((resolve, reject) => {
+    const onAbort = () => reject(aborted());
+    signal.addEventListener('abort', onAbort, { once: true });
+    promise.then(resolve, reject).finally(() => signal.removeEventListener('abort', onAbort));
+  });
+}
+
+/**
+ * GET url as JSON through the cache. Throws with the API's error message (or errorMessage) on a
+ * non-2xx response. Responses loaded from IndexedDB are always revalidated before use.
+ * Concurrent callers share one fetch with its own controller: a caller's signal only abandons
+ * its own wait, and the fetch is aborted once every caller waiting on it has given up.
+ */
+async function cachedGet(url, { signal, errorMessage = 'Request failed' } = {}) {
+  const cached = apiCache.get(url);
+  if (cached && Date.now() - cached.checkedAt < API_CACHE_FRESH_MS) return cached.data;
+  let shared = apiInflight.get(url);
+  if (!shared) {
+    const controller = new AbortController();
+    const promise = (async () => fetchIntoCache(url, cached || await readPersistedResponse(url), errorMessage, controller.signal))();
+    shared = { promise, controller, waiters: 0 };
+    apiInflight.set(url, shared);
+    const settled = shared;
+    promise.catch(() => {}).finally(() => {
+      if (apiInflight.get(url) === settled) apiInflight.delete(url);
+    });
+  }
+  shared.waiters++;
+  try {
+    return await raceSignal(shared.promise, signal);
+  } finally {
+    shared.waiters--;
+    if (shared.waiters === 0 && signal && signal.aborted) {
+      if (apiInflight.get(url) === shared) apiInflight.delete(url);
+      shared.controller.abort();
+    }
+  }
+}
+
 async function getFilterOptions() {
   return tryApiOrMock(
-    async (signal) => {
-      const res = await fetch(`${API_BASE}/api/filter-options`, { signal });
-      if (!res.ok) throw new Error('Filter options failed');
-      return res.json();
-    },
+    (signal) => cachedGet(`${API_BASE}/api/filter-options`, { signal, errorMessage: 'Filter options failed' }),
     () => window.MOCK_API.getFilterOptions()
   );
 }
 
 async function getSummary(params = {}) {
   return tryApiOrMock(
-    async (signal) => {
+    (signal) => {
       const q = new URLSearchParams(params).toString();
-      const res = await fetch(`${API_BASE}/api/metrics/summary?${q}`, { signal });
-      if (!res.ok) throw new Error('Summary failed');
-      return res.json();
+      return cachedGet(`${API_BASE}/api/metrics/summary?${q}`, { signal, errorMessage: 'Summary failed' });
     },
     () => window.MOCK_API.getSummary(params)
   );
 }
 
+// Server-side portfolio overview (RAG counts per portfolio); null in demo mode, where the
+// summary rows are aggregated client-side instead.
+async function getOverview(params = {}) {
+  return tryApiOrMock(
+    (signal) => {
+      const q = new URLSearchParams(params).toString();
+      return cachedGet(`${API_BASE}/api/metrics/overview?${q}`, { signal, errorMessage: 'Overview failed' });
+    },
+    () => null
+  );
+}
+
+// A page of model cards (one row per model with its status) for the overview filters; null in demo mode
+async function getOverviewModels(params = {}, cursor = null, limit = MODEL_CARD_PAGE) {
+  return tryApiOrMock(
+    (signal) => {
+      const q = new URLSearchParams({ ...params, limit: String(limit), ...(cursor ? { cursor } : {}) }).toString();
+      return cachedGet(`${API_BASE}/api/metrics/overview/models?${q}`, { signal, errorMessage: 'Model cards failed' });
+    },
+    () => null
+  );
+}
+
 async function getDetail(modelId, vintage, segment) {
   return tryApiOrMock(
-    async (signal) => {
+    (signal) => {
       let url = `${API_BASE}/api/metrics/detail/${encodeURIComponent(modelId)}?vintage=${encodeURIComponent(vintage)}`;
       if (segment) url += `&segment=${encodeURIComponent(segment)}`;
-      const res = await fetch(url, { signal });
-      if (!res.ok) throw new Error('Detail failed');
-      return res.json();
+      return cachedGet(url, { signal, errorMessage: 'Detail failed' });
     },
     () => window.MOCK_API.getDetail(modelId, vintage, segment)
   );
@@ -137,43 +301,49 @@ async function getDetail(modelId, vintage, segment) {
 
 async function getModels() {
   return tryApiOrMock(
-    async (signal) => {
-      const res = await fetch(`${API_BASE}/api/models`, { signal });
-      if (!res.ok) throw new Error('Models failed');
-      return res.json();
-    },
+    (signal) => cachedGet(`${API_BASE}/api/models`, { signal, errorMessage: 'Models failed' }),
     () => window.MOCK_API.getModels()
   );
 }
 
 async function getTrends(modelId, segment) {
   return tryApiOrMock(
-    async (signal) => {
+    (signal) => {
       let url = `${API_BASE}/api/metrics/trends?model_id=${encodeURIComponent(modelId)}`;
       if (segment) url += `&segment=${encodeURIComponent(segment)}`;
-      const res = await fetch(url, { signal });
-      if (!res.ok) throw new Error('Trends failed');
-      return res.json();
+      return cachedGet(url, { signal, errorMessage: 'Trends failed' });
     },
     () => window.MOCK_API.getTrends(modelId, segment)
   );
 }
 
+/**
+ * Send a write (POST, PUT, PATCH or DELETE; body as JSON when given) and return the JSON response.
+ * Throws with the API's error message (or errorMessage) on a non-2xx response. Every write goes
+ * through here: a successful one marks the cached GET responses stale, since any of them may
+ * now be out of date.
+ */
+async function apiWrite(method, path, body, { signal, errorMessage = 'Request failed' } = {}) {
+  const init = { method, signal };
+  if (body !== undefined) {
+    init.headers = { 'Content-Type': 'application/json' };
+    init.body = JSON.stringify(body);
+  }
+  const res = await fetch(`${API_BASE}${path}`, init);
+  if (!res.ok) {
+    const err = await res.json().catch(() => ({}));
+    throw new Error(err.error || errorMessage);
+  }
+  markApiCacheStale();
+  return res.json();
+}
+
 // --- Data workflow state and API ---
 let workflowDatasetId = null;
 
 async function workflowIngest(body) {
   return tryApiOrMock(
-    async (signal) => {
-      const res = await fetch(`${API_BASE}/api/ingest`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(body),
-        signal
-      });
-      if (!res.ok) throw new Error((await res.json()).error || 'Upload failed');
-      return res.json();
-    },
+    (signal) => apiWrite('POST', '/api/ingest', body, { signal, errorMessage: 'Upload failed' }),
     () => window.MOCK_API.ingest(body)
   );
 }
@@ -191,46 +361,21 @@ async function workflowGetDataset(id) {
 
 async function workflowRunQc(id) {
   return tryApiOrMock(
-    async (signal) => {
-      const res = await fetch(`${API_BASE}/api/qc/${encodeURIComponent(id)}`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({}),
-        signal
-      });
-      if (!res.ok) throw new Error('QC failed');
-      return res.json();
-    },
+    (signal) => apiWrite('POST', `/api/qc/${encodeURIComponent(id)}`, {}, { signal, errorMessage: 'QC failed' }),
     () => window.MOCK_API.runQc(id)
   );
 }
 
 async function workflowScoreDataset(id) {
   return tryApiOrMock(
-    async (signal) => {
-      const res = await fetch(`${API_BASE}/api/score-dataset/${encodeURIComponent(id)}`, { 
-        method: 'POST',
-        signal 
-      });
-      if (!res.ok) throw new Error('Scoring failed');
-      return res.json();
-    },
+    (signal) => apiWrite('POST', `/api/score-dataset/${encodeURIComponent(id)}`, undefined, { signal, errorMessage: 'Scoring failed' }),
     () => window.MOCK_API.scoreDataset(id)
   );
 }
 
 async function workflowComputeMetrics(datasetId, modelType) {
   return tryApiOrMock(
-    async (signal) => {
-      const res = await fetch(`${API_BASE}/api/compute-metrics`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ dataset_id: datasetId, model_type: modelType }),
-        signal
-      });
-      if (!res.ok) throw new Error((await res.json()).error || 'Compute failed');
-      return res.json();
-    },
+    (signal) => apiWrite('POST', '/api/compute-metrics', { dataset_id: datasetId, model_type: modelType }, { signal, errorMessage: 'Compute failed' }),
     () => window.MOCK_API.computeMetrics(datasetId, modelType)
   );
 }
@@ -370,29 +515,100 @@ function applyFilters() {
   if (filterModelType?.value) params.model_type = filterModelType.value;
   if (filterVintage?.value) params.vintage = filterVintage.value;
   if (filterSegment?.value) params.segment = filterSegment.value;
-  getSummary(params).then(({ metrics }) => {
-    const list = metrics || [];
-    lastSummaryMetrics = list;
-    const filtered = activeRagFilter ? list.filter(m => getModelStatus(m.metrics?.KS, m.metrics?.PSI) === activeRagFilter) : list;
-    const selectedVintage = filterVintage?.value || '';
-    const onePerModel = oneRowPerModel(filtered, selectedVintage);
-    renderSummary(onePerModel);
-    loadPortfolioLevelSummary(filtered);
+  const overviewRequest = getOverview(params);
+  // Pie, RAG counts and model cards come from the overview as soon as it arrives
+  overviewRequest.then(overview => {
+    if (!overview) return;
+    lastOverview = overview;
+    renderPortfolioOverview();
+  }).catch(() => {});
+  // Summary rows only feed the table (and, in demo mode, the client-side portfolio aggregates)
+  Promise.all([getSummary(params), overviewRequest]).then(([{ metrics }, overview]) => {
+    lastSummaryMetrics = metrics || [];
+    lastOverview = overview;
+    if (!overview) renderPortfolioOverview();
+    renderSummaryTable();
     summaryLoading?.classList.add('hidden');
     summaryTableWrap?.classList.remove('hidden');
-    loadPortfolioView(params, filtered);
-    updateRagFilterIndicator();
   }).catch(() => {
     summaryLoading.textContent = 'Failed to load summary.';
     document.getElementById('portfolio-summary-loading')?.classList.add('hidden');
     document.getElementById('portfolio-summary-table-wrap')?.classList.remove('hidden');
-    loadPortfolioLevelSummary([]);
-    loadPortfolioView(params, []);
+    lastSummaryMetrics = [];
+    lastOverview = null;
     activeRagFilter = null;
-    updateRagFilterIndicator();
+    renderPortfolioOverview();
   });
 }
 
+/** Demo mode: one row per model (its latest summary row) with the client-side KS / PSI bands. */
+function modelRows(metrics) {
+  return oneRowPerModel(metrics, filterVintage?.value || '').map(r => {
+    const m = r.metrics || {};
+    return { ...r, KS: m.KS, PSI: m.PSI, status: getModelStatus(m.KS, m.PSI) };
+  });
+}
+
+/**
+ * Pie, portfolio RAG counts and model cards (narrowed to the active RAG status): from the last
+ * overview plus a page of model cards, or (demo mode) from the last summary rows.
+ */
+function renderPortfolioOverview() {
+  if (lastOverview) {
+    loadPortfolioLevelSummary(null, lastOverview);
+    loadModelCards();
+  } else {
+    const rows = modelRows(lastSummaryMetrics);
+    loadPortfolioLevelSummary(rows, null);
+    loadPortfolioView(activeRagFilter ? rows.filter(r => r.status === activeRagFilter) : rows);
+  }
+  updateRagFilterIndicator();
+}
+
+/** Query for the model cards: the last overview's filters plus the active RAG status. */
+function modelCardParams(status = activeRagFilter) {
+  const params = Object.fromEntries(Object.entries(lastOverview?.filters || {}).filter(([, v]) => v != null && v !== ''));
+  return status ? { ...params, status } : params;
+}
+
+/** First page of model cards for the overview filters and RAG status, or with more the next page. */
+async function loadModelCards(more = false) {
+  const key = JSON.stringify(modelCardParams());
+  const shown = more && modelCards?.key === key ? modelCards : { key, rows: [], nextCursor: null };
+  const page = await getOverviewModels(modelCardParams(), more ? shown.nextCursor : null).catch(() => null);
+  // Filters or RAG status changed while loading: a newer call renders the cards
+  if (!page || !lastOverview || JSON.stringify(modelCardParams()) !== key) return;
+  modelCards = { key, rows: shown.rows.concat(page.models), nextCursor: page.next_cursor };
+  loadPortfolioView(modelCards.rows, Boolean(page.next_cursor));
+}
+
+/** Model ids in a RAG status for the current filters (every page of the overview's model cards). */
+async function modelIdsInStatus(status) {
+  if (!lastOverview) return new Set(modelRows(lastSummaryMetrics).filter(r => r.status === status).map(r => r.model_id));
+  const ids = new Set();
+  let cursor = null;
+  do {
+    const page = await getOverviewModels(modelCardParams(status), cursor, 10000);
+    if (!page) break;
+    page.models.forEach(r => ids.add(r.model_id));
+    cursor = page.next_cursor;
+  } while (cursor);
+  return ids;
+}
+
+/** Summary table: one row per model, only models in the active RAG status. */
+async function renderSummaryTable() {
+  const metrics = lastSummaryMetrics;
+  const status = activeRagFilter;
+  let rows = metrics;
+  if (status) {
+    const inStatus = await modelIdsInStatus(status).catch(() => new Set());
+    if (metrics !== lastSummaryMetrics || status !== activeRagFilter) return;  // superseded while loading
+    rows = metrics.filter(r => inStatus.has(r.model_id));
+  }
+  renderSummary(oneRowPerModel(rows, filterVintage?.value || ''));
+}
+
 function updateRagFilterIndicator() {
   const el = document.getElementById('rag-filter-indicator');
   if (!el) return;
@@ -503,6 +719,8 @@ async function init() {
 
   initChat();
 
+  document.getElementById('portfolio-load-more')?.addEventListener('click', () => loadModelCards(true));
+
   // Overall portfolio view: click card to open KS and PSI Analysis
   const portfolioGrid = document.getElementById('portfolio-grid');
   if (portfolioGrid) {
@@ -764,42 +982,40 @@ function getModelStatus(ks, psi) {
   return 'red';
 }
 
-function loadPortfolioLevelSummary(metrics) {
+function loadPortfolioLevelSummary(rows, overview) {
   const loading = document.getElementById('portfolio-summary-loading');
   const wrap = document.getElementById('portfolio-summary-table-wrap');
   const tbody = document.getElementById('portfolio-summary-tbody');
   if (!loading || !wrap || !tbody) return;
   loading.classList.add('hidden');
   wrap.classList.remove('hidden');
-  const rows = metrics || [];
+  if (overview && Array.isArray(overview.by_portfolio)) {
+    // Counts maintained by the backend: one status per model (latest vintage unless filtered)
+    lastPortfolioSummaryRows = overview.by_portfolio.filter(p => p.models > 0).map(p => {
+      const { green = 0, amber = 0, red = 0 } = p.model_status_counts || {};
+      const commentary = buildPortfolioCommentary(p.portfolio, p.models, green, amber, red);
+      return { Portfolio: p.portfolio, Models: p.models, Green: green, Amber: amber, Red: red, Commentary: commentary.replace(/<[^>]+>/g, '').trim() };
+    });
+    renderPortfolioLevelSummary();
+    return;
+  }
   const byPortfolio = {};
-  rows.forEach(r => {
+  (rows || []).forEach(r => {
     const port = r.portfolio || 'Other';
-    if (!byPortfolio[port]) byPortfolio[port] = [];
-    byPortfolio[port].push(r);
-  });
-  const byModelPerPort = {};
-  Object.keys(byPortfolio).forEach(port => {
-    const list = byPortfolio[port];
-    const byModel = {};
-    list.forEach(r => {
-      const id = r.model_id;
-      if (!byModel[id] || (r.vintage > (byModel[id].vintage || ''))) byModel[id] = r;
-    });
-    byModelPerPort[port] = Object.values(byModel);
+    if (!byPortfolio[port]) byPortfolio[port] = { green: 0, amber: 0, red: 0 };
+    byPortfolio[port][r.status]++;
   });
-  const portfolios = Object.keys(byModelPerPort).sort();
-  lastPortfolioSummaryRows = portfolios.map(port => {
-    const list = byModelPerPort[port];
-    let green = 0, amber = 0, red = 0;
-    list.forEach(r => {
-      const m = r.metrics || {};
-      const status = getModelStatus(m.KS, m.PSI);
-      if (status === 'green') green++; else if (status === 'amber') amber++; else red++;
-    });
-    const commentary = buildPortfolioCommentary(port, list.length, green, amber, red);
-    return { Portfolio: port, Models: list.length, Green: green, Amber: amber, Red: red, Commentary: commentary.replace(/<[^>]+>/g, '').trim() };
+  lastPortfolioSummaryRows = Object.keys(byPortfolio).sort().map(port => {
+    const { green, amber, red } = byPortfolio[port];
+    const models = green + amber + red;
+    const commentary = buildPortfolioCommentary(port, models, green, amber, red);
+    return { Portfolio: port, Models: models, Green: green, Amber: amber, Red: red, Commentary: commentary.replace(/<[^>]+>/g, '').trim() };
   });
+  renderPortfolioLevelSummary();
+}
+
+function renderPortfolioLevelSummary() {
+  const tbody = document.getElementById('portfolio-summary-tbody');
   tbody.innerHTML = lastPortfolioSummaryRows.map(row => `
     <tr>
       <td><strong>${row.Portfolio}</strong></td>
@@ -810,7 +1026,7 @@ function loadPortfolioLevelSummary(metrics) {
       <td class="portfolio-commentary">${buildPortfolioCommentary(row.Portfolio, row.Models, row.Green, row.Amber, row.Red)}</td>
     </tr>
   `).join('');
-  if (portfolios.length === 0) {
+  if (lastPortfolioSummaryRows.length === 0) {
     tbody.innerHTML = '<tr><td colspan="6">No data for selected filters.</td></tr>';
     lastPortfolioSummaryRows = [];
   }
@@ -847,7 +1063,9 @@ function loadPortfolioLevelSummary(metrics) {
             const idx = elements[0].index;
             const status = statusKeys[idx];
             activeRagFilter = (activeRagFilter === status ? null : status);
-            applyFilters();
+            // Re-render from the last responses: the RAG filter needs no new request
+            renderPortfolioOverview();
+            renderSummaryTable();
           }
         }
       });
@@ -960,64 +1178,104 @@ function downloadChartsAsPpt() {
   pres.writeFile({ fileName: name });
 }
 
-async function loadPortfolioView(params, metricsOverride) {
+/** Model cards: status as the RAG counts use it, KS / PSI of the run shown; more shows Load more. */
+function loadPortfolioView(rows, more = false) {
   const loading = document.getElementById('portfolio-loading');
   const grid = document.getElementById('portfolio-grid');
   if (!loading || !grid) return;
-  try {
-    const metrics = (metricsOverride !== undefined && Array.isArray(metricsOverride)) ? metricsOverride : (await getSummary(params || {})).metrics || [];
-    const byModel = {};
-    (metrics || []).forEach(r => {
-      const id = r.model_id;
-      if (!byModel[id] || (r.vintage > (byModel[id].vintage || ''))) byModel[id] = r;
-    });
-    const list = Object.values(byModel);
-    loading.classList.add('hidden');
-    grid.classList.remove('hidden');
-    grid.innerHTML = list.map(r => {
-      const m = r.metrics || {};
-      const status = getModelStatus(m.KS, m.PSI);
-      const seg = r.segment ? ` data-segment="${r.segment}"` : '';
-      return `<div class="portfolio-card status-${status}" role="button" tabindex="0" data-model-id="${r.model_id}" data-vintage="${r.vintage}"${seg} title="Click to view detail">
+  loading.classList.add('hidden');
+  grid.classList.remove('hidden');
+  document.getElementById('portfolio-load-more')?.classList.toggle('hidden', !more);
+  grid.innerHTML = (rows || []).map(r => {
+    const status = r.status;
+    const seg = r.segment ? ` data-segment="${r.segment}"` : '';
+    return `<div class="portfolio-card status-${status}" role="button" tabindex="0" data-model-id="${r.model_id}" data-vintage="${r.vintage}"${seg} title="Click to view detail">
         <span class="portfolio-status" title="${status}"></span>
         <div class="portfolio-card-body">
           <strong>${r.model_id}</strong>
           <div>${r.portfolio} · ${r.model_type}</div>
-          <div class="portfolio-metrics">KS ${m.KS != null ? Number(m.KS).toFixed(3) : '–'} | PSI ${m.PSI != null ? Number(m.PSI).toFixed(3) : '–'}</div>
+          <div class="portfolio-metrics">KS ${r.KS != null ? Number(r.KS).toFixed(3) : '–'} | PSI ${r.PSI != null ? Number(r.PSI).toFixed(3) : '–'}</div>
         </div>
       </div>`;
-    }).join('');
-  } catch (e) {
-    loading.textContent = 'Failed to load portfolio.';
-    grid.classList.remove('hidden');
-  }
+  }).join('');
 }
 
 async function getVariableStability(modelId, vintage) {
   return tryApiOrMock(
-    async (signal) => {
-      const res = await fetch(`${API_BASE}/api/metrics/variable-stability?model_id=${encodeURIComponent(modelId)}&vintage=${encodeURIComponent(vintage)}`, { signal });
-      if (!res.ok) throw new Error('Stability failed');
-      return res.json();
-    },
+    (signal) => cachedGet(
+      `${API_BASE}/api/metrics/variable-stability?model_id=${encodeURIComponent(modelId)}&vintage=${encodeURIComponent(vintage)}`,
+      { signal, errorMessage: 'Stability failed' }
+    ),
     () => window.MOCK_API.getVariableStability(modelId, vintage)
   );
 }
 
 async function getSegmentMetrics(modelId, vintage) {
   return tryApiOrMock(
-    async (signal) => {
-      const res = await fetch(`${API_BASE}/api/metrics/segments?model_id=${encodeURIComponent(modelId)}&vintage=${encodeURIComponent(vintage)}`, { signal });
-      if (!res.ok) {
-        const err = await res.json().catch(() => ({}));
-        throw new Error(err.error || 'Segments failed');
-      }
-      return res.json();
-    },
+    (signal) => cachedGet(
+      `${API_BASE}/api/metrics/segments?model_id=${encodeURIComponent(modelId)}&vintage=${encodeURIComponent(vintage)}`,
+      { signal, errorMessage: 'Segments failed' }
+    ),
     () => window.MOCK_API.getSegmentMetrics(modelId, vintage)
   );
 }
 
+function analysisBundleUrl(modelId, vintage, segment) {
+  let url = `${API_BASE}/api/analysis/bundle?model_id=${encodeURIComponent(modelId)}&vintage=${encodeURIComponent(vintage)}`;
+  if (segment) url += `&segment=${encodeURIComponent(segment)}`;
+  return url;
+}
+
+// Detail (with deciles), trends, variable stability and segments for the Analysis tab in one request
+async function getAnalysisBundle(modelId, vintage, segment) {
+  return tryApiOrMock(
+    (signal) => cachedGet(analysisBundleUrl(modelId, vintage, segment), { signal, errorMessage: 'Analysis failed' }),
+    async () => {
+      const api = window.MOCK_API;
+      const [detail, trends, stability, segments] = await Promise.all([
+        api.getDetail(modelId, vintage, segment).catch(() => null),
+        api.getTrends(modelId, segment),
+        api.getVariableStability(modelId, vintage),
+        api.getSegmentMetrics(modelId, vintage).catch(() => null),
+      ]);
+      return { model_id: modelId, vintage, segment: segment || null, detail, trends, stability, segments };
+    }
+  );
+}
+
+/** Warm the cache with the bundles likely to be opened next: adjacent vintages and adjacent models. */
+function prefetchAdjacentAnalysis(modelId, vintage, segment) {
+  if (backendAvailable !== true) return;
+  const neighbours = (selectId, value) => {
+    const values = Array.from(document.getElementById(selectId)?.options || []).map(o => o.value).filter(Boolean);
+    const i = values.indexOf(value);
+    return i < 0 ? [] : [values[i - 1], values[i + 1]].filter(Boolean);
+  };
+  const urls = [
+    ...neighbours('analysis-vintage', vintage).map(v => analysisBundleUrl(modelId, v, segment)),
+    ...neighbours('analysis-model', modelId).map(m => analysisBundleUrl(m, vintage, segment)),
+  ];
+  const whenIdle = window.requestIdleCallback || ((fn) => setTimeout(fn, 200));
+  whenIdle(async () => {
+    // One at a time so prefetching never competes with the user's next request for connections
+    for (const url of urls) await cachedGet(url).catch(() => {});
+  });
+}
+
+function segmentRowsHtml(segments) {
+  return (segments || []).map(s => {
+    const m = s.metrics || {};
+    return `<tr>
+      <td>${s.label || s.segment}</td>
+      <td class="num">${m.KS != null ? Number(m.KS).toFixed(4) : '–'}</td>
+      <td class="num">${m.PSI != null ? Number(m.PSI).toFixed(4) : '–'}</td>
+      <td class="num">${m.AUC != null ? Number(m.AUC).toFixed(4) : '–'}</td>
+      <td class="num">${s.volume != null ? Number(s.volume).toLocaleString() : '–'}</td>
+      <td class="num">${m.bad_rate != null ? Number(m.bad_rate).toFixed(4) : '–'}</td>
+    </tr>`;
+  }).join('');
+}
+
 function initSegmentLevel(opts) {
   const segModel = document.getElementById('seg-model');
   const segVintage = document.getElementById('seg-vintage');
@@ -1051,17 +1309,7 @@ function initSegmentLevel(opts) {
       loading.classList.remove('hidden');
       try {
         const data = await getSegmentMetrics(modelId, vintage);
-        tbody.innerHTML = (data.segments || []).map(s => {
-          const m = s.metrics || {};
-          return `<tr>
-            <td>${s.label || s.segment}</td>
-            <td class="num">${m.KS != null ? Number(m.KS).toFixed(4) : '–'}</td>
-            <td class="num">${m.PSI != null ? Number(m.PSI).toFixed(4) : '–'}</td>
-            <td class="num">${m.AUC != null ? Number(m.AUC).toFixed(4) : '–'}</td>
-            <td class="num">${s.volume != null ? Number(s.volume).toLocaleString() : '–'}</td>
-            <td class="num">${m.bad_rate != null ? Number(m.bad_rate).toFixed(4) : '–'}</td>
-          </tr>`;
-        }).join('');
+        tbody.innerHTML = segmentRowsHtml(data.segments);
         loading.classList.add('hidden');
         wrap.classList.remove('hidden');
       } catch (e) {
@@ -1186,15 +1434,15 @@ async function loadKsPsiAnalysis() {
   const psiTrigger = document.getElementById('analysis-psi-trigger');
   const variableWrap = document.getElementById('analysis-variable-table-wrap');
   const trendsInsightsEl = document.getElementById('analysis-trends-insights');
+  const segmentWrap = document.getElementById('analysis-segment-table-wrap');
   if (!modelId || !vintage) return;
   if (loading) loading.classList.remove('hidden');
   if (content) content.classList.add('hidden');
   try {
-    const [trendData, detailData, stabilityData] = await Promise.all([
-      getTrends(modelId, segment),
-      getDetail(modelId, vintage, segment),
-      getVariableStability(modelId, vintage),
-    ]);
+    const bundle = await getAnalysisBundle(modelId, vintage, segment);
+    const trendData = bundle.trends || {};
+    const detailData = bundle.detail || {};
+    const stabilityData = bundle.stability || {};
     destroyAnalysisCharts();
     const labels = trendData.vintages || [];
     const commonOpts = { responsive: true, maintainAspectRatio: true, plugins: { legend: { display: false } }, scales: { x: { title: { display: true, text: 'Vintage' } }, y: { beginAtZero: true } } };
@@ -1226,7 +1474,12 @@ async function loadKsPsiAnalysis() {
       }
     }
     if (decileCommentary) decileCommentary.innerHTML = detailData.decile_commentary ? `<p><strong>Insight:</strong> ${detailData.decile_commentary}</p>` : '';
-    if (psiTrigger) psiTrigger.innerHTML = stabilityData.psi_trigger_insight ? `<p>${stabilityData.psi_trigger_insight}</p>` : '';
+    if (psiTrigger) {
+      const drift = detailData.drift;
+      psiTrigger.innerHTML = (stabilityData.psi_trigger_insight ? `<p>${stabilityData.psi_trigger_insight}</p>` : '') + (drift
+        ? `<p><strong>Score drift vs baseline:</strong> PSI ${Number(drift.psi).toFixed(4)} · KS statistic ${Number(drift.ks_statistic).toFixed(4)} · Wasserstein ${Number(drift.wasserstein).toFixed(4)} · JS divergence ${Number(drift.js_divergence).toFixed(4)}</p>`
+        : '');
+    }
     if (variableWrap) {
       variableWrap.innerHTML = (stabilityData.variables || []).length
         ? `<table class="data-table"><thead><tr><th>Variable</th><th>PSI</th><th>Status</th></tr></thead><tbody>${
@@ -1234,12 +1487,19 @@ async function loadKsPsiAnalysis() {
         }</tbody></table>`
         : '<p>No variable stability data.</p>';
     }
+    if (segmentWrap) {
+      segmentWrap.innerHTML = bundle.segments && (bundle.segments.segments || []).length
+        ? `<table class="data-table"><thead><tr><th>Segment</th><th>KS</th><th>PSI</th><th>AUC</th><th>Volume</th><th>Bad rate</th></tr></thead><tbody>${segmentRowsHtml(bundle.segments.segments)}</tbody></table>`
+        : '<p>No segment breakdown for this model/vintage.</p>';
+    }
+    prefetchAdjacentAnalysis(modelId, vintage, segment);
   } catch (e) {
     if (ksTrigger) ksTrigger.innerHTML = `<p class="error">Failed to load analysis: ${e.message || e}.</p>`;
     if (decileWrap) decileWrap.innerHTML = '';
     if (decileCommentary) decileCommentary.innerHTML = '';
     if (psiTrigger) psiTrigger.innerHTML = '';
     if (variableWrap) variableWrap.innerHTML = '';
+    if (segmentWrap) segmentWrap.innerHTML = '';
   }
   if (loading) loading.classList.add('hidden');
   if (content) content.classList.remove('hidden');
@@ -0,0 +1,33 @@
+"""
+Gunicorn settings:  gunicorn -c gunicorn.conf.py "backend.app:app"
+
+Starts the shared store server (backend/store_server.py) once in the gunicorn master
+before workers fork, and points every worker at it via MM_STORE_ADDRESS, so all workers
+share one consistent store.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+
+BACKEND_DIR = Path(__file__).resolve().parent / "backend"
+
+
+def on_starting(server):
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault(
+        "MM_STORE_ADDRESS", str(Path(tempfile.gettempdir()) / f"model_monitoring_store_{os.getpid()}.sock")
+    )
+    from store_server import start_in_background
+    server.mm_store_process = start_in_background(os.environ["MM_STORE_ADDRESS"])
+
+
+def on_exit(server):
+    proc = getattr(server, "mm_store_process", None)
+    if proc is not None and proc.poll() is None:
+        proc.terminate()
@@ -12,58 +12,12 @@ KS ranges from 0 to 1, where:
 """
 
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import roc_curve
 import warnings
 warnings.filterwarnings('ignore')
 
-
-def calculate_ks(y_true, y_pred_proba):
-    """
-    Calculate Kolmogorov-Smirnov statistic for binary classification.
-    
-    Parameters:
-    -----------
-    y_true : array-like
-        True binary labels (0 or 1)
-    y_pred_proba : array-like
-        Predicted probabilities for the positive class (class 1)
-    
-    Returns:
-    --------
-    ks_statistic : float
-        KS statistic value (maximum difference between cumulative distributions)
-    ks_threshold : float
-        Probability threshold at which KS statistic is achieved
-    """
-    # Convert to numpy arrays
-    y_true = np.array(y_true)
-    y_pred_proba = np.array(y_pred_proba)
-    
-    # Sort by predicted probability (descending)
-    sorted_indices = np.argsort(y_pred_proba)[::-1]
-    y_true_sorted = y_true[sorted_indices]
-    y_pred_proba_sorted = y_pred_proba[sorted_indices]
-    
-    # Calculate cumulative distributions
-    n_total = len(y_true)
-    n_positive = np.sum(y_true == 1)
-    n_negative = n_total - n_positive
-    
-    # Cumulative counts
-    cum_positive = np.cumsum(y_true_sorted == 1) / n_positive if n_positive > 0 else np.zeros(n_total)
-    cum_negative = np.cumsum(y_true_sorted == 0) / n_negative if n_negative > 0 else np.zeros(n_total)
-    
-    # Calculate KS statistic
-    ks_values = np.abs(cum_positive - cum_negative)
-    ks_statistic = np.max(ks_values)
-    ks_index = np.argmax(ks_values)
-    ks_threshold = y_pred_proba_sorted[ks_index]
-    
-    return ks_statistic, ks_threshold, cum_positive, cum_negative, y_pred_proba_sorted
+# pandas, matplotlib and scikit-learn are imported inside the functions that need
+# them, so importing this module for calculate_ks stays cheap.
+from backend.metrics.ks import calculate_ks  # noqa: F401  (re-exported for existing callers)
 
 
 def plot_ks_curve(y_true, y_pred_proba, ks_statistic, ks_threshold, 
@@ -88,10 +42,14 @@ def plot_ks_curve(y_true, y_pred_proba, ks_statistic, ks_threshold,
     y_pred_proba_sorted : array
         Sorted predicted probabilities
     """
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    # Create percentile-based x-axis
-    percentiles = np.arange(0, 101, 1)
+    # Percentile-based x-axis: one point per sorted observation, whatever n is
+    cum_positive = np.asarray(cum_positive)
+    cum_negative = np.asarray(cum_negative)
+    percentiles = np.arange(1, len(cum_positive) + 1) / len(cum_positive) * 100
     
     # Plot cumulative distributions
     ax.plot(percentiles, cum_positive * 100, label='Cumulative % of Positive Class', 
@@ -100,7 +58,7 @@ def plot_ks_curve(y_true, y_pred_proba, ks_statistic, ks_threshold,
             linewidth=2, color='red')
     
     # Mark KS statistic point
-    ks_percentile = (np.argmax(np.abs(cum_positive - cum_negative)) / len(cum_positive)) * 100
+    ks_percentile = percentiles[np.argmax(np.abs(cum_positive - cum_negative))]
     ax.axvline(x=ks_percentile, color='green', linestyle='--', linewidth=2, 
                label=f'KS Statistic = {ks_statistic:.4f} at {ks_threshold:.4f}')
     
@@ -141,6 +99,9 @@ def ks_statistic_logistic_model(X, y, test_size=0.3, random_state=42):
     results : dict
         Dictionary containing model, KS statistic, threshold, and other metrics
     """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import train_test_split
+
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=test_size, random_state=random_state, stratify=y
@@ -183,6 +144,9 @@ def ks_statistic_logistic_model(X, y, test_size=0.3, random_state=42):
 
 # Example usage
 if __name__ == "__main__":
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
     # Generate sample data for demonstration
     print("Generating sample data...")
     np.random.seed(42)